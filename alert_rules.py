@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+声明式告警规则
+在 config.ALERT_RULES 中按顺序声明规则，启动时编译为 Python 函数（正则预编译、按事件类型建索引），
+每个未解决事件按顺序匹配，第一条命中的规则决定告警或忽略；没有规则命中时按默认动作处理
+
+规则字段（均可省略，省略表示不限制）：
+    name            规则名称（用于日志）
+    statusType      事件类型，字符串或列表，不区分大小写，如 "Outage"、"Maintenance"、"Issue"
+    usersAffected   影响范围正则（不区分大小写，search 匹配）
+    message         事件描述正则（不区分大小写，search 匹配）
+    min_duration    事件已持续至少多少秒（按 epochStartDate 计算），数字
+    max_duration    事件已持续不超过多少秒，数字
+    action          "alert"（默认）或 "ignore"
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from event_tracker import is_event_active
+
+ALERT = 'alert'
+IGNORE = 'ignore'
+ACTIONS = (ALERT, IGNORE)
+RULE_FIELDS = frozenset({'name', 'statusType', 'usersAffected', 'message', 'min_duration', 'max_duration', 'action'})
+
+Check = Callable[[Dict[str, Any], float], bool]
+
+
+def _event_type(event: Dict[str, Any]) -> str:
+    if type(event) is not dict:
+        return event.type_key  # models.Event
+    return (event.get('statusType') or '').strip().lower()
+
+
+def _event_duration(event: Dict[str, Any], now: float) -> Optional[float]:
+    """事件已持续的秒数；缺少开始时间时返回 None"""
+    start = event.get('epochStartDate')
+    if not isinstance(start, (int, float)) or start <= 0:
+        return None
+    return now - start / 1000.0
+
+
+class CompiledRule:
+    """单条规则编译后的形式：若干个检查函数，全部通过即命中"""
+
+    __slots__ = ('index', 'name', 'action', 'status_types', 'checks', 'uses_time')
+
+    def __init__(self, index: int, name: str, action: str, status_types: Optional[frozenset],
+                 checks: Tuple[Check, ...], uses_time: bool):
+        self.index = index
+        self.name = name
+        self.action = action
+        self.status_types = status_types
+        self.checks = checks
+        self.uses_time = uses_time
+
+    def matches(self, event: Dict[str, Any], now: float) -> bool:
+        for check in self.checks:
+            if not check(event, now):
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"CompiledRule({self.name!r}, action={self.action!r})"
+
+
+def _regex_check(field: str, pattern: str, rule_name: str) -> Check:
+    if not isinstance(pattern, str):
+        raise ValueError(f"告警规则 {rule_name} 的 {field} 应为正则字符串: {pattern!r}")
+    try:
+        search = re.compile(pattern, re.IGNORECASE).search
+    except re.error as e:
+        raise ValueError(f"告警规则 {rule_name} 的 {field} 正则无效: {e}") from None
+
+    def check(event: Dict[str, Any], now: float) -> bool:
+        return search(event.get(field) or '') is not None
+    return check
+
+
+def _duration_check(min_duration: Optional[float], max_duration: Optional[float]) -> Check:
+    def check(event: Dict[str, Any], now: float) -> bool:
+        duration = _event_duration(event, now)
+        if duration is None:
+            return False
+        if min_duration is not None and duration < min_duration:
+            return False
+        if max_duration is not None and duration > max_duration:
+            return False
+        return True
+    return check
+
+
+def _duration_value(spec: Dict[str, Any], field: str, rule_name: str) -> Optional[float]:
+    """min_duration / max_duration：须为非负数字（秒），字符串（如 "30"）与布尔值均视为配置错误"""
+    value = spec.get(field)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not value >= 0:
+        raise ValueError(f"告警规则 {rule_name} 的 {field} 应为非负的秒数: {value!r}")
+    return float(value)
+
+
+def _status_types(values: Any, rule_name: str) -> frozenset:
+    """statusType：单个字符串或字符串列表，统一为小写、去空白的集合"""
+    if isinstance(values, str):
+        values = [values]
+    if (not isinstance(values, (list, tuple, set, frozenset)) or not values
+            or not all(isinstance(value, str) and value.strip() for value in values)):
+        raise ValueError(f"告警规则 {rule_name} 的 statusType 应为事件类型字符串或字符串列表: {values!r}")
+    return frozenset(value.strip().lower() for value in values)
+
+
+def compile_rule(spec: Dict[str, Any], index: int = 0) -> CompiledRule:
+    """编译单条规则，配置有误时抛出 ValueError"""
+    if not isinstance(spec, dict):
+        raise ValueError(f"第 {index + 1} 条告警规则应为字典: {spec!r}")
+    name = str(spec.get('name') or f"rule{index + 1}")
+    unknown = set(spec) - RULE_FIELDS
+    if unknown:
+        raise ValueError(f"告警规则 {name} 包含未知字段: {', '.join(sorted(unknown))}")
+    action = spec.get('action', ALERT)
+    if action not in ACTIONS:
+        raise ValueError(f"告警规则 {name} 的 action 应为 alert 或 ignore: {action!r}")
+
+    status_types = None
+    if spec.get('statusType') is not None:
+        status_types = _status_types(spec['statusType'], name)
+
+    checks: List[Check] = []
+    for field in ('usersAffected', 'message'):
+        if spec.get(field) is not None:
+            checks.append(_regex_check(field, spec[field], name))
+    min_duration = _duration_value(spec, 'min_duration', name)
+    max_duration = _duration_value(spec, 'max_duration', name)
+    if min_duration is not None and max_duration is not None and min_duration > max_duration:
+        raise ValueError(f"告警规则 {name} 的 min_duration 大于 max_duration，永远不会命中")
+    uses_time = min_duration is not None or max_duration is not None
+    if uses_time:
+        checks.append(_duration_check(min_duration, max_duration))
+    return CompiledRule(index, name, action, status_types, tuple(checks), uses_time)
+
+
+class AlertRuleSet:
+    """编译后的规则集，可直接作为评估规则 (event, now) -> bool 使用"""
+
+    def __init__(self, rules: Sequence[CompiledRule], default_action: str = ALERT):
+        if default_action not in ACTIONS:
+            raise ValueError(f"默认告警动作应为 alert 或 ignore: {default_action!r}")
+        self.rules = tuple(rules)
+        self.default_action = default_action
+        self.uses_time = any(rule.uses_time for rule in self.rules)
+        # 按事件类型预先筛出候选规则（保持声明顺序），匹配时只检查可能命中的规则
+        self._untyped = tuple(rule for rule in self.rules if rule.status_types is None)
+        self._by_type: Dict[str, Tuple[CompiledRule, ...]] = {}
+        for status_type in {t for rule in self.rules for t in (rule.status_types or ())}:
+            self._by_type[status_type] = tuple(
+                rule for rule in self.rules if rule.status_types is None or status_type in rule.status_types
+            )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, event: Dict[str, Any], now: float) -> Optional[CompiledRule]:
+        """返回第一条命中的规则，没有命中时返回 None"""
+        for rule in self._by_type.get(_event_type(event), self._untyped):
+            if rule.matches(event, now):
+                return rule
+        return None
+
+    def __call__(self, event: Dict[str, Any], now: float) -> bool:
+        """事件是否需要告警：须仍在进行，且命中的规则（或默认动作）为 alert"""
+        if not is_event_active(event):
+            return False
+        rule = self.match(event, now)
+        return (rule.action if rule is not None else self.default_action) == ALERT
+
+
+def compile_rules(specs: Optional[Iterable[Dict[str, Any]]], default_action: str = ALERT) -> Optional[AlertRuleSet]:
+    """编译配置中的规则列表；未配置规则时返回 None（沿用默认判断）"""
+    if not specs:
+        return None
+    return AlertRuleSet([compile_rule(spec, index) for index, spec in enumerate(specs)], default_action)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于 asyncio 的轻量 HTTP/1.1 客户端（仅标准库）
+只实现拉取状态数据所需的 GET：HTTPS、Content-Length/chunked、gzip、重定向与按主机复用的 keep-alive 连接；
+超时通过 asyncio.wait_for 实现，取消任务即可中断请求
+"""
+
+import asyncio
+import gzip
+import ssl
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+MAX_REDIRECTS = 3
+MAX_IDLE_PER_HOST = 4
+DEFAULT_HEADERS = {
+    'Accept': '*/*',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+class HttpError(Exception):
+    """HTTP 状态码错误或响应格式错误"""
+
+
+class AsyncResponse(NamedTuple):
+    url: str
+    status: int
+    headers: Dict[str, str]  # 键为小写
+    content: bytes
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(_charset(self.headers.get('content-type', '')), errors='replace')
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(f"HTTP {self.status}: {self.url}")
+
+
+def _charset(content_type: str) -> str:
+    for part in content_type.split(';'):
+        key, _, value = part.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"')
+    return 'utf-8'
+
+
+_Key = Tuple[str, str, int]  # (scheme, host, port)
+
+
+class AsyncHttpClient:
+    """可在多个监控器间共用的异步 HTTP 客户端（同一事件循环内）"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, ssl_context: Optional[ssl.SSLContext] = None):
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._ssl = ssl_context  # 未指定时在首次 HTTPS 连接时创建（加载 CA 证书较慢）
+        self._idle: Dict[_Key, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> AsyncResponse:
+        """GET 请求，timeout 为包括重定向在内的总耗时上限"""
+        return await asyncio.wait_for(self._get(url, headers or {}), timeout)
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> AsyncResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._request(url, headers)
+            location = response.headers.get('location')
+            if response.status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return response
+        raise HttpError(f"重定向次数过多: {url}")
+
+    async def _request(self, url: str, headers: Dict[str, str]) -> AsyncResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise HttpError(f"不支持的协议: {url}")
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        host = parts.hostname if port in (80, 443) else f"{parts.hostname}:{port}"
+        lines = [f"GET {target} HTTP/1.1", f"Host: {host}"]
+        lines += [f"{name}: {value}" for name, value in {**self.headers, **headers}.items()]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+        # 复用的空闲连接可能已被服务端关闭，此时换新连接重试一次
+        for reused in (True, False):
+            reader, writer = await self._connection(key, reused)
+            if reader is None:
+                continue
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, response_headers, content, keep_alive = await self._read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused:
+                    continue
+                raise HttpError(f"连接中断: {e}") from e
+            except BaseException:
+                writer.close()  # 超时/取消时连接状态未知，不再复用
+                raise
+            if keep_alive:
+                self._release(key, reader, writer)
+            else:
+                writer.close()
+            return AsyncResponse(url, status, response_headers, content)
+        raise HttpError(f"无法建立连接: {url}")
+
+    async def _connection(self, key: _Key, reused: bool):
+        if reused:
+            idle = self._idle.get(key)
+            while idle:
+                reader, writer = idle.pop()
+                if not writer.is_closing() and not reader.at_eof():
+                    return reader, writer
+                writer.close()
+            return None, None
+        scheme, hostname, port = key
+        if scheme != 'https':
+            return await asyncio.open_connection(hostname, port)
+        if self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        return await asyncio.open_connection(hostname, port, ssl=self._ssl, server_hostname=hostname)
+
+    def _release(self, key: _Key, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < MAX_IDLE_PER_HOST:
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def _read_response(self, reader: asyncio.StreamReader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError('服务端关闭了连接')
+        try:
+            version, status, _ = status_line.decode('latin-1').split(' ', 2)
+            status = int(status)
+        except ValueError:
+            raise HttpError(f"无效的状态行: {status_line[:80]!r}") from None
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';', 1)[0].strip(), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass  # 跳过 trailer
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+            keep_alive = True
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+            keep_alive = True
+        elif status in (204, 304) or 100 <= status < 200:
+            body = b''
+            keep_alive = True
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        connection = headers.get('connection', '').lower()
+        if connection == 'close' or (version == 'HTTP/1.0' and connection != 'keep-alive'):
+            keep_alive = False
+
+        encoding = headers.get('content-encoding', '').lower()
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        return status, headers, body, keep_alive
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+asyncio 版监控器
+check()/run() 均为协程，基于非阻塞的 AsyncHttpClient 拉取数据，可与其他监控器共用一个事件循环；
+取消运行 run() 的任务即可停止监控。通知发送与状态保存仍为阻塞操作，放到线程池中执行。
+同一事件循环中监控多个服务时，各监控器传入 target_service（状态文件按服务分开）；
+用 async with 或 await aclose() 释放资源，close() 仍为同步方法（供继承的 run_once() 使用）
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import metrics
+from async_http import AsyncHttpClient, AsyncResponse
+from log_policy import FULL
+from monitor import AppleStatusMonitor, logger, _log_to_queue, FETCH_HEADERS, FETCH_TIMEOUT
+
+
+class AsyncAppleStatusMonitor(AppleStatusMonitor):
+    """Apple Developer System Status 监控器（asyncio 版）
+
+    与线程版的区别：
+    - 不使用跨进程共享缓存（其文件锁会阻塞事件循环），多个监控器共用 http_client 即可复用连接
+    - 不启动指标端点与按检测性能分析，由宿主服务负责
+    - 不与命令行、GUI 共用 state.json 与归档目录：未传入 state_file 时按服务使用 state/standalone-<服务>.json
+    - 释放资源用协程 aclose()（或 async with），同步的 close() 不关闭自建的异步 HTTP 客户端
+    """
+
+    standalone = True
+
+    def __init__(self, *args, target_service: Optional[str] = None, state_file: Optional[Path] = None,
+                 http_client: Optional[AsyncHttpClient] = None, executor: Optional[Executor] = None, **kwargs):
+        super().__init__(*args, target_service=target_service, state_file=state_file, **kwargs)
+        self.shared_cache = None
+        self.http_client = http_client or AsyncHttpClient()
+        self._owns_client = http_client is None
+        self.executor = executor  # None 时使用事件循环的默认线程池
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def check(self) -> Dict[str, Any]:
+        """执行一次检测并发送通知，返回与线程版相同结构的检测结果"""
+        check_time = self._begin_check()
+        if self.status_data_url:
+            self._last_data = None
+            payload, data, last_error = await self._download_status_data_async()
+            result = self._status_from_data(data, last_error)
+        else:
+            result = self._fetch_status_from_api()  # 仅返回配置错误，不会发起请求
+        # 任务在此处被取消时，已提交的通知与状态保存仍会在线程池中完成
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._finish_check, result, check_time)
+
+    async def _download_status_data_async(self) -> Tuple[Optional[str], Optional[Dict[str, Any]],
+                                                         Optional[Exception]]:
+        """异步请求状态数据接口（含重试）；异步客户端一次读完响应，http_wait 包含正文下载"""
+        timer = self._phase_timer
+        last_error = None
+
+        for attempt in range(1, self.retry_count + 1):
+            if attempt > 1:
+                metrics.FETCH_RETRIES.inc()
+            try:
+                with timer.phase('http_wait'):
+                    if self.hedger is None:
+                        response = await self._request_status_data_async(self.status_data_url)
+                    else:
+                        response, hedged, hedge_won = await self.hedger.call_async(
+                            self._request_status_data_async, self.status_data_url, self.hedge_url)
+                        if hedged:
+                            logger.info(f"状态数据接口响应较慢，已发出对冲请求（{'对冲请求' if hedge_won else '首个请求'}先完成）")
+                payload, data = self._parse_payload(response.content, response.text)
+                return payload, data, None
+            except Exception as e:
+                last_error = e
+                metrics.FETCH_FAILURES.inc()
+                logger.warning(f"调用状态数据接口失败 (尝试 {attempt}/{self.retry_count}): {e!r}")
+                if attempt < self.retry_count:
+                    with timer.phase('retry_wait'):
+                        await asyncio.sleep(self.retry_delay)
+
+        return None, None, last_error
+
+    async def _request_status_data_async(self, url: str) -> AsyncResponse:
+        response = await self.http_client.get(url, headers=FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response
+
+    async def run(self):
+        """运行监控循环，直到 stop() 被调用或任务被取消"""
+        self._running = True
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._log_startup()
+        try:
+            while self._running and (self.stop_event is None or not self.stop_event.is_set()):
+                try:
+                    await self.check()
+                except Exception as e:
+                    # 单次检测的异常不结束循环，避免一个监控器拖垮同一事件循环中的其他任务
+                    error_msg = f"检测过程发生未预期错误: {e}"
+                    logger.error(error_msg, exc_info=True)
+                    _log_to_queue(self.log_queue, 'ERROR', error_msg)
+                if self.log_policy == FULL:
+                    wait_msg = f"等待 {self.check_interval}秒后进行下次检测..."
+                    logger.info(wait_msg)
+                    _log_to_queue(self.log_queue, 'INFO', wait_msg)
+                self.heartbeat.beat('sleep', self.check_interval + self.watchdog_grace)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.check_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            stop_msg = "监控已停止"
+            logger.info(stop_msg)
+            _log_to_queue(self.log_queue, 'INFO', stop_msg)
+        except asyncio.CancelledError:
+            stop_msg = "监控已停止（任务已取消）"
+            logger.info(stop_msg)
+            _log_to_queue(self.log_queue, 'INFO', stop_msg)
+            raise
+        finally:
+            self._running = False
+            self._wake = None
+            self._flush_log_rollup()
+            self.heartbeat.remove()
+            await self.aclose()
+
+    def stop(self):
+        """停止监控（可在其他线程调用），正在等待下次检测的 run() 会立即返回"""
+        super().stop()
+        wake, loop = self._wake, self._loop
+        if wake is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def aclose(self):
+        """释放归档线程、通知渠道、同步 HTTP 连接与自建的异步 HTTP 客户端"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.close)
+        if self._owns_client:
+            await self.http_client.close()
+
+    async def __aenter__(self) -> 'AsyncAppleStatusMonitor':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+async def run_monitors(*monitors: AsyncAppleStatusMonitor):
+    """在当前事件循环中并发运行多个监控器，任一任务取消时全部停止"""
+    await asyncio.gather(*(monitor.run() for monitor in monitors))
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(AsyncAppleStatusMonitor().run())
+    except KeyboardInterrupt:
+        pass
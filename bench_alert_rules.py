@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+告警规则性能测试
+生成若干条规则与事件，测量规则编译耗时以及每个事件的平均匹配耗时
+用法: python bench_alert_rules.py [规则数 ...]
+"""
+
+import random
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from alert_rules import compile_rules
+
+STATUS_TYPES = ['Outage', 'Maintenance', 'Issue', 'Performance']
+WORDS = ['purchase', 'subscription', 'receipt', 'sandbox', 'refund', 'renewal', 'billing', 'storekit']
+
+
+def make_rules(count, rng):
+    """前面是按类型/正则/持续时间组合的规则，最后一条兜底，确保每个事件都要扫描较多规则"""
+    rules = []
+    for i in range(count - 1):
+        rule = {'name': f'rule{i}', 'action': rng.choice(['alert', 'ignore'])}
+        if rng.random() < 0.7:
+            rule['statusType'] = rng.choice(STATUS_TYPES)
+        if rng.random() < 0.5:
+            rule['message'] = rf"\b{rng.choice(WORDS)}-{i}\b"  # 几乎不会命中，迫使继续向后匹配
+        if rng.random() < 0.3:
+            rule['usersAffected'] = r'all users|some users'
+        if rng.random() < 0.3:
+            rule['min_duration'] = rng.randint(60, 3600)
+        rules.append(rule)
+    rules.append({'name': 'fallback', 'action': 'alert'})
+    return rules
+
+
+def make_events(count, rng, now):
+    events = []
+    for i in range(count):
+        events.append({
+            'messageId': str(i),
+            'statusType': rng.choice(STATUS_TYPES),
+            'eventStatus': 'ongoing',
+            'epochStartDate': int((now - rng.randint(0, 7200)) * 1000),
+            'epochEndDate': None,
+            'usersAffected': rng.choice(['Some users are affected', 'All users are affected']),
+            'message': f"Users may experience issues with {' '.join(rng.sample(WORDS, 3))}."
+        })
+    return events
+
+
+def bench(rule_count, events, now, rng):
+    specs = make_rules(rule_count, rng)
+    started = time.perf_counter()
+    rules = compile_rules(specs)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    rounds = 5
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for event in events:
+            rules(event, now)
+    per_event_us = (time.perf_counter() - started) / (rounds * len(events)) * 1e6
+    print(f"{rule_count:>6} 条规则  编译 {compile_ms:8.2f} ms  每个事件 {per_event_us:8.2f} µs")
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100, 500, 1000]
+    rng = random.Random(42)
+    now = time.time()
+    events = make_events(2000, rng, now)
+    print("=" * 60)
+    print(f"告警规则性能测试（{len(events)} 个事件）")
+    print("=" * 60)
+    for count in counts:
+        bench(count, events, now, rng)
+
+
+if __name__ == "__main__":
+    main()
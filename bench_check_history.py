@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检测历史性能测试
+生成每分钟一条的检测历史文件，测量读取（含校验）与按画布宽度降采样的耗时；
+目标：一年的历史读取、校验与降采样共计 100ms 以内（GUI 打开「历史记录」时在主线程完成）
+用法: python bench_check_history.py [天数 ...]
+"""
+
+import random
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from check_history import CheckHistory, RECORD, AVAILABLE, UNAVAILABLE, UNKNOWN
+
+SERVICE = 'App Store - In-App Purchases'
+WIDTH = 1200  # 时间线画布宽度（像素）
+TARGET_MS = 100.0
+
+
+def make_history(history: CheckHistory, days: int, rng: random.Random, now: float):
+    """每分钟一条；偶尔出现持续数十分钟的异常与未知状态"""
+    start = now - days * 86400
+    status, remaining = AVAILABLE, 0
+    records = []
+    for minute in range(days * 1440):
+        if remaining == 0:
+            status = AVAILABLE
+            if rng.random() < 0.001:
+                status, remaining = rng.choice([UNAVAILABLE, UNKNOWN]), rng.randint(5, 90)
+        else:
+            remaining -= 1
+        records.append((start + minute * 60, rng.uniform(0.05, 0.6), status))
+    path = history.path_for(SERVICE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b''.join(RECORD.pack(*record) for record in records))
+    return start
+
+
+def bench(history: CheckHistory, days: int, rng: random.Random, now: float, rounds: int = 5) -> float:
+    start = make_history(history, days, rng, now)
+    load_ms, downsample_ms = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        series = history.load(SERVICE)
+        loaded = time.perf_counter()
+        series.downsample(start, now, WIDTH)
+        finished = time.perf_counter()
+        load_ms.append((loaded - started) * 1000)
+        downsample_ms.append((finished - loaded) * 1000)
+    load, downsample = min(load_ms), min(downsample_ms)
+    print(f"{days:>5} 天  {len(series):>8} 条  读取与校验 {load:7.2f} ms  降采样 {downsample:6.2f} ms  "
+          f"合计 {load + downsample:7.2f} ms")
+    return load + downsample
+
+
+def main():
+    days_list = [int(arg) for arg in sys.argv[1:]] or [1, 30, 365]
+    rng = random.Random(42)
+    now = time.time()
+    print("=" * 60)
+    print(f"检测历史性能测试（画布宽度 {WIDTH}，取 5 次中最快的一次）")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as temp:
+        history = CheckHistory(temp)
+        results = {days: bench(history, days, rng, now) for days in days_list}
+    if 365 in results:
+        ok = results[365] <= TARGET_MS
+        print(f"\n一年的历史: {results[365]:.1f} ms（目标 {TARGET_MS:g} ms 以内）{'✅' if ok else '❌'}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
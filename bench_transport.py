@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 传输后端性能测试
+每个后端在独立的子进程中测量（保证冷启动）：导入并创建后端的耗时、对本地桩服务的请求延迟、进程常驻内存
+用法: python bench_transport.py [请求次数] [后端 ...]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def _rss_mb() -> float:
+    """当前常驻内存（Linux 读 /proc，其他平台退回到峰值）"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def make_payload(services: int = 60) -> bytes:
+    """与苹果状态接口结构相近的 JSONP 数据"""
+    items = []
+    for i in range(services):
+        events = [{
+            'usersAffected': 'Some users are affected', 'epochStartDate': 1733700000000 + j,
+            'epochEndDate': None, 'messageId': f"{i}{j}", 'statusType': 'Issue',
+            'datePosted': '12/09/2025 09:00 PST', 'startDate': '12/09/2025 08:50 PST', 'endDate': '',
+            'affectedServices': None, 'eventStatus': 'resolved', 'message': 'Users may have experienced issues. ' * 4
+        } for j in range(i % 4)]
+        items.append({'serviceName': f"Service {i}", 'redirectUrl': None, 'events': events})
+    data = {'drpost': False, 'drMessage': None, 'services': items}
+    return f"jsonCallback({json.dumps(data)});".encode('utf-8')
+
+
+def child(backend: str, url: str, count: int):
+    baseline = _rss_mb()
+    started = time.perf_counter()
+    import transport
+    client = transport.create_transport(backend)
+    import_ms = (time.perf_counter() - started) * 1000
+    imported = _rss_mb()
+
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = client.get(url, {'User-Agent': 'bench'}, timeout=10)
+        response.raise_for_status()
+        size = len(response.content)
+        latencies.append((time.perf_counter() - started) * 1000)
+    client.close()
+    first, rest = latencies[0], sorted(latencies[1:]) or latencies
+    print(json.dumps({
+        'backend': backend,
+        'import_ms': import_ms,
+        'first_ms': first,
+        'p50_ms': rest[len(rest) // 2],
+        'p95_ms': rest[min(len(rest) - 1, int(len(rest) * 0.95))],
+        'import_mb': imported - baseline,
+        'total_mb': _rss_mb() - baseline,
+        'bytes': size,
+    }))
+
+
+def main():
+    from transport import BACKENDS
+    from webhook_stub import StubWebhookServer
+
+    args = sys.argv[1:]
+    count = int(args.pop(0)) if args and args[0].isdigit() else 200
+    backends = args or list(BACKENDS)
+
+    stub = StubWebhookServer()
+    stub.get_body = make_payload()
+    stub.start()
+    url = f"{stub.url}/system_status_en_US.js"
+    print(f"桩服务: {url}（{len(stub.get_body) / 1024:.0f} KB），每个后端 {count} 次请求\n")
+    print(f"{'后端':12} {'导入+创建':>10} {'首次请求':>9} {'p50':>8} {'p95':>8} {'导入内存':>9} {'总内存':>8}")
+    try:
+        for backend in backends:
+            rounds = []
+            for _ in range(3):  # 导入耗时受磁盘缓存影响，取 3 个子进程中的最小值
+                output = subprocess.run([sys.executable, __file__, '--child', backend, url, str(count)],
+                                        capture_output=True, text=True, check=True).stdout
+                rounds.append(json.loads(output.strip().splitlines()[-1]))
+            best = min(rounds, key=lambda item: item['import_ms'])
+            print(f"{backend:12} {best['import_ms']:8.1f}ms {best['first_ms']:7.2f}ms "
+                  f"{min(r['p50_ms'] for r in rounds):6.3f}ms {min(r['p95_ms'] for r in rounds):6.3f}ms "
+                  f"{best['import_mb']:7.1f}MB {best['total_mb']:6.1f}MB")
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main()
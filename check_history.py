@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检测历史
+每次检测向 <目录>/<服务名>.bin 追加一条定长记录：时间戳（float64，Unix 秒）、拉取耗时（float32，秒，未拉取为 NaN）、状态（uint8）
+每条 13 字节，一年的每分钟检测约 6.5 MB；记录按时间有序，时间范围用二分查找定位，
+某一段的状态可按步长切片直接取出（C 层完成），绘制时间线时不必逐条解包。
+追加时持有文件锁（GUI 与命令行监控可能同时写同一个文件），先截掉写入中断留下的半条记录再写，
+时间戳早于最后一条的记录按最后一条的时间写入，保证文件始终按记录对齐、按时间有序；
+读取时仍会跳过无效记录（旧版本写入中断后错位的部分），并在顺序错乱时重新排序
+"""
+
+import bisect
+import math
+import os
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import quote, unquote
+
+RECORD = struct.Struct('<dfB')
+RECORD_SIZE = RECORD.size
+STATUS_OFFSET = 12  # 记录中状态字节的位置
+
+UNKNOWN = 0
+AVAILABLE = 1
+UNAVAILABLE = 2
+STATUS_CODES = {'Available': AVAILABLE, 'Unavailable': UNAVAILABLE}
+STATUS_NAMES = {UNKNOWN: 'Unknown', AVAILABLE: 'Available', UNAVAILABLE: 'Unavailable'}
+EMPTY = -1  # 降采样时没有任何检测的时间段
+READ_CHUNK = 4096  # 流式读取时每次读入的记录数（约 52 KB）
+MAX_TIMESTAMP = 4102444800.0  # 2100-01-01；错位的记录解出的时间戳通常远超出合理范围
+MAX_LATENCY = 3600.0
+KNOWN_STATUSES = bytes(range(UNAVAILABLE + 1))
+
+
+def status_code(status: Optional[str]) -> int:
+    """状态字符串 -> 记录中的状态码（None 与未知状态记为 UNKNOWN）"""
+    return STATUS_CODES.get(status, UNKNOWN)
+
+
+def is_valid_record(timestamp: float, latency: float, status: int) -> bool:
+    """记录是否可信：状态码已知、时间戳与拉取耗时在合理范围内（NaN 耗时表示未拉取）"""
+    return (status <= UNAVAILABLE and 0 < timestamp < MAX_TIMESTAMP
+            and (math.isnan(latency) or 0 <= latency < MAX_LATENCY))
+
+
+if sys.platform == 'win32':
+    import msvcrt
+
+    def _lock_file(fd: int):
+        # msvcrt.locking 锁定当前位置起的字节，统一锁第 0 字节
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK 重试约 10 秒后仍失败会抛出异常，继续等待
+                continue
+
+    def _unlock_file(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_file(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _timestamp_array(data) -> array:
+    """取出所有记录的时间戳：按步长切片把每条记录的 8 个时间戳字节拼成连续的 float64（C 层完成，不逐条解包）"""
+    count = len(data) // RECORD_SIZE
+    raw = bytearray(8 * count)
+    for offset in range(8):
+        raw[offset::8] = data[offset:count * RECORD_SIZE:RECORD_SIZE]
+    timestamps = array('d', raw)
+    if sys.byteorder != 'little':
+        timestamps.byteswap()
+    return timestamps
+
+
+class _Timestamps:
+    """按下标读取记录时间戳的只读序列，供 bisect 直接在原始字节上二分"""
+
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __len__(self) -> int:
+        return len(self._data) // RECORD_SIZE
+
+    def __getitem__(self, index: int) -> float:
+        return RECORD.unpack_from(self._data, index * RECORD_SIZE)[0]
+
+
+class _FileTimestamps(_Timestamps):
+    """直接在文件上二分：每次比较只读取 8 字节，定位时间范围不需要把文件读入内存"""
+
+    __slots__ = ('_count',)
+
+    def __init__(self, f, count: int):
+        super().__init__(f)
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> float:
+        self._data.seek(index * RECORD_SIZE)
+        return struct.unpack('<d', self._data.read(8))[0]
+
+
+class CheckRecord(NamedTuple):
+    service: str
+    timestamp: float
+    latency: Optional[float]  # 秒
+    status: int
+
+
+class Transition(NamedTuple):
+    service: str
+    timestamp: float
+    old_status: Optional[int]  # None 表示此前没有记录
+    new_status: int
+
+
+class HistorySeries:
+    """单个服务的检测记录（内存中的原始字节），支持追加、按时间定位与降采样"""
+
+    def __init__(self, data: bytes = b''):
+        # 文件末尾可能有写入中断留下的半条记录，丢弃
+        self._data = bytearray(data[:len(data) - len(data) % RECORD_SIZE])
+        self._timestamps = _Timestamps(self._data)
+        self._repair(data)
+
+    def _repair(self, data: bytes):
+        """去掉无效记录并重新对齐、按时间排序（二分查找要求有序）；正常的文件只做一次扫描"""
+        if not self._data:
+            return
+        # 快速检查：状态码都已知（删去已知状态码后为空）、时间戳有序且在合理范围内
+        if not self._data[STATUS_OFFSET::RECORD_SIZE].translate(None, KNOWN_STATUSES):
+            timestamps = _timestamp_array(self._data).tolist()
+            # NaN 会让排序与比较失效，先用求和排除（任一为 NaN 时和为 NaN）
+            if (not math.isnan(sum(timestamps)) and 0 < timestamps[0] and timestamps[-1] < MAX_TIMESTAMP
+                    and timestamps == sorted(timestamps)):
+                return
+        valid = []
+        position, last = 0, len(data) - RECORD_SIZE
+        while position <= last:
+            record = RECORD.unpack_from(data, position)
+            if is_valid_record(*record):
+                valid.append(record)
+                position += RECORD_SIZE
+            else:
+                # 写入中断后的记录整体错位：逐字节向后寻找下一条有效记录
+                position += 1
+        valid.sort(key=lambda record: record[0])
+        self._data[:] = b''.join(RECORD.pack(*record) for record in valid)
+
+    def __len__(self) -> int:
+        return len(self._data) // RECORD_SIZE
+
+    def append(self, timestamp: float, status: int, latency: Optional[float] = None):
+        """追加一条记录；早于最后一条的时间戳按最后一条记录的时间追加，保持有序"""
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            timestamp = last
+        self._data += RECORD.pack(timestamp, math.nan if latency is None else latency, status)
+
+    def record(self, index: int):
+        """(时间戳, 拉取耗时或 None, 状态码)"""
+        timestamp, latency, status = RECORD.unpack_from(self._data, index * RECORD_SIZE)
+        return timestamp, None if math.isnan(latency) else latency, status
+
+    @property
+    def first_timestamp(self) -> Optional[float]:
+        return self._timestamps[0] if self._data else None
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        return self._timestamps[len(self) - 1] if self._data else None
+
+    def index_at(self, timestamp: float) -> int:
+        """第一条时间戳 >= timestamp 的记录下标"""
+        return bisect.bisect_left(self._timestamps, timestamp)
+
+    def worst_status(self, lo: int, hi: int) -> int:
+        """下标 [lo, hi) 内最严重的状态：Unavailable > Unknown > Available，没有记录时为 EMPTY
+        （全部为 Available 才算 Available，无法识别的状态码按 Unknown 处理）"""
+        if hi <= lo:
+            return EMPTY
+        statuses = self._data[lo * RECORD_SIZE + STATUS_OFFSET:hi * RECORD_SIZE:RECORD_SIZE]
+        if UNAVAILABLE in statuses:
+            return UNAVAILABLE
+        if statuses.count(AVAILABLE) == len(statuses):
+            return AVAILABLE
+        return UNKNOWN
+
+    def downsample(self, start: float, end: float, width: int) -> List[int]:
+        """把 [start, end) 等分为 width 段，返回每段最严重的状态
+        （按段取极值而不是取平均或抽样：一次很短的异常在一年的时间线上也会占据一个像素，不会被平均掉）"""
+        width = max(1, int(width))
+        step = (end - start) / width
+        bounds = [self.index_at(start + step * column) for column in range(width)]
+        bounds.append(self.index_at(end))
+        return [self.worst_status(bounds[column], bounds[column + 1]) for column in range(width)]
+
+
+class CheckHistory:
+    """按服务保存检测历史；append 可在多个线程、多个进程中调用"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+
+    def path_for(self, service: str) -> Path:
+        return self.directory / f"{quote(service, safe='')}.bin"
+
+    def services(self) -> List[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(unquote(path.stem) for path in self.directory.glob('*.bin'))
+
+    def append(self, service: str, timestamp: float, status: Optional[str], latency: Optional[float] = None):
+        latency = math.nan if latency is None else latency
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path_for(service), os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+            try:
+                _lock_file(fd)
+                try:
+                    size = os.fstat(fd).st_size
+                    end = size - size % RECORD_SIZE
+                    if end != size:
+                        # 上次写入中断留下的半条记录：不截掉的话之后追加的记录全部错位
+                        os.ftruncate(fd, end)
+                    if end:
+                        os.lseek(fd, end - RECORD_SIZE, os.SEEK_SET)
+                        last = RECORD.unpack(os.read(fd, RECORD_SIZE))[0]
+                        if last > timestamp and is_valid_record(last, math.nan, UNKNOWN):
+                            # 另一个进程刚写入了稍晚的检测，按其时间写入以保持有序
+                            timestamp = last
+                    os.lseek(fd, end, os.SEEK_SET)
+                    os.write(fd, RECORD.pack(timestamp, latency, status_code(status)))
+                finally:
+                    _unlock_file(fd)
+            finally:
+                os.close(fd)
+
+    def load(self, service: str) -> HistorySeries:
+        try:
+            return HistorySeries(self.path_for(service).read_bytes())
+        except FileNotFoundError:
+            return HistorySeries()
+
+    def load_all(self) -> Dict[str, HistorySeries]:
+        return {service: self.load(service) for service in self.services()}
+
+    def iter_records(self, service: str, start: Optional[float] = None, end: Optional[float] = None,
+                     include_previous: bool = False) -> Iterator[CheckRecord]:
+        """按时间顺序流式读取 [start, end) 内的记录，内存占用与历史长短无关（跳过无效记录）；
+        include_previous 时先给出 start 之前的最后一条（用于判断范围内第一条是否为状态变化）"""
+        try:
+            f = open(self.path_for(service), 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            # 只读到打开时的文件末尾，导出过程中新追加的记录不影响本次结果
+            count = os.fstat(f.fileno()).st_size // RECORD_SIZE
+            index = bisect.bisect_left(_FileTimestamps(f, count), start) if start is not None else 0
+            if include_previous and index > 0:
+                index -= 1
+            f.seek(index * RECORD_SIZE)
+            remaining = count - index
+            while remaining > 0:
+                chunk = f.read(min(remaining, READ_CHUNK) * RECORD_SIZE)
+                if not chunk:
+                    return
+                remaining -= len(chunk) // RECORD_SIZE
+                for timestamp, latency, status in RECORD.iter_unpack(chunk):
+                    if not is_valid_record(timestamp, latency, status):
+                        continue
+                    if end is not None and timestamp >= end:
+                        return
+                    yield CheckRecord(service, timestamp, None if math.isnan(latency) else latency, status)
+
+    def iter_transitions(self, service: str, start: Optional[float] = None,
+                         end: Optional[float] = None) -> Iterator[Transition]:
+        """[start, end) 内的状态变化（与 start 之前的最后一次检测比较）"""
+        last = None
+        for record in self.iter_records(service, start, end, include_previous=True):
+            if start is None or record.timestamp >= start:
+                if record.status != last:
+                    yield Transition(service, record.timestamp, last, record.status)
+            last = record.status
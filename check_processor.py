@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单个服务检测结果的处理流程
+评估之后的公共步骤：记录指标与日志、无法判断时通知、按事件变化（新增/更新/解决）与服务名模糊匹配通知。
+单服务监控器（monitor.py，含 GUI 与 asyncio 版）与多定义运行器（supervisor.py）共用；
+日志输出与通知发送由调用方通过回调提供，状态文件由调用方保存（事件明细与模糊匹配结果见 to_state）
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+from evaluation import EventRule, default_rule
+from event_tracker import EventDelta, EventTracker, delta_notification, RESOLVED
+from profiling import PhaseTimer
+from service_match import is_fuzzy_match, fuzzy_match_notification
+
+# (subject, body, error_type, service) -> 各渠道的发送结果
+NotifyCallback = Callable[[str, str, Optional[str], str], Dict[str, Any]]
+# (日志级别, 消息, 服务名)
+LogCallback = Callable[[int, str, str], None]
+
+
+class CheckProcessor:
+    """按服务处理检测结果：跟踪事件、生成并发送通知；可在多个线程中处理不同的服务"""
+
+    def __init__(self, rules: Optional[EventRule], notify: NotifyCallback, log: LogCallback,
+                 state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.rules = rules or default_rule
+        self.notify = notify
+        self.log = log
+        self.event_tracker = EventTracker(state.get('events'))
+        self.matched_services: Dict[str, str] = dict(state.get('matched_services') or {})  # 已通知过的模糊匹配结果
+
+    def to_state(self) -> Dict[str, Any]:
+        """需要写入状态文件的部分"""
+        return {'events': self.event_tracker.to_dict(), 'matched_services': dict(self.matched_services)}
+
+    def load_state(self, state: Dict[str, Any]):
+        """换用状态文件中的事件与模糊匹配结果（另一个进程写入了更新的状态时）"""
+        self.event_tracker = EventTracker(state.get('events'))
+        self.matched_services = dict(state.get('matched_services') or {})
+
+    def process(self, service: str, result: Dict[str, Any], now: Optional[float] = None,
+                last_status: Optional[str] = None, quiet: bool = False,
+                timer: Optional[PhaseTimer] = None) -> Dict[str, Any]:
+        """处理一个服务的检测结果（CheckResult.to_dict 格式），填入 notifications / deltas 后返回；
+        last_status 为上次保存的状态，quiet 时正常状态不输出日志"""
+        status, error_type = result['status'], result['error_type']
+        metrics.CHECKS_TOTAL.inc(result=(status or 'Unknown').lower())
+        metrics.SERVICE_STATUS.set(metrics.SERVICE_STATUS_VALUES.get(status, -1), service=service)
+        if error_type:
+            metrics.CHECK_FAILURES.inc(error_type=error_type)
+
+        if status is None:
+            # 接口或配置问题：无法判断时每次检测都通知
+            self.log(logging.ERROR, f"检测失败: {result['error_message']}", service)
+            result['notifications'] = [self.notify(f"⚠️ {error_type} - {service}", result['error_message'],
+                                                   error_type, service)]
+            return result
+
+        if status == 'Unavailable':
+            self.log(logging.WARNING, f"服务状态异常: {result['error_message']}", service)
+        elif not quiet:
+            self.log(logging.INFO, f"服务状态正常: {status}", service)
+
+        # 按事件变化（新增/更新/解决）逐条通知，而不是比较整体状态
+        now = time.time() if now is None else now
+        with timer.phase('event_diff') if timer else nullcontext():
+            deltas = self._diff_events(service, result.get('events') or [], now, last_status)
+        result['notifications'] = [self._notify_delta(service, delta) for delta in deltas]
+        match_notification = self._check_service_match(service, result.get('matched'), result.get('score'))
+        if match_notification:
+            result['notifications'].insert(0, match_notification)
+        result['deltas'] = [delta.to_dict() for delta in deltas]
+        return result
+
+    def _diff_events(self, service: str, events, now: float, last_status: Optional[str]) -> List[EventDelta]:
+        first_seen = not self.event_tracker.has_baseline(service)
+        rules = self.rules
+        deltas = self.event_tracker.diff(service, events, lambda event: rules(event, now))
+        if first_seen and last_status == 'Unavailable':
+            # 旧版状态文件没有事件明细：上次已告警过，本次仅建立基线，避免重复告警
+            self.log(logging.INFO, "状态文件中没有事件记录，已以当前事件建立基线", service)
+            return []
+        return deltas
+
+    def _notify_delta(self, service: str, delta: EventDelta) -> Dict[str, Any]:
+        recovered = not self.event_tracker.alerting(service)
+        subject, body, error_type = delta_notification(delta, service, recovered)
+        self.log(logging.WARNING if delta.kind != RESOLVED else logging.INFO,
+                 f"事件变化 [{delta.kind}]: {delta.summary}", service)
+        return self.notify(subject, body, error_type, service)
+
+    def _check_service_match(self, service: str, matched: Optional[str],
+                             score: Optional[float]) -> Optional[Dict[str, Any]]:
+        """服务按模糊匹配对应到其他名称时记录并通知（同一名称只通知一次）"""
+        if not is_fuzzy_match(service, matched):
+            self.matched_services.pop(service, None)
+            return None
+        if self.matched_services.get(service) == matched:
+            return None
+        self.matched_services[service] = matched
+        subject, body, error_type = fuzzy_match_notification(service, matched, score)
+        self.log(logging.WARNING, body.splitlines()[0], service)
+        return self.notify(subject, body, error_type, service)
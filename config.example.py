@@ -8,10 +8,79 @@
 MONITOR_URL = "https://developer.apple.com/system-status/"
 TARGET_SERVICE = "App Store - In-App Purchases"
 STATUS_DATA_URL = "https://www.apple.com/support/systemstatus/data/developer/system_status_en_US.js"
+SERVICE_MATCH_THRESHOLD = 0.9  # 服务名精确匹配失败时，模糊匹配（忽略空白与连字符）的最低相似度（0-1）；匹配后会发送通知
 CHECK_INTERVAL = 600  # 检测间隔（秒），10分钟 = 600秒
 RETRY_COUNT = 3  # 请求失败重试次数
 RETRY_DELAY = 5  # 重试间隔（秒）
 
+# 拉取状态数据使用的 HTTP 后端：requests（默认）、http.client（仅标准库，启动最快）、urllib3、async
+HTTP_BACKEND = "requests"
+
+# 对冲请求：首个请求超过近期耗时的 FETCH_HEDGE_PERCENTILE 分位数仍未完成时再发一个，取先完成的结果
+FETCH_HEDGE_ENABLED = True
+FETCH_HEDGE_PERCENTILE = 0.9
+FETCH_HEDGE_INITIAL_DELAY = 2.0  # 样本不足 10 个时的对冲延迟（秒）
+FETCH_HEDGE_MIN_DELAY = 0.2  # 对冲延迟下限（秒）
+FETCH_HEDGE_URL = None  # 对冲请求的备用地址（需返回相同数据），未设置时重复请求 STATUS_DATA_URL
+
+# 告警规则（可选）：按顺序匹配未解决事件，第一条命中的规则决定 alert/ignore，字段说明见 alert_rules.py
+# 默认为空：所有未解决事件都会告警；以下示例按需取消注释
+ALERT_RULES = [
+    # {'name': '忽略计划维护', 'statusType': 'Maintenance', 'action': 'ignore'},
+    # {'name': '短暂问题', 'statusType': 'Issue', 'max_duration': 300, 'action': 'ignore'},  # 持续不足 5 分钟的问题暂不告警
+    # {'name': '部分用户', 'usersAffected': r'\bsome users\b', 'message': r'purchase|subscription'},
+]
+ALERT_RULES_DEFAULT_ACTION = "alert"  # 没有规则命中时的动作：alert 或 ignore
+
+# 跨进程共享缓存：同时运行 CLI 与多个 GUI 时只由一个进程拉取接口，其余复用
+SHARED_CACHE_ENABLED = True
+SHARED_CACHE_DIR = None  # 缓存文件目录，默认与 state.json 相同
+# 多个进程共用 state.json 时，处理检测结果并写回状态前等待文件锁的最长秒数（超时后不加锁继续）
+STATE_LOCK_TIMEOUT = 30
+
+# 接口原始数据归档：每份不同的数据按内容哈希压缩保存一次，index.jsonl 记录每次检测对应的哈希
+PAYLOAD_ARCHIVE_ENABLED = True
+PAYLOAD_ARCHIVE_DIR = None  # 默认为程序目录下的 archive/
+PAYLOAD_ARCHIVE_COMPRESSION = "gzip"  # gzip 或 lzma
+
+# 检测历史：每次检测追加一条 13 字节的记录（时间、拉取耗时、状态），GUI 历史时间线读取
+CHECK_HISTORY_ENABLED = True
+CHECK_HISTORY_DIR = None  # 默认为程序目录下的 history/
+
+# 数据接口健康度：拉取耗时与数据大小的近期水平（EWMA）持续偏离历史基线（p50 / p95）时，发出低优先级的"数据接口降级"信号
+FEED_HEALTH_ENABLED = True
+FEED_HEALTH_NOTIFY = True  # 是否发送通知（级别为 info，订阅中可按级别过滤）；关闭后仍记录日志并在 GUI 显示
+FEED_HEALTH_SUSTAIN = 3  # 连续偏离（或恢复）多少次检测后才切换状态
+FEED_HEALTH_LATENCY_FACTOR = 2.0  # 拉取耗时超过基线 p50 的倍数（同时需超过 p95）
+FEED_HEALTH_SIZE_TOLERANCE = 0.5  # 数据大小偏离基线 p50 的比例
+
+# 看门狗：检测线程在某个阶段（拉取、通知、等待）超过该阶段的最长耗时 + WATCHDOG_GRACE 仍无进展时，
+# 记录其调用栈、发送通知，并使用新的 HTTP 会话与线程继续检测
+WATCHDOG_ENABLED = True
+WATCHDOG_GRACE = 60  # 各阶段期限之外额外允许的秒数
+WATCHDOG_POLL_INTERVAL = 5  # 看门狗检查间隔（秒）
+WATCHDOG_HEARTBEAT_FILE = None  # 心跳文件，例如 "heartbeat.json"，供外部程序判断进程是否存活（见 README）
+
+# 日志预算：summary（默认）时状态保持正常的检测不逐次输出，每隔 LOG_ROLLUP_INTERVAL 秒输出一行汇总；
+# 状态变化、检测失败与发送通知仍输出完整总结。full 为逐次输出完整日志（排查问题时使用）
+LOG_POLICY = "summary"
+LOG_ROLLUP_INTERVAL = 3600  # 汇总间隔（秒）
+
+# 指标端点（Prometheus 文本格式），设为 None 关闭
+METRICS_HOST = "127.0.0.1"  # 仅监听本机
+METRICS_PORT = None  # 例如 9108，访问 http://127.0.0.1:9108/metrics
+
+# 按需性能分析：设置环境变量 MONITOR_PROFILE=cprofile:3，或向进程发送 SIGUSR1，或点击 GUI「性能分析」按钮
+PROFILE_MODE = "cprofile"  # cprofile 或 tracemalloc
+PROFILE_CHECKS = 1  # 每次开启后分析的检测次数，结果写入 logs/
+
+# 守护进程模式（python status_daemon.py）的本地状态 API
+STATUS_API_HOST = "127.0.0.1"
+STATUS_API_PORT = 8765
+STATUS_STREAM_PORT = 8766  # 状态变化推送（SSE: /events，长轮询: /poll），设为 0 关闭
+STATUS_STREAM_HISTORY = 1000  # 保留最近多少条事件用于断线续传
+STATUS_STREAM_BUFFER = 100  # 每个客户端的待发送缓冲上限，溢出时断开由客户端续传
+
 # 邮件配置
 EMAIL_CONFIG = {
     'smtp_server': 'smtp.gmail.com',  # SMTP服务器地址
@@ -22,6 +91,31 @@ EMAIL_CONFIG = {
     'to_email': 'notify@example.com',  # 收件人邮箱（需要修改）
 }
 
+# 多团队订阅（可选）：JSON 文件中按服务与级别（critical/warning/info）订阅通知，格式见 subscriptions.py
+# to_email 仍会收到所有通知；文件修改后自动重新加载
+SUBSCRIPTIONS_FILE = None  # 例如 "subscriptions.json"
+
+# Webhook 通知（可选）：format 可选 generic、slack、dingtalk、feishu；钉钉/飞书开启加签时填写 secret
+# rate/burst 为每个端点的限速（每秒请求数/突发数），timeout 为单次请求超时，retries 为失败重试次数
+WEBHOOKS = [
+    # {'name': 'slack', 'url': 'https://hooks.slack.com/services/XXX', 'format': 'slack'},
+    # {'name': '钉钉', 'url': 'https://oapi.dingtalk.com/robot/send?access_token=XXX', 'format': 'dingtalk',
+    #  'secret': 'SECXXX', 'rate': 0.3, 'burst': 3},
+    # {'name': '飞书', 'url': 'https://open.feishu.cn/open-apis/bot/v2/hook/XXX', 'format': 'feishu'},
+]
+WEBHOOK_MAX_WORKERS = 8  # 并发投递线程数（同时也是连接池大小）
+WEBHOOK_TIMEOUT = 15  # 每次通知等待所有端点的最长时间（秒）
+
+# 其他通知渠道（可选），与邮件、Webhook 并行发送
+NOTIFY_COMMAND = None  # 本地命令，例如 "/usr/local/bin/page-oncall --team iap"，通知内容见环境变量 MONITOR_SUBJECT 等
+NOTIFY_FILE = None  # 追加写入 JSON Lines 文件，例如 "logs/notifications.jsonl"
+NOTIFY_CHANNEL_TIMEOUTS = {'email': 30, 'command': 10, 'file': 5}  # 各渠道超时（秒）
+
+# 多定义运行器（supervisor.py）：在一个进程中运行多份监控定义，定义文件格式见 README
+SUPERVISOR_CONFIG = None  # 默认 monitors.json
+SUPERVISOR_MAX_WORKERS = 8  # 拉取与处理共用的线程池大小
+SUPERVISOR_STATE_DIR = None  # 各定义状态文件目录，默认 state/
+
 # 常用邮箱SMTP配置参考：
 # Gmail: smtp.gmail.com:587 (需要开启"应用专用密码")
 # QQ邮箱: smtp.qq.com:587 (需要开启SMTP服务并使用授权码)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口数据评估核心
+纯函数：输入接口数据与关注的服务列表，输出每个服务的状态判断；不做网络/文件读写、不记日志、不读取 config，
+可在多线程或多进程中并发调用，也可直接嵌入回放、批量分析等工具
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from event_tracker import is_event_active, format_event_summary
+from models import CheckResult, Event, Service, ServiceStatus
+from service_match import ServiceIndex, DEFAULT_THRESHOLD
+
+Payload = Union[bytes, str, Dict[str, Any]]
+# 事件规则：(事件, 评估时刻的时间戳) -> 是否视为未解决/需要告警
+EventRule = Callable[[Dict[str, Any], float], bool]
+
+
+def default_rule(event: Dict[str, Any], now: float) -> bool:
+    """默认规则：事件仍在进行即视为异常"""
+    return is_event_active(event)
+
+
+# 评估结果即类型化的检测结果（保留旧名称供已有调用方使用）
+ServiceResult = CheckResult
+
+
+def strip_jsonp(text: str) -> str:
+    """去除 jsonCallback(...); 包装"""
+    payload = text.strip()
+    if payload.startswith('jsonCallback('):
+        payload = payload[len('jsonCallback('):]
+        if payload.endswith(');'):
+            payload = payload[:-2]
+    return payload
+
+
+def parse_payload(payload: Union[bytes, str]) -> Dict[str, Any]:
+    """解析接口原始数据（可带 JSONP 包装），格式错误时抛出 ValueError"""
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8')
+    data = json.loads(strip_jsonp(payload))
+    if not isinstance(data, dict):
+        raise ValueError('接口数据不是 JSON 对象')
+    return data
+
+
+def _error_results(services: Sequence[str], error_type: str, message: str,
+                   now: float) -> Dict[str, ServiceResult]:
+    return {service: ServiceResult(service, None, 0.0, None, error_type, message, (), (), now) for service in services}
+
+
+class Evaluator:
+    """可复用的评估器：服务列表不变时复用服务名索引，批量评估时跳过重复数据"""
+
+    def __init__(self, watched_services: Iterable[str], rules: Optional[EventRule] = None,
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.watched_services: Tuple[str, ...] = tuple(watched_services)
+        self.rules = rules or default_rule
+        self.threshold = threshold
+        # (服务名元组, 索引) 作为一个整体替换，多线程共用时不会读到不匹配的组合
+        self._index: Tuple[Tuple[str, ...], Optional[ServiceIndex]] = ((), None)
+
+    def _service_index(self, names: Tuple[str, ...]) -> ServiceIndex:
+        cached_names, index = self._index
+        if index is None or cached_names != names:
+            index = ServiceIndex(names)
+            self._index = (names, index)
+        return index
+
+    def evaluate_data(self, data: Dict[str, Any], now: Optional[float] = None) -> Dict[str, ServiceResult]:
+        """评估已解析的接口数据"""
+        now = time.time() if now is None else now
+        by_name = {service.get('serviceName', ''): service for service in data.get('services', [])}
+        index = self._service_index(tuple(by_name))
+        results = {}
+        for service in self.watched_services:
+            found = index.closest(service, self.threshold)
+            if found is None:
+                results[service] = ServiceResult(service, None, 0.0, None, '服务未找到',
+                                                 f'状态数据接口中未找到服务: {service}', (), (), now)
+                continue
+            name, score = found
+            # 只为关注的服务构建事件模型，之后的规则匹配与差异计算不再处理原始字典
+            events = Service.from_dict(by_name[name]).events
+            results[service] = self._apply_rules(service, name, score, events, now)
+        return results
+
+    def _apply_rules(self, service: str, name: str, score: float, events: Tuple[Event, ...],
+                     now: float) -> ServiceResult:
+        active = tuple(event for event in events if self.rules(event, now))
+        if active:
+            summaries = ' | '.join(event.summary for event in active[:3])
+            return ServiceResult(service, name, score, ServiceStatus.UNAVAILABLE, '服务状态异常',
+                                 f"状态数据接口显示存在未解决事件: {summaries}", events, active, now)
+        return ServiceResult(service, name, score, ServiceStatus.AVAILABLE, None, None, events, (), now)
+
+    def reevaluate(self, result: ServiceResult, now: float) -> ServiceResult:
+        """在另一时刻对同一份数据的评估结果重新应用规则（复用已解析的事件，不再解析数据、匹配服务名）"""
+        if result.status is None:
+            return result._replace(checked_at=now)
+        return self._apply_rules(result.service, result.matched, result.score, result.events, now)
+
+    def evaluate(self, payload: Payload, now: Optional[float] = None) -> Dict[str, ServiceResult]:
+        """评估一份接口数据（原始文本/字节或已解析的字典）；数据无法解析时各服务返回"数据接口错误" """
+        if isinstance(payload, dict):
+            return self.evaluate_data(payload, now)
+        try:
+            data = parse_payload(payload)
+        except (UnicodeDecodeError, ValueError) as e:
+            return _error_results(self.watched_services, '数据接口错误', f'状态数据接口请求失败: {e}',
+                                  time.time() if now is None else now)
+        return self.evaluate_data(data, now)
+
+    def evaluate_many(self, payloads: Iterable[Union[Payload, Tuple[float, Payload]]]) -> Iterator[Dict[str, ServiceResult]]:
+        """批量评估，元素可为数据本身或 (时间戳, 数据)；与上一份的内容和时间都相同时直接复用结果"""
+        last_payload = None
+        last_results = None
+        last_now = None
+        for item in payloads:
+            if isinstance(item, tuple):
+                now, payload = item
+            else:
+                now, payload = None, item
+            if (last_results is not None and not isinstance(payload, dict)
+                    and payload == last_payload and now == last_now):
+                yield last_results
+                continue
+            last_results = self.evaluate(payload, now)
+            last_payload, last_now = payload, now
+            yield last_results
+
+
+def evaluate(payload: Payload, watched_services: Iterable[str], rules: Optional[EventRule] = None,
+             now: Optional[float] = None, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, ServiceResult]:
+    """评估一份接口数据，返回 {服务名: ServiceResult}"""
+    return Evaluator(watched_services, rules, threshold).evaluate(payload, now)
+
+
+def evaluate_batch(payloads: Iterable[Union[Payload, Tuple[float, Payload]]], watched_services: Iterable[str],
+                   rules: Optional[EventRule] = None,
+                   threshold: float = DEFAULT_THRESHOLD) -> Iterator[Dict[str, ServiceResult]]:
+    """按顺序评估多份接口数据（生成器），共用服务名索引"""
+    return Evaluator(watched_services, rules, threshold).evaluate_many(payloads)
+
+
+def summarize_services(data: Dict[str, Any], rules: Optional[EventRule] = None,
+                       now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """汇总接口数据中所有服务的状态与未解决事件摘要"""
+    rules = rules or default_rule
+    now = time.time() if now is None else now
+    services = {}
+    for service in data.get('services', []):
+        name = service.get('serviceName', '')
+        if not name:
+            continue
+        active_events = [event for event in (service.get('events') or []) if rules(event, now)]
+        services[name] = {
+            'status': 'Unavailable' if active_events else 'Available',
+            'events': [format_event_summary(event) for event in active_events]
+        }
+    return services
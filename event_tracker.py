@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件级差异追踪
+按稳定标识记录每个服务上一次的未解决事件集合，每次拿到新数据时增量计算
+新增（new）、更新（updated）、已解决（resolved）三类变化
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+NEW = 'new'
+UPDATED = 'updated'
+RESOLVED = 'resolved'
+
+RESOLVED_STATUS = frozenset({'resolved', 'completed', 'closed'})
+
+# 参与变化判断的事件字段（任一变化即视为事件更新）
+TRACKED_FIELDS = ('eventStatus', 'statusType', 'message', 'usersAffected', 'endDate', 'epochEndDate')
+NOTIFIED = 'notified'  # 快照字段：该事件是否已告警
+
+
+def is_event_active(event: Dict[str, Any]) -> bool:
+    """判断事件是否仍在进行"""
+    if type(event) is not dict:
+        return event.active  # models.Event 在构建时已计算
+    status = (event.get('eventStatus') or '').strip().lower()
+    if status in RESOLVED_STATUS:
+        return False
+    epoch_end = event.get('epochEndDate')
+    end_date = (event.get('endDate') or '').strip()
+    if status == '' and (epoch_end not in (None, 0) or end_date):
+        return False
+    return True
+
+
+def format_event_summary(event: Dict[str, Any]) -> str:
+    """构建事件摘要（用于告警信息）"""
+    if type(event) is not dict:
+        return event.summary
+    status_label = (event.get('statusType') or event.get('eventStatus') or 'Unknown').strip()
+    start = (event.get('startDate') or event.get('datePosted') or '').strip()
+    end = (event.get('endDate') or '').strip()
+    if not end:
+        end = '进行中'
+    message = (event.get('message') or '').strip()
+    return f"{status_label} [{start or '未知开始'} - {end}] {message}"
+
+
+def event_key(service: str, event: Dict[str, Any]) -> str:
+    """事件的稳定标识：优先使用 id/messageId，否则为 服务名 + 开始时间 + 类型"""
+    for field in ('id', 'messageId'):
+        value = event.get(field)
+        if value not in (None, ''):
+            return f"{field}:{value}"
+    start = event.get('epochStartDate') or event.get('startDate') or event.get('datePosted') or ''
+    return f"{service}|{start}|{event.get('statusType') or ''}"
+
+
+def _snapshot(event: Dict[str, Any]) -> Dict[str, Any]:
+    """保存追踪所需的字段（同时用于摘要与持久化）"""
+    snapshot = {field: event.get(field) for field in TRACKED_FIELDS}
+    for field in ('startDate', 'datePosted', 'epochStartDate'):
+        snapshot[field] = event.get(field)
+    return snapshot
+
+
+class EventDelta(NamedTuple):
+    kind: str  # new / updated / resolved
+    service: str
+    key: str
+    event: Dict[str, Any]
+    previous: Optional[Dict[str, Any]] = None
+
+    @property
+    def summary(self) -> str:
+        return format_event_summary(self.event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'kind': self.kind, 'service': self.service, 'key': self.key, 'summary': self.summary}
+
+
+def delta_notification(delta: EventDelta, service: str, service_recovered: bool) -> Tuple[str, str, str]:
+    """事件变化对应的通知内容 (subject, body, error_type)"""
+    if delta.kind == NEW:
+        return (f"⚠️ 服务状态异常 - {service}",
+                f"新增未解决事件: {delta.summary}",
+                '服务状态异常')
+    if delta.kind == UPDATED:
+        return (f"🔄 事件更新 - {service}",
+                f"事件已更新: {delta.summary}\n\n更新前: {format_event_summary(delta.previous)}",
+                '事件更新')
+    body = f"事件已解决: {delta.summary}"
+    if service_recovered:
+        body += "\n\n服务状态已恢复为 Available"
+    return f"✅ 事件已解决 - {service}", body, '状态恢复'
+
+
+class EventTracker:
+    """记录各服务上一次仍在进行的事件，并计算增量变化"""
+
+    def __init__(self, state: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None):
+        # {服务名: {事件标识: 事件快照}}；快照的 notified 表示是否已发出过告警（旧版状态文件中没有该字段，均已告警）
+        self._active: Dict[str, Dict[str, Dict[str, Any]]] = {
+            service: dict(events) for service, events in (state or {}).items()
+        }
+
+    def has_baseline(self, service: str) -> bool:
+        return service in self._active
+
+    def active(self, service: str) -> Dict[str, Dict[str, Any]]:
+        """仍在进行的全部事件（包括被规则忽略、未告警的）"""
+        return self._active.get(service, {})
+
+    def alerting(self, service: str) -> Dict[str, Dict[str, Any]]:
+        """仍在进行且已告警的事件；为空表示服务已恢复"""
+        return {key: snapshot for key, snapshot in self.active(service).items() if snapshot.get(NOTIFIED, True)}
+
+    def diff(self, service: str, events: Iterable[Dict[str, Any]],
+             should_notify: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[EventDelta]:
+        """用本次数据中的事件列表更新服务状态，返回需要通知的变化
+        所有仍在进行的事件都会跟踪；should_notify（告警规则）只决定是否通知：
+        被忽略的事件静默跟踪，之后命中告警时作为新增通知；已告警的事件之后被忽略不会视为已解决，
+        只有已告警的事件真正结束时才产生 resolved"""
+        previous = self._active.get(service, {})
+        current: Dict[str, Dict[str, Any]] = {}
+        inactive: Dict[str, Dict[str, Any]] = {}
+        deltas: List[EventDelta] = []
+
+        for event in events:
+            key = event_key(service, event)
+            if not is_event_active(event):
+                inactive[key] = event
+                continue
+            snapshot = _snapshot(event)
+            notify = should_notify is None or should_notify(event)
+            old = previous.get(key)
+            notified = old is not None and old.get(NOTIFIED, True)
+            if notify and not notified:
+                deltas.append(EventDelta(NEW, service, key, snapshot))
+                notified = True
+            elif notify and any(old.get(field) != snapshot[field] for field in TRACKED_FIELDS):
+                deltas.append(EventDelta(UPDATED, service, key, snapshot, old))
+            snapshot[NOTIFIED] = notified
+            current[key] = snapshot
+
+        for key, old in previous.items():
+            if key not in current and old.get(NOTIFIED, True):
+                # 事件仍在列表中但已结束时使用最新内容，否则沿用上次快照
+                final = _snapshot(inactive[key]) if key in inactive else old
+                deltas.append(EventDelta(RESOLVED, service, key, final, old))
+
+        self._active[service] = current
+        return deltas
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {service: dict(events) for service, events in self._active.items()}
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出检测历史
+按时间范围与服务筛选，把每次检测或状态变化以 CSV / JSON Lines 写到标准输出或文件；
+逐条读取、逐条写出（多个服务按时间归并），内存占用与历史长短无关
+用法: python export_history.py --kind transitions --start 2025-12-01 --format csv -o report.csv
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+# 添加当前目录到路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+from check_history import CheckHistory, STATUS_NAMES
+
+CHECK_FIELDS = ['time', 'timestamp', 'service', 'status', 'latency_ms']
+TRANSITION_FIELDS = ['time', 'timestamp', 'service', 'old_status', 'new_status']
+
+
+class _TimeFormatter:
+    """时间戳 -> 本地时间字符串；同一小时内只调用一次 strftime（逐行格式化是导出的主要开销），
+    分和秒由距本地整点的秒数算出（夏令时切换发生在整点，不影响结果）"""
+
+    def __init__(self):
+        self._hour = None  # 当前本地整点的时间戳
+        self._prefix = ''
+
+    def __call__(self, timestamp: float) -> str:
+        seconds = int(timestamp)
+        offset = seconds - self._hour if self._hour is not None else -1
+        if not 0 <= offset < 3600:
+            local = datetime.fromtimestamp(seconds)
+            offset = local.minute * 60 + local.second
+            self._hour = seconds - offset
+            self._prefix = local.strftime('%Y-%m-%d %H:')
+        return f"{self._prefix}{offset // 60:02d}:{offset % 60:02d}"
+
+
+def _parse_time(value: str) -> float:
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"时间格式应为 YYYY-MM-DD 或 'YYYY-MM-DD HH:MM:SS': {value}")
+
+
+def check_rows(history: CheckHistory, services: List[str], start: Optional[float] = None,
+               end: Optional[float] = None) -> Iterator[tuple]:
+    """每次检测一行，字段顺序同 CHECK_FIELDS（多个服务按时间归并）"""
+    format_time = _TimeFormatter()
+    records = heapq.merge(*(history.iter_records(service, start, end) for service in services),
+                          key=lambda record: record.timestamp)
+    for service, timestamp, latency, status in records:
+        yield (format_time(timestamp), round(timestamp, 3), service, STATUS_NAMES.get(status, 'Unknown'),
+               None if latency is None else round(latency * 1000, 1))
+
+
+def transition_rows(history: CheckHistory, services: List[str], start: Optional[float] = None,
+                    end: Optional[float] = None) -> Iterator[tuple]:
+    """每次状态变化一行，字段顺序同 TRANSITION_FIELDS；old_status 为空表示此前没有记录"""
+    format_time = _TimeFormatter()
+    transitions = heapq.merge(*(history.iter_transitions(service, start, end) for service in services),
+                              key=lambda transition: transition.timestamp)
+    for service, timestamp, old_status, new_status in transitions:
+        yield (format_time(timestamp), round(timestamp, 3), service,
+               None if old_status is None else STATUS_NAMES.get(old_status, 'Unknown'),
+               STATUS_NAMES.get(new_status, 'Unknown'))
+
+
+def write_csv(rows: Iterable[tuple], fields: List[str], out: TextIO) -> int:
+    writer = csv.writer(out, lineterminator='\n')
+    writer.writerow(fields)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[tuple], fields: List[str], out: TextIO) -> int:
+    count = 0
+    for row in rows:
+        out.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导出检测历史（每次检测或状态变化）为 CSV / JSON Lines')
+    parser.add_argument('--dir', default=getattr(config, 'CHECK_HISTORY_DIR', None) or str(Path(__file__).parent / 'history'),
+                        help='检测历史目录')
+    parser.add_argument('--kind', choices=('checks', 'transitions'), default='checks', help='导出每次检测或仅状态变化')
+    parser.add_argument('--service', action='append', help='服务名称（可重复指定，默认全部服务）')
+    parser.add_argument('--start', type=_parse_time, help='开始时间（含）')
+    parser.add_argument('--end', type=_parse_time, help='结束时间（不含）')
+    parser.add_argument('--format', choices=('csv', 'jsonl'), default='csv', help='输出格式')
+    parser.add_argument('-o', '--output', help='输出文件（默认标准输出）')
+    args = parser.parse_args()
+
+    history = CheckHistory(Path(args.dir))
+    services = args.service or history.services()
+    if args.kind == 'checks':
+        rows, fields = check_rows(history, services, args.start, args.end), CHECK_FIELDS
+    else:
+        rows, fields = transition_rows(history, services, args.start, args.end), TRANSITION_FIELDS
+
+    started = time.perf_counter()
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        count = write_csv(rows, fields, out) if args.format == 'csv' else write_jsonl(rows, fields, out)
+    except BrokenPipeError:
+        # 下游（如 head）提前关闭了管道：停止导出，避免退出时再次写标准输出报错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if args.output:
+            out.close()
+    # 统计信息写到标准错误，不混入导出内容
+    print(f"已导出 {count} 行（{len(services)} 个服务，{time.perf_counter() - started:.1f}s）", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据接口健康度
+状态数据接口本身变慢、返回内容异常变小或变大，往往先于真正的故障出现，但检测只在请求失败时才报错。
+每个数据接口按检测跟踪拉取耗时与数据大小：EWMA 反映近期水平，P² 算法在常数内存内估计全部历史的 p50 / p95 作为基线；
+近期水平连续多次偏离基线时标记为"接口降级"（低优先级信号，与服务状态告警分开），连续多次恢复正常后解除
+"""
+
+import math
+from typing import Iterable, List, NamedTuple, Optional
+
+DEFAULT_ALPHA = 0.3  # EWMA 平滑系数，越大越偏重最近几次
+DEFAULT_WARMUP = 20  # 样本少于该值时基线不可靠，不做判断
+DEFAULT_SUSTAIN = 3  # 连续偏离 / 连续正常多少次后才切换状态
+DEFAULT_LATENCY_FACTOR = 2.0  # 拉取耗时 EWMA 超过 p50 的该倍数（且超过 p95）视为偏离
+DEFAULT_LATENCY_MIN_DELTA = 0.2  # 秒；EWMA 至少比 p50 慢这么多，避免几十毫秒级的抖动被判为偏离
+DEFAULT_SIZE_TOLERANCE = 0.5  # 数据大小 EWMA 偏离 p50 的比例
+
+
+class P2Quantile:
+    """P² 算法（Jain & Chlamtac, 1985）：用 5 个标记点流式估计分位数，内存与样本数无关"""
+
+    __slots__ = ('p', 'count', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p: float):
+        if not 0 < p < 1:
+            raise ValueError(f"分位数应在 0 与 1 之间: {p}")
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]
+        self._increments = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    def add(self, x: float):
+        self.count += 1
+        q = self._heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        n = self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        # 调整中间三个标记点的高度，使其位置接近期望位置
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def value(self) -> Optional[float]:
+        if not self.count:
+            return None
+        if self.count <= 5:
+            # 样本不足 5 个时直接取排序后的对应位置
+            return self._heights[min(self.count - 1, int(self.p * self.count))]
+        return self._heights[2]
+
+
+class MetricBaseline:
+    """单个指标的 EWMA 与 p50 / p95 基线"""
+
+    __slots__ = ('alpha', 'ewma', 'p50', 'p95')
+
+    def __init__(self, alpha: float = DEFAULT_ALPHA):
+        self.alpha = alpha
+        self.ewma: Optional[float] = None
+        self.p50 = P2Quantile(0.5)
+        self.p95 = P2Quantile(0.95)
+
+    @property
+    def count(self) -> int:
+        return self.p50.count
+
+    def add(self, x: float):
+        self.ewma = x if self.ewma is None else self.ewma + self.alpha * (x - self.ewma)
+        self.p50.add(x)
+        self.p95.add(x)
+
+    def to_dict(self) -> dict:
+        return {'ewma': self.ewma, 'p50': self.p50.value(), 'p95': self.p95.value(), 'samples': self.count}
+
+
+class FeedChange(NamedTuple):
+    feed: str
+    degraded: bool  # True 为进入降级，False 为恢复
+    reasons: tuple  # 进入降级时的偏离说明
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms"
+
+
+def _kb(size: float) -> str:
+    return f"{size / 1024:.1f}KB"
+
+
+class FeedHealth:
+    """单个数据接口的健康度；observe 在每次实际拉取后调用，状态切换时返回 FeedChange"""
+
+    def __init__(self, feed: str, alpha: float = DEFAULT_ALPHA, warmup: int = DEFAULT_WARMUP,
+                 sustain: int = DEFAULT_SUSTAIN, latency_factor: float = DEFAULT_LATENCY_FACTOR,
+                 latency_min_delta: float = DEFAULT_LATENCY_MIN_DELTA,
+                 size_tolerance: float = DEFAULT_SIZE_TOLERANCE):
+        self.feed = feed
+        self.warmup = max(5, int(warmup))
+        self.sustain = max(1, int(sustain))
+        self.latency_factor = float(latency_factor)
+        self.latency_min_delta = float(latency_min_delta)
+        self.size_tolerance = float(size_tolerance)
+        self.latency = MetricBaseline(alpha)
+        self.size = MetricBaseline(alpha)
+        self.degraded = False
+        self.reasons: tuple = ()
+        self._streak = 0  # 与当前状态相反的连续检测次数
+
+    def seed_latency(self, latencies: Iterable[float]):
+        """用历史拉取耗时预热基线（不触发状态切换），重启后不必重新积累样本"""
+        for latency in latencies:
+            if latency is not None and not math.isnan(latency):
+                self.latency.add(latency)
+
+    def _latency_deviation(self) -> Optional[str]:
+        baseline = self.latency
+        if baseline.count < self.warmup:
+            return None
+        p50, p95 = baseline.p50.value(), baseline.p95.value()
+        limit = max(p95, p50 * self.latency_factor, p50 + self.latency_min_delta)
+        if baseline.ewma > limit:
+            return f"拉取耗时近期 {_ms(baseline.ewma)}，基线 p50 {_ms(p50)} / p95 {_ms(p95)}"
+        return None
+
+    def _size_deviation(self) -> Optional[str]:
+        baseline = self.size
+        if baseline.count < self.warmup:
+            return None
+        p50 = baseline.p50.value()
+        if p50 and abs(baseline.ewma - p50) > p50 * self.size_tolerance:
+            return f"数据大小近期 {_kb(baseline.ewma)}，基线 p50 {_kb(p50)}"
+        return None
+
+    def observe(self, latency: Optional[float], size: Optional[int]) -> Optional[FeedChange]:
+        """记录一次拉取（latency 秒，size 字节），偏离或恢复持续 sustain 次时返回状态切换"""
+        if latency is not None:
+            self.latency.add(latency)
+        if size is not None:
+            self.size.add(size)
+        reasons = tuple(reason for reason in (self._latency_deviation(), self._size_deviation()) if reason)
+        if bool(reasons) == self.degraded:
+            self._streak = 0
+            if reasons:
+                self.reasons = reasons
+            return None
+        self._streak += 1
+        if self._streak < self.sustain:
+            return None
+        self._streak = 0
+        self.degraded = bool(reasons)
+        self.reasons = reasons
+        return FeedChange(self.feed, self.degraded, reasons)
+
+    def to_dict(self) -> dict:
+        return {'feed': self.feed, 'degraded': self.degraded, 'reasons': list(self.reasons),
+                'latency': self.latency.to_dict(), 'size': self.size.to_dict()}
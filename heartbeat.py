@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+心跳与看门狗
+检测线程在每个阶段（拉取、通知、等待）开始时登记心跳与该阶段的最长耗时；看门狗线程定期检查，
+超过期限仍没有新的心跳时记录卡住线程的调用栈并回调（由监控器放弃该线程、换新的会话与线程继续检测）。
+可选的心跳文件（JSON，原子替换写入）供 systemd、cron 脚本等外部程序判断进程是否仍在正常检测：
+只需比较当前时间与文件中的 deadline，或文件修改时间
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5.0  # 看门狗检查间隔（秒）
+
+
+class Stall(NamedTuple):
+    phase: str
+    thread: threading.Thread
+    elapsed: float  # 距该阶段心跳的秒数
+    sequence: int  # 卡住时的心跳序号，同一次卡住只处理一次
+
+
+def thread_stack(thread: threading.Thread) -> str:
+    """线程当前的调用栈（线程已结束时为空字符串）"""
+    frame = sys._current_frames().get(thread.ident)
+    return ''.join(traceback.format_stack(frame)) if frame is not None else ''
+
+
+class Heartbeat:
+    """检测线程的心跳：beat 记录阶段、登记线程与期限，并（配置了路径时）写心跳文件"""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self.phase: Optional[str] = None
+        self.thread: Optional[threading.Thread] = None
+        self.sequence = 0
+        self.restarts = 0
+        self._beat_at: Optional[float] = None  # 单调时钟
+        self._deadline: Optional[float] = None
+        self._write_failed = False
+
+    def beat(self, phase: str, timeout: float):
+        """当前线程进入 phase，应在 timeout 秒内再次 beat"""
+        with self._lock:
+            self.phase = phase
+            self.thread = threading.current_thread()
+            self.sequence += 1
+            self._beat_at = time.monotonic()
+            self._deadline = self._beat_at + timeout
+        self.write(timeout=timeout)
+
+    def overdue(self, now: Optional[float] = None) -> Optional[Stall]:
+        """超过期限时返回 Stall（线程已结束的不算卡住）"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._deadline is None or now <= self._deadline or not self.thread.is_alive():
+                return None
+            return Stall(self.phase, self.thread, now - self._beat_at, self.sequence)
+
+    def write(self, timeout: Optional[float] = None, stalled: bool = False):
+        """写心跳文件：写入临时文件后替换，读取方不会读到半个文件"""
+        if self.path is None:
+            return
+        now = time.time()
+        with self._lock:
+            remaining = self._deadline - time.monotonic() if self._deadline is not None else timeout
+            data = {'pid': os.getpid(), 'phase': self.phase, 'updated_at': round(now, 3),
+                    'deadline': round(now + remaining, 3) if remaining is not None else None,
+                    'stalled': stalled, 'restarts': self.restarts}
+        temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(temp, self.path)
+            self._write_failed = False
+        except OSError as e:
+            if not self._write_failed:
+                # 只在首次失败时记录，避免每次心跳刷屏
+                logger.warning(f"写入心跳文件失败: {e}")
+            self._write_failed = True
+
+    def remove(self):
+        if self.path is not None:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+
+class Watchdog:
+    """看门狗线程：心跳超过期限时调用 on_stall(stall, stack)，同一次卡住只调用一次"""
+
+    def __init__(self, heartbeat: Heartbeat, on_stall: Callable[[Stall, str], None],
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.heartbeat = heartbeat
+        self.on_stall = on_stall
+        self.poll_interval = float(poll_interval)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handled_sequence = None
+
+    def start(self) -> 'Watchdog':
+        self._thread = threading.Thread(target=self._run, name='watchdog', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            stall = self.heartbeat.overdue()
+            if stall is None or stall.sequence == self._handled_sequence:
+                continue
+            self._handled_sequence = stall.sequence
+            self.heartbeat.write(stalled=True)
+            try:
+                self.on_stall(stall, thread_stack(stall.thread))
+            except Exception as e:
+                logger.error(f"看门狗处理卡住的检测线程失败: {e}", exc_info=True)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
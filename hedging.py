@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对冲请求（hedged requests）
+首个请求在"近期耗时的某个分位数"内仍未完成时，再发出一个请求（可指向内容相同的备用地址），
+取先成功完成的结果，用少量额外请求换取更低的尾延迟；线程版中落后的请求在后台自然结束、结果丢弃，asyncio 版直接取消
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+
+import metrics
+
+T = TypeVar('T')
+
+
+class LatencyTracker:
+    """最近 window 次成功请求的耗时，用于计算对冲延迟"""
+
+    def __init__(self, window: int = 50, percentile: float = 0.9, min_samples: int = 10,
+                 initial_delay: float = 2.0, min_delay: float = 0.2):
+        if not 0 < percentile < 1:
+            raise ValueError(f"对冲分位数应在 0 与 1 之间: {percentile}")
+        self.percentile = percentile
+        self.min_samples = max(1, int(min_samples))
+        self.initial_delay = float(initial_delay)
+        self.min_delay = float(min_delay)
+        self._samples = deque(maxlen=max(self.min_samples, int(window)))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """样本不足时使用 initial_delay，否则取分位数（不低于 min_delay）"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.initial_delay
+            ordered = sorted(self._samples)
+        value = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+        return max(self.min_delay, value)
+
+
+class HedgedRequester:
+    """执行可对冲的请求；request(url) 应返回完整读取后的结果（不持有连接）"""
+
+    def __init__(self, tracker: LatencyTracker, max_workers: int = 4):
+        self.tracker = tracker
+        # 落后的请求最多占用线程到其自身超时，线程数留有余量
+        self._executor = ThreadPoolExecutor(max_workers=max(2, int(max_workers)), thread_name_prefix='hedge')
+
+    def _timed(self, request: Callable[[str], T], url: str) -> T:
+        started = time.perf_counter()
+        result = request(url)
+        self.tracker.observe(time.perf_counter() - started)
+        return result
+
+    def call(self, request: Callable[[str], T], url: str, hedge_url: Optional[str] = None) -> Tuple[T, bool, bool]:
+        """返回 (结果, 是否发出了对冲请求, 结果是否来自对冲请求)；两个请求都失败时抛出最后一个异常"""
+        delay = self.tracker.hedge_delay()
+        metrics.FETCH_HEDGE_DELAY.set(delay)
+        primary = self._executor.submit(self._timed, request, url)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            metrics.FETCH_REQUESTS.inc(hedged='false')
+            return primary.result(), False, False
+
+        metrics.FETCH_REQUESTS.inc(hedged='true')
+        hedge = self._executor.submit(self._timed, request, hedge_url or url)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # 同时完成时优先首个请求
+            for future in sorted(done, key=lambda f: f is not primary):
+                error = future.exception()
+                if error is None:
+                    won = future is hedge
+                    if won:
+                        metrics.FETCH_HEDGE_WINS.inc()
+                    return future.result(), True, won
+        raise error
+
+    async def call_async(self, request: Callable[[str], Awaitable[T]], url: str,
+                         hedge_url: Optional[str] = None) -> Tuple[T, bool, bool]:
+        """call 的 asyncio 版本；与线程版不同，落后的请求会被取消"""
+        import asyncio  # 只有 asyncio 版监控器使用，同步监控器不必导入
+        async def timed(target: str) -> T:
+            started = time.perf_counter()
+            result = await request(target)
+            self.tracker.observe(time.perf_counter() - started)
+            return result
+
+        delay = self.tracker.hedge_delay()
+        metrics.FETCH_HEDGE_DELAY.set(delay)
+        primary = asyncio.ensure_future(timed(url))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait([primary], timeout=delay)
+            if done:
+                metrics.FETCH_REQUESTS.inc(hedged='false')
+                return primary.result(), False, False
+
+            metrics.FETCH_REQUESTS.inc(hedged='true')
+            hedge = asyncio.ensure_future(timed(hedge_url or url))
+            tasks.append(hedge)
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: f is not primary):
+                    error = future.exception()
+                    if error is None:
+                        won = future is hedge
+                        if won:
+                            metrics.FETCH_HEDGE_WINS.inc()
+                        return future.result(), True, won
+            raise error
+        finally:
+            # 取消落后的请求（调用方被取消时也取消全部请求）
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
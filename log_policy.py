@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日志预算
+稳定运行时绝大多数检测都是"服务正常、没有任何变化"，逐次输出完整的检测总结会让日志文件与 GUI 日志被重复内容占满；
+LOG_POLICY = "summary"（默认）时这类检测只累计次数与拉取耗时，每隔 LOG_ROLLUP_INTERVAL 秒输出一行汇总，
+状态变化、检测失败或发送了通知时先输出累计的汇总，再输出完整的检测总结。LOG_POLICY = "full" 保持逐次输出
+"""
+
+import time
+from typing import List, Optional
+
+FULL = 'full'
+SUMMARY = 'summary'
+POLICIES = (FULL, SUMMARY)
+DEFAULT_ROLLUP_INTERVAL = 3600.0
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _format_span(seconds: float) -> str:
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f}小时"
+    if seconds >= 60:
+        return f"{seconds / 60:.0f}分钟"
+    return f"{seconds:.0f}秒"
+
+
+class HealthyRollup:
+    """累计连续的正常检测，按间隔生成一行汇总"""
+
+    def __init__(self, interval: float = DEFAULT_ROLLUP_INTERVAL):
+        self.interval = float(interval)
+        self.count = 0
+        self.since: Optional[float] = None
+        self._latencies: List[float] = []  # 秒；两次汇总之间的检测次数有限，直接保存
+
+    def add(self, latency: Optional[float], now: Optional[float] = None) -> Optional[str]:
+        """记录一次正常检测；距上次汇总超过间隔时返回汇总行"""
+        now = time.time() if now is None else now
+        if self.since is None:
+            self.since = now
+        self.count += 1
+        if latency is not None:
+            self._latencies.append(latency)
+        if now - self.since >= self.interval:
+            return self.flush(now)
+        return None
+
+    def flush(self, now: Optional[float] = None) -> Optional[str]:
+        """输出并清空累计内容（没有累计时返回 None）"""
+        if not self.count:
+            return None
+        now = time.time() if now is None else now
+        line = f"最近 {_format_span(now - self.since)} 内 {self.count} 次检测正常"
+        if self._latencies:
+            ordered = sorted(self._latencies)
+            line += (f"，拉取耗时 p50 {_percentile(ordered, 0.5) * 1000:.0f}ms"
+                     f" / p95 {_percentile(ordered, 0.95) * 1000:.0f}ms")
+        self.count = 0
+        self.since = None
+        self._latencies = []
+        return line
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+监控指标采集与 Prometheus 文本格式导出
+写入端按线程分片，热路径不加锁；抓取线程只读取各分片的快照
+"""
+
+import logging
+import os
+import sys
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 检测阶段耗时默认分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _Shards:
+    """按线程分片的数值存储：每个写线程只修改自己的字典，读取时合并"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._register_lock = threading.Lock()  # 仅在线程首次写入时使用
+
+    def local(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = {}
+            with self._register_lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def snapshot(self) -> List[dict]:
+        return [dict(shard) for shard in list(self._shards)]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], key: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.collect())
+        return lines
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _Shards()
+        self._function: Optional[Callable[[], float]] = None
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """由外部累计的计数（如进程 CPU 时间），抓取时直接读取"""
+        self._function = function
+
+    def inc(self, amount: float = 1, **labels):
+        values = self._shards.local()
+        key = self._key(labels)
+        values[key] = values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        return sum(shard.get(key, 0) for shard in self._shards.snapshot())
+
+    def collect(self) -> List[str]:
+        if self._function is not None:
+            # 回调出错只省略这一项，不影响其余指标的抓取
+            try:
+                return [f'{self.name} {_format_value(self._function())}']
+            except Exception as e:
+                logger.warning(f"指标 {self.name} 读取失败: {e}")
+                return []
+        merged: Dict[Tuple, float] = {}
+        for shard in self._shards.snapshot():
+            for key, value in shard.items():
+                merged[key] = merged.get(key, 0) + value
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in sorted(merged.items())]
+
+
+class Gauge(_Metric):
+    """瞬时值；可绑定回调在抓取时计算"""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        self._function = function
+
+    def value(self, **labels) -> Optional[float]:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels))
+
+    def collect(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f'{self.name} {_format_value(self._function())}']
+            except Exception as e:
+                logger.warning(f"指标 {self.name} 读取失败: {e}")
+                return []
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in sorted(dict(self._values).items())]
+
+
+class Histogram(_Metric):
+    """累积分桶直方图"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._shards = _Shards()
+
+    def observe(self, value: float, **labels):
+        values = self._shards.local()
+        key = self._key(labels)
+        cells = values.get(key)
+        if cells is None:
+            # 各分桶计数 + sum + count
+            cells = [0] * (len(self.buckets) + 2)
+            values[key] = cells
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                cells[index] += 1
+                break
+        cells[-2] += value
+        cells[-1] += 1
+
+    def collect(self) -> List[str]:
+        merged: Dict[Tuple, List[float]] = {}
+        for shard in self._shards.snapshot():
+            for key, cells in shard.items():
+                cells = list(cells)
+                total = merged.setdefault(key, [0] * len(cells))
+                for index, value in enumerate(cells):
+                    total[index] += value
+        lines = []
+        for key, cells in sorted(merged.items()):
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += cells[index]
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(cells[-2])}')
+            lines.append(f'{self.name}_count{labels} {cells[-1]}')
+        return lines
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def _process_rss_bytes() -> float:
+    """当前进程常驻内存（Linux 读 /proc，其他平台退化为峰值 RSS）"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 单位为字节，Linux 为 KB
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return 0
+
+
+REGISTRY = Registry()
+
+CHECKS_TOTAL = REGISTRY.counter(
+    'apple_status_checks_total', '检测次数（按检测结果）', ('result',))
+CHECK_DURATION = REGISTRY.histogram(
+    'apple_status_check_duration_seconds', '检测各阶段耗时', ('phase',))
+FETCH_BYTES = REGISTRY.counter(
+    'apple_status_fetch_bytes_total', '状态数据接口累计下载字节数')
+FETCH_RETRIES = REGISTRY.counter(
+    'apple_status_fetch_retries_total', '状态数据接口重试次数')
+FETCH_FAILURES = REGISTRY.counter(
+    'apple_status_fetch_failures_total', '状态数据接口单次请求失败次数')
+FETCH_REQUESTS = REGISTRY.counter(
+    'apple_status_fetch_requests_total', '启用对冲时的拉取次数（hedged=true 表示发出了对冲请求）', ('hedged',))
+FETCH_HEDGE_WINS = REGISTRY.counter(
+    'apple_status_fetch_hedge_wins_total', '对冲请求先于首个请求完成的次数')
+FETCH_HEDGE_DELAY = REGISTRY.gauge(
+    'apple_status_fetch_hedge_delay_seconds', '当前对冲延迟（近期耗时分位数）')
+CHECK_FAILURES = REGISTRY.counter(
+    'apple_status_check_failures_total', '检测失败次数（按异常类型）', ('error_type',))
+SERVICE_STATUS = REGISTRY.gauge(
+    'apple_status_service_status', '服务当前状态（1=Available, 0=Unavailable, -1=Unknown）', ('service',))
+SHARED_CACHE = REGISTRY.counter(
+    'apple_status_shared_cache_total', '跨进程共享缓存命中情况', ('outcome',))
+NOTIFICATIONS_TOTAL = REGISTRY.counter(
+    'apple_status_notifications_total', '通知发送次数', ('channel', 'outcome'))
+NOTIFICATION_DURATION = REGISTRY.histogram(
+    'apple_status_notification_duration_seconds', '通知发送耗时', ('channel',))
+FEED_DEGRADED = REGISTRY.gauge(
+    'apple_status_feed_degraded', '数据接口是否处于降级状态（拉取耗时或数据大小持续偏离基线）', ('feed',))
+WATCHDOG_RESTARTS = REGISTRY.counter(
+    'apple_status_watchdog_restarts_total', '看门狗替换卡住的检测线程的次数（按卡住的阶段）', ('phase',))
+LOG_QUEUE_DEPTH = REGISTRY.gauge(
+    'apple_status_log_queue_depth', 'GUI 日志队列积压条数')
+PROCESS_RSS = REGISTRY.gauge(
+    'process_resident_memory_bytes', '进程常驻内存字节数')
+PROCESS_CPU = REGISTRY.counter(
+    'process_cpu_seconds_total', '进程累计 CPU 时间（秒）')
+
+PROCESS_RSS.set_function(_process_rss_bytes)
+PROCESS_CPU.set_function(time.process_time)
+
+SERVICE_STATUS_VALUES = {'Available': 1, 'Unavailable': 0}
+
+
+def _handler_class(registry: Registry):
+    # http.server 连带导入 email、http.client 等模块，只在启动指标端点时导入
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # 抓取请求不写入监控日志
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """在独立线程中运行的指标 HTTP 服务"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9108, registry: Registry = REGISTRY):
+        from http.server import ThreadingHTTPServer
+        self.httpd = ThreadingHTTPServer((host, port), _handler_class(registry))
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-server', daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self) -> 'MetricsServer':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务、事件与检测结果的类型化数据模型
+每份接口数据只为关注的服务构建一次：事件是否仍在进行、摘要文本等在构建时计算好，
+状态类字符串驻留（sys.intern），之后的规则匹配、差异计算与通知不再重复做字符串处理；
+NamedTuple 比原始字典占用更少内存，适合长期保存的历史与回放结果
+"""
+
+import sys
+from enum import Enum
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from event_tracker import is_event_active, format_event_summary
+
+
+class ServiceStatus(str, Enum):
+    """服务状态；成员与同值字符串相等、哈希一致，可直接与旧代码中的 'Available' 等比较或作为字典键"""
+    AVAILABLE = 'Available'
+    UNAVAILABLE = 'Unavailable'
+    UNKNOWN = 'Unknown'
+
+    __str__ = str.__str__
+    __hash__ = str.__hash__
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# 接口 JSON 字段名 -> Event 属性名（Event.get 据此兼容按字典访问事件的代码）
+EVENT_FIELDS = {
+    'id': 'id',
+    'messageId': 'message_id',
+    'statusType': 'status_type',
+    'eventStatus': 'event_status',
+    'epochStartDate': 'epoch_start',
+    'epochEndDate': 'epoch_end',
+    'startDate': 'start_date',
+    'endDate': 'end_date',
+    'datePosted': 'date_posted',
+    'usersAffected': 'users_affected',
+    'message': 'message',
+}
+
+
+def _epoch_seconds(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+        return value / 1000.0
+    return None
+
+
+class Event(NamedTuple):
+    """单个事件；字段保留接口中的原始值（差异计算与状态文件依赖原值），派生值在构建时计算"""
+    id: Optional[str]
+    message_id: Optional[str]
+    status_type: Optional[str]
+    event_status: Optional[str]
+    epoch_start: Optional[float]  # 毫秒，与接口一致
+    epoch_end: Optional[float]
+    start_date: Optional[str]
+    end_date: Optional[str]
+    date_posted: Optional[str]
+    users_affected: Optional[str]
+    message: Optional[str]
+    type_key: str  # 小写、去空白的 statusType，用于按类型索引告警规则
+    active: bool  # 是否仍在进行
+    summary: str  # 告警信息中的事件摘要
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'Event':
+        get = raw.get
+        status_type = _intern(get('statusType'))
+        return cls(
+            get('id'), get('messageId'), status_type, _intern(get('eventStatus')),
+            get('epochStartDate'), get('epochEndDate'),
+            get('startDate'), get('endDate'), get('datePosted'),
+            get('usersAffected'), get('message'),
+            sys.intern((status_type or '').strip().lower()),
+            is_event_active(raw),
+            format_event_summary(raw),
+        )
+
+    @property
+    def start(self) -> Optional[float]:
+        """开始时间（Unix 秒）"""
+        return _epoch_seconds(self.epoch_start)
+
+    @property
+    def end(self) -> Optional[float]:
+        """结束时间（Unix 秒）"""
+        return _epoch_seconds(self.epoch_end)
+
+    def get(self, field: str, default: Any = None) -> Any:
+        """按接口字段名取值，兼容以字典方式访问事件的规则与追踪代码"""
+        attribute = EVENT_FIELDS.get(field)
+        value = getattr(self, attribute) if attribute else None
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为接口字段名的字典（省略缺失的字段）"""
+        return {field: getattr(self, attribute) for field, attribute in EVENT_FIELDS.items()
+                if getattr(self, attribute) is not None}
+
+
+class Service(NamedTuple):
+    name: str
+    events: Tuple[Event, ...]
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Any]) -> 'Service':
+        return cls(raw.get('serviceName', ''), tuple(Event.from_dict(event) for event in raw.get('events') or ()))
+
+
+class CheckResult(NamedTuple):
+    """单个关注服务的检测结果"""
+    service: str  # 关注的服务名
+    matched: Optional[str]  # 接口数据中实际匹配到的服务名
+    score: float  # 名称相似度（精确匹配为 1.0；仅空白或连字符不同时也为 1.0）
+    status: Optional[ServiceStatus]  # None 表示无法判断（数据接口错误、服务未找到）
+    error_type: Optional[str]
+    error_message: Optional[str]
+    events: Tuple[Event, ...]  # 该服务的全部事件
+    active_events: Tuple[Event, ...]  # 命中规则的事件
+    checked_at: float  # 评估时刻（Unix 秒）
+
+    def to_dict(self) -> Dict[str, Any]:
+        """与监控器检测结果一致的字典格式（events 为 Event，需要原始字段时调用 Event.to_dict）"""
+        return {
+            'status': self.status,
+            'error_type': self.error_type,
+            'error_message': self.error_message,
+            'matched': self.matched,
+            'score': self.score,
+            'events': self.events
+        }
@@ -5,131 +5,333 @@ Apple Developer System Status Monitor
 监控 App Store - In-App Purchases 服务状态
 """
 
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import time
 import logging
 from datetime import datetime
 import json
-import re
-import unicodedata
+import os
+import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import quote
 import config
+import metrics
+from profiling import PhaseTimer, CheckProfiler, install_signal_handler
+from shared_cache import SharedStatusCache, cache_path_for, file_lock
+from service_match import normalize_service_name, DEFAULT_THRESHOLD
+from evaluation import Evaluator, strip_jsonp, summarize_services
+from alert_rules import compile_rules
+from subscriptions import SubscriptionRegistry
+from hedging import HedgedRequester, LatencyTracker
+from transport import create_transport
+from notifiers import (NotificationDispatcher, Notification, EmailChannel, WebhookChannel,
+                       CommandChannel, FileSinkChannel, DEFAULT_CHANNEL_TIMEOUTS)
+from payload_recorder import PayloadRecorder
+from check_history import CheckHistory
+from log_policy import HealthyRollup, FULL, SUMMARY, POLICIES, DEFAULT_ROLLUP_INTERVAL
+from feed_health import FeedHealth
+from heartbeat import Heartbeat, Watchdog, Stall, DEFAULT_POLL_INTERVAL
+from event_tracker import EventTracker, is_event_active, format_event_summary
+from check_processor import CheckProcessor
 
 # 配置日志
 log_dir = Path(__file__).parent / "logs"
-log_dir.mkdir(exist_ok=True)
 
-log_file = log_dir / f"monitor_{datetime.now().strftime('%Y%m%d')}.log"
-logging.basicConfig(
-    level=logging.DEBUG,  # 使用DEBUG级别以显示详细解析信息
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(log_file, encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+
+def setup_logging(log_file: bool = True, console_level: int = logging.DEBUG):
+    """控制台 + 按天的日志文件（被其他模块导入时自动调用；单次检测模式可只输出到控制台）"""
+    handlers = []
+    if log_file:
+        log_dir.mkdir(exist_ok=True)
+        handlers.append(logging.FileHandler(log_dir / f"monitor_{datetime.now().strftime('%Y%m%d')}.log",
+                                            encoding='utf-8'))
+    console = logging.StreamHandler()
+    console.setLevel(console_level)
+    handlers.append(console)
+    logging.basicConfig(
+        level=logging.DEBUG if log_file else console_level,  # 使用DEBUG级别以显示详细解析信息
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+    if getattr(config, 'LOG_POLICY', SUMMARY) != FULL:
+        # urllib3 每次请求都有两行 DEBUG 连接日志，按日志预算只保留警告
+        logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+
+if __name__ != "__main__":
+    setup_logging()
 
 logger = logging.getLogger(__name__)
 
-def _log_to_queue(log_queue, level, message):
-    """将日志消息发送到队列（用于GUI显示）"""
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+FETCH_TIMEOUT = 30  # 单次请求超时（秒）
+
+def _log_to_queue(log_queue, level, message, **extra):
+    """将日志消息发送到队列（用于GUI显示），extra 用于附带结构化数据"""
     if log_queue:
         try:
             log_queue.put_nowait({
                 'level': level,
                 'message': message,
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                **extra
             })
         except:
             pass  # 队列已满，忽略
 
 
+def build_dispatcher(smtp_config: Dict[str, Any], subscriptions=None,
+                     max_workers: Optional[int] = None) -> NotificationDispatcher:
+    """按配置组装通知渠道：邮件始终启用（未配置时跳过），其余渠道按需启用"""
+    timeouts = {**DEFAULT_CHANNEL_TIMEOUTS, **getattr(config, 'NOTIFY_CHANNEL_TIMEOUTS', {})}
+    channels = [EmailChannel(smtp_config, config.MONITOR_URL, subscriptions, timeouts['email'])]
+    webhooks = getattr(config, 'WEBHOOKS', None)
+    if webhooks:
+        from webhook import WebhookNotifier  # 依赖 requests，仅在配置了 Webhook 时导入
+        notifier = WebhookNotifier.from_config(webhooks, getattr(config, 'WEBHOOK_MAX_WORKERS', 8))
+        channels.append(WebhookChannel(notifier, getattr(config, 'WEBHOOK_TIMEOUT', timeouts['webhook'])))
+    command = getattr(config, 'NOTIFY_COMMAND', None)
+    if command:
+        channels.append(CommandChannel(command, timeouts['command']))
+    sink = getattr(config, 'NOTIFY_FILE', None)
+    if sink:
+        channels.append(FileSinkChannel(Path(sink), timeouts['file']))
+    return NotificationDispatcher(channels, max_workers)
+
+
+def state_file_for(service: str, standalone: bool = False) -> Path:
+    """监控服务对应的状态文件：配置的 TARGET_SERVICE 沿用 state.json（命令行与 GUI 共用），
+    其他服务与 standalone（嵌入其他程序运行）的监控器各用 state/ 下的一个文件"""
+    base = Path(__file__).parent
+    if service == config.TARGET_SERVICE and not standalone:
+        return base / "state.json"
+    return base / "state" / f"{'standalone' if standalone else 'service'}-{quote(service, safe='')}.json"
+
+
 class AppleStatusMonitor:
     """Apple Developer System Status 监控器"""
     
+    # 嵌入其他程序运行（不与命令行、GUI 共用状态文件与归档目录）
+    standalone = False
+    
     def __init__(self, check_interval=None, retry_count=None, retry_delay=None, 
-                 to_email=None, log_queue=None, stop_event=None):
+                 to_email=None, log_queue=None, stop_event=None, check_only=False, one_shot=False,
+                 target_service=None, state_file=None):
         self.url = config.MONITOR_URL
-        self.target_service = config.TARGET_SERVICE
+        # 同一进程中监控多个服务时各自传入 target_service，状态文件与归档目录按服务分开（检测历史本就按服务分文件）
+        self.target_service = target_service or config.TARGET_SERVICE
         # 支持从外部传入参数，如果没有则使用config中的默认值
         self.check_interval = check_interval if check_interval is not None else config.CHECK_INTERVAL
         self.retry_count = retry_count if retry_count is not None else config.RETRY_COUNT
         self.retry_delay = retry_delay if retry_delay is not None else config.RETRY_DELAY
         self.status_data_url = getattr(config, 'STATUS_DATA_URL', None)
+        # 只检测：不发送通知，不写状态文件、检测历史、归档与共享缓存（不影响之后正常运行时的告警判断）
+        self.check_only = check_only
+        # 单次运行（--once / --check-only）：进程只检测一次，依赖多次检测积累的状态（如数据接口健康度）不启用
+        self.one_shot = one_shot or check_only
+        # HTTP 后端（requests / http.client / urllib3 / async），首次拉取时才创建并导入对应的库
+        self.http_backend = getattr(config, 'HTTP_BACKEND', None)
+        self._transport = None
+        # 对冲请求：首个请求超过近期耗时分位数仍未完成时再发一个（可指向内容相同的备用地址）
+        self.hedge_url = getattr(config, 'FETCH_HEDGE_URL', None)
+        self.hedger = None
+        if getattr(config, 'FETCH_HEDGE_ENABLED', True):
+            self.hedger = HedgedRequester(LatencyTracker(
+                percentile=getattr(config, 'FETCH_HEDGE_PERCENTILE', 0.9),
+                initial_delay=getattr(config, 'FETCH_HEDGE_INITIAL_DELAY', 2.0),
+                min_delay=getattr(config, 'FETCH_HEDGE_MIN_DELAY', 0.2)))
         self.normalized_target = self._normalize_service_name(self.target_service)
+        self.service_match_threshold = getattr(config, 'SERVICE_MATCH_THRESHOLD', DEFAULT_THRESHOLD)
+        # 告警规则在启动时编译一次（未配置时沿用"事件仍在进行即告警"）
+        self.alert_rules = compile_rules(getattr(config, 'ALERT_RULES', None),
+                                         getattr(config, 'ALERT_RULES_DEFAULT_ACTION', 'alert'))
+        self.evaluator = Evaluator([self.target_service], self.alert_rules, self.service_match_threshold)
         
         # 邮件配置（支持从外部传入收件人邮箱）
         self.smtp_config = config.EMAIL_CONFIG.copy()
         if to_email:
             self.smtp_config['to_email'] = to_email
         
+        # 多团队订阅（按服务与级别分发通知），未配置时所有通知发给 to_email
+        subscriptions_file = getattr(config, 'SUBSCRIPTIONS_FILE', None)
+        self.subscriptions = SubscriptionRegistry(subscriptions_file) if subscriptions_file else None
+        
+        # 通知渠道（邮件、Webhook、本地命令、文件），每条通知并行发送到所有渠道
+        self.dispatcher = self._build_dispatcher()
+        
         # 状态记录文件
-        self.state_file = Path(__file__).parent / "state.json"
-        self.last_status = self._load_last_status()
+        self.state_file = Path(state_file) if state_file else state_file_for(self.target_service, self.standalone)
+        if not check_only:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        # GUI 与命令行可能同时运行并共用状态文件：处理结果与写回状态在文件锁内进行，先换用其他进程写入的状态
+        self.state_lock_timeout = float(getattr(config, 'STATE_LOCK_TIMEOUT', 30))
+        self._state_stamp = self._state_file_stamp()
+        self._state_stale = False  # 内存中的事件记录不可信（卡住的线程改动后未保存），下次处理前重新读取状态文件
+        state = self._load_state()
+        self.last_status = state.get('last_status')
+        # 检测结果之后的公共流程（指标、事件变化与模糊匹配通知），与多定义运行器共用
+        self.processor = CheckProcessor(self.alert_rules, self._notify_service, self._log, state)
+        
+        # 跨进程共享的接口数据缓存：同一时间只有一个进程拉取，其余进程复用（只检测时不写缓存文件与锁文件）
+        self.shared_cache = None
+        if self.status_data_url and getattr(config, 'SHARED_CACHE_ENABLED', True) and not check_only:
+            cache_dir = Path(getattr(config, 'SHARED_CACHE_DIR', None) or Path(__file__).parent)
+            self.shared_cache = SharedStatusCache(cache_path_for(self.status_data_url, cache_dir))
+        
+        # 接口原始数据归档（后台线程按内容哈希去重压缩保存）
+        self.recorder = None
+        if getattr(config, 'PAYLOAD_ARCHIVE_ENABLED', True) and not check_only:
+            archive_dir = Path(getattr(config, 'PAYLOAD_ARCHIVE_DIR', None) or Path(__file__).parent / "archive")
+            if self.standalone or self.target_service != config.TARGET_SERVICE:
+                archive_dir = archive_dir / self.state_file.stem
+            self.recorder = PayloadRecorder(archive_dir, getattr(config, 'PAYLOAD_ARCHIVE_COMPRESSION', 'gzip'))
+        
+        # 检测历史（每次检测一条定长记录，供 GUI 时间线与导出使用）
+        self.history = None
+        if getattr(config, 'CHECK_HISTORY_ENABLED', True) and not check_only:
+            self.history = CheckHistory(Path(getattr(config, 'CHECK_HISTORY_DIR', None) or Path(__file__).parent / "history"))
+        
+        # 数据接口健康度：拉取耗时与数据大小持续偏离基线时发出低优先级的"接口降级"信号（与服务状态告警分开）。
+        # 需要连续多次检测才能判断，单次运行时每次都从零开始、永远不会触发，因此不启用（也不读取历史预热）
+        self.feed_health = None
+        if self.status_data_url and getattr(config, 'FEED_HEALTH_ENABLED', True) and not self.one_shot:
+            self.feed_health = FeedHealth(
+                self.status_data_url,
+                sustain=getattr(config, 'FEED_HEALTH_SUSTAIN', 3),
+                latency_factor=getattr(config, 'FEED_HEALTH_LATENCY_FACTOR', 2.0),
+                size_tolerance=getattr(config, 'FEED_HEALTH_SIZE_TOLERANCE', 0.5))
+            self._seed_feed_health()
+        self.feed_health_notify = getattr(config, 'FEED_HEALTH_NOTIFY', True)
+        self._last_payload_size = None
+        
+        # 日志预算：状态保持正常的检测只计数，定期输出一行汇总（LOG_POLICY = "full" 时逐次输出完整总结）
+        self.log_policy = getattr(config, 'LOG_POLICY', SUMMARY)
+        if self.log_policy not in POLICIES:
+            raise ValueError(f"LOG_POLICY 应为 {' 或 '.join(POLICIES)}: {self.log_policy!r}")
+        self.log_rollup = None
+        if self.log_policy == SUMMARY:
+            self.log_rollup = HealthyRollup(getattr(config, 'LOG_ROLLUP_INTERVAL', DEFAULT_ROLLUP_INTERVAL))
+        self._summarized_status = None  # 上一次输出完整总结时的状态
+        
+        # 心跳与看门狗：检测在每个阶段登记期限，卡住（如网络读取、文件锁迟迟不返回）时由看门狗记录调用栈，
+        # 换新的 HTTP 会话与工作线程继续检测；心跳文件供外部程序判断进程是否存活
+        self.heartbeat = Heartbeat(None if check_only else getattr(config, 'WATCHDOG_HEARTBEAT_FILE', None))
+        self.watchdog_grace = float(getattr(config, 'WATCHDOG_GRACE', 60))
+        self._worker = None
+        self._worker_error = None
+        self._worker_exited = threading.Event()
         
         # GUI支持：日志队列和停止事件
         self.log_queue = log_queue
         self.stop_event = stop_event
         self._running = False
         
-    def _load_last_status(self) -> Optional[str]:
-        """加载上次的状态"""
+        # 分阶段计时与按需性能分析（MONITOR_PROFILE 环境变量 / SIGUSR1 / GUI 开关）
+        self._phase_timer = PhaseTimer()
+        self.profiler = CheckProfiler(log_dir, logger)
+        self.profiler.mode = getattr(config, 'PROFILE_MODE', 'cprofile')
+        self.profiler.arm_from_env()
+        
+        # 检测结果订阅者（状态 API 缓存等），每次检测结束后回调
+        self._listeners = []
+        self._last_data = None
+        
+    def _load_state(self) -> Dict[str, Any]:
+        """读取状态文件；其他服务写入的状态不采用（否则其中的事件会被当作本服务的事件已解决）"""
         if self.state_file.exists():
             try:
                 with open(self.state_file, 'r', encoding='utf-8') as f:
                     state = json.load(f)
-                    return state.get('last_status')
             except Exception as e:
                 logger.warning(f"加载状态文件失败: {e}")
-        return None
+                return {}
+            service = state.get('target_service')
+            if service is not None and service != self.target_service:
+                logger.warning(f"状态文件 {self.state_file} 属于服务 {service}，不采用其中的状态")
+                return {}
+            return state
+        return {}
+    
+    def _state_file_stamp(self) -> Optional[Tuple[int, int]]:
+        """状态文件的 (修改时间, 大小)，用于判断是否被其他进程改写"""
+        try:
+            stat = self.state_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    @contextmanager
+    def _state_locked(self):
+        """在跨进程文件锁内执行"读取状态 → 处理结果 → 写回状态"
+        状态文件在本进程上次读写之后被其他进程改写时，先换用其中的事件与已告警标记，
+        既不会覆盖对方记录的已告警事件，也不会重复通知对方已通知过的事件"""
+        if self.check_only:
+            yield
+            return
+        lock_path = self.state_file.with_name(self.state_file.name + '.lock')
+        with file_lock(lock_path, self.state_lock_timeout) as acquired:
+            if not acquired:
+                logger.warning(f"等待状态文件锁超过 {self.state_lock_timeout:g} 秒，不加锁继续")
+            stamp = self._state_file_stamp()
+            if self._state_stale or (stamp is not None and stamp != self._state_stamp):
+                state = self._load_state()
+                if state or self._state_stale:
+                    self.last_status = state.get('last_status', self.last_status)
+                    self.processor.load_state(state)
+                self._state_stamp = stamp
+                self._state_stale = False
+            yield
+    
+    def _load_last_status(self) -> Optional[str]:
+        """加载上次的状态"""
+        return self._load_state().get('last_status')
     
     def _save_status(self, status: str, timestamp: str):
         """保存当前状态"""
+        if self.check_only:
+            return
         try:
             state = {
+                'target_service': self.target_service,
                 'last_status': status,
-                'last_check_time': timestamp
+                'last_check_time': timestamp,
+                **self.processor.to_state()
             }
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f, ensure_ascii=False, indent=2)
+            with self._phase_timer.phase('state_write'):
+                # 先写临时文件再原子替换，多个进程同时写入时不会产生半截文件
+                tmp_file = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_file, self.state_file)
+            self._state_stamp = self._state_file_stamp()
         except Exception as e:
             logger.error(f"保存状态文件失败: {e}")
     
     def _normalize_service_name(self, text: Optional[str]) -> str:
         """统一服务名称便于匹配"""
-        if not text:
-            return ""
-        normalized = unicodedata.normalize('NFKC', str(text))
-        normalized = normalized.replace('–', '-').replace('—', '-')
-        normalized = normalized.lower()
-        normalized = re.sub(r'\s+', ' ', normalized)
-        return normalized.strip()
+        return normalize_service_name(text)
     
     def _is_event_active(self, event: Dict[str, Any]) -> bool:
         """判断事件是否仍在进行"""
-        status = (event.get('eventStatus') or '').strip().lower()
-        resolved_status = {'resolved', 'completed', 'closed'}
-        if status in resolved_status:
-            return False
-        epoch_end = event.get('epochEndDate')
-        end_date = (event.get('endDate') or '').strip()
-        if status == '' and (epoch_end not in (None, 0) or end_date):
-            return False
-        return True
+        return is_event_active(event)
     
     def _format_event_summary(self, event: Dict[str, Any]) -> str:
         """构建事件摘要（用于告警信息）"""
-        status_label = (event.get('statusType') or event.get('eventStatus') or 'Unknown').strip()
-        start = (event.get('startDate') or event.get('datePosted') or '').strip()
-        end = (event.get('endDate') or '').strip()
-        if not end:
-            end = '进行中'
-        message = (event.get('message') or '').strip()
-        return f"{status_label} [{start or '未知开始'} - {end}] {message}"
+        return format_event_summary(event)
+    
+    def _summarize_services(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """汇总接口数据中所有服务的状态（供状态 API 等订阅者使用）"""
+        return summarize_services(data, self.evaluator.rules)
+    
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = create_transport(self.http_backend)
+        return self._transport
     
     def _fetch_status_from_api(self) -> Dict[str, Any]:
         """通过官方数据接口获取服务状态"""
@@ -140,302 +342,242 @@ class AppleStatusMonitor:
                 'error_message': '未配置 STATUS_DATA_URL，无法调用状态数据接口'
             }
         
+        self._last_data = None
+        if self.shared_cache is None:
+            payload, data, last_error = self._download_status_data()
+        else:
+            payload, data, last_error = self._load_shared_status_data()
+        return self._status_from_data(data, last_error)
+    
+    def _status_from_data(self, data: Optional[Dict[str, Any]], last_error: Optional[Exception]) -> Dict[str, Any]:
+        """把拉取结果转换为检测结果（拉取失败时为数据接口错误）"""
+        if data is None:
+            return {
+                'status': None,
+                'error_type': '数据接口错误',
+                'error_message': f'状态数据接口请求失败: {last_error}'
+            }
+        self._last_data = data
+        
+        return self._evaluate_status_data(data)
+    
+    def _load_shared_status_data(self) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[Exception]]:
+        """优先复用其他进程在本检测间隔内拉取的数据，否则由当前进程拉取并写入共享缓存"""
+        timer = self._phase_timer
+        lock_started = time.perf_counter()
+        with self.shared_cache.locked() as acquired:
+            timer.add('shared_cache_lock', time.perf_counter() - lock_started)
+            try:
+                cached = self.shared_cache.read(max_age=self.check_interval)
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取共享缓存失败: {e}")
+                cached = None
+            if cached is not None:
+                fetched_at, raw = cached
+                try:
+                    payload = raw.decode('utf-8')
+                    with timer.phase('json_parse'):
+                        data = json.loads(payload)
+                except ValueError as e:
+                    logger.warning(f"共享缓存数据无效，重新拉取: {e}")
+                else:
+                    metrics.SHARED_CACHE.inc(outcome='hit')
+                    logger.info(f"复用共享缓存中的接口数据（{time.time() - fetched_at:.0f}秒前由其他实例拉取）")
+                    return payload, data, None
+            
+            metrics.SHARED_CACHE.inc(outcome='miss')
+            payload, data, last_error = self._download_status_data()
+            if data is not None and acquired:
+                try:
+                    self.shared_cache.write(payload.encode('utf-8'))
+                except OSError as e:
+                    logger.warning(f"写入共享缓存失败: {e}")
+            return payload, data, last_error
+    
+    def _download_status_data(self) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[Exception]]:
+        """请求状态数据接口（含重试），返回 (去除 JSONP 包装的文本, 解析结果, 最后一次错误)"""
+        timer = self._phase_timer
         last_error = None
-        data = None
+        transport = self.transport  # 在发出（可能并行的）请求前创建
         
         for attempt in range(1, self.retry_count + 1):
+            if attempt > 1:
+                metrics.FETCH_RETRIES.inc()
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                }
-                response = requests.get(self.status_data_url, headers=headers, timeout=30)
-                response.raise_for_status()
-                payload = response.text.strip()
-                
-                if payload.startswith('jsonCallback('):
-                    payload = payload[len('jsonCallback('):]
-                    if payload.endswith(');'):
-                        payload = payload[:-2]
-                
-                data = json.loads(payload)
-                break
+                if self.hedger is None:
+                    # get 在收到响应头后返回：DNS/TCP/TLS/首字节 计入 http_wait，正文下载计入 http_transfer
+                    with timer.phase('http_wait'):
+                        response = transport.get(self.status_data_url, FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+                    with timer.phase('http_transfer'):
+                        response.raise_for_status()
+                        content = response.content
+                    text = response.text
+                else:
+                    # 对冲时两个请求并行进行，等待与下载无法区分，整体计入 http_wait
+                    with timer.phase('http_wait'):
+                        (content, text), hedged, hedge_won = self.hedger.call(
+                            self._request_status_data, self.status_data_url, self.hedge_url)
+                    if hedged:
+                        logger.info(f"状态数据接口响应较慢，已发出对冲请求（{'对冲请求' if hedge_won else '首个请求'}先完成）")
+                payload, data = self._parse_payload(content, text)
+                return payload, data, None
             except Exception as e:
                 last_error = e
+                metrics.FETCH_FAILURES.inc()
                 logger.warning(f"调用状态数据接口失败 (尝试 {attempt}/{self.retry_count}): {e}")
                 if attempt < self.retry_count:
-                    time.sleep(self.retry_delay)
-        
-        if data is None:
-            return {
-                'status': None,
-                'error_type': '数据接口错误',
-                'error_message': f'状态数据接口请求失败: {last_error}'
-            }
+                    with timer.phase('retry_wait'):
+                        time.sleep(self.retry_delay)
         
-        services = data.get('services', [])
-        for service in services:
-            service_name = service.get('serviceName', '')
-            if self._normalize_service_name(service_name) == self.normalized_target:
-                events = service.get('events') or []
-                active_events = [event for event in events if self._is_event_active(event)]
-                
-                if active_events:
-                    summaries = [self._format_event_summary(event) for event in active_events[:3]]
-                    logger.warning(f"状态数据接口显示存在未解决事件: {' | '.join(summaries)}")
-                    return {
-                        'status': 'Unavailable',
-                        'error_type': '服务状态异常',
-                        'error_message': f"状态数据接口显示存在未解决事件: {' | '.join(summaries)}"
-                    }
-                
-                logger.info("状态数据接口返回：服务正常")
-                return {
-                    'status': 'Available',
-                    'error_type': None,
-                    'error_message': None
-                }
+        return None, None, last_error
+    
+    def _request_status_data(self, url: str) -> Tuple[bytes, str]:
+        """完整读取一次接口响应（供对冲请求使用，不持有连接）"""
+        response = self.transport.get(url, FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+        response.raise_for_status()
+        return response.content, response.text
+    
+    def _parse_payload(self, content: bytes, text: str) -> Tuple[str, Dict[str, Any]]:
+        """去除 JSONP 包装并解析接口数据，成功后交给归档"""
+        timer = self._phase_timer
+        metrics.FETCH_BYTES.inc(len(content))
+        self._last_payload_size = len(content)
         
-        return {
-            'status': None,
-            'error_type': '服务未找到',
-            'error_message': f'状态数据接口中未找到服务: {self.target_service}'
-        }
-    
-    def _send_email(self, subject: str, body: str, error_type: str = None):
-        """发送邮件通知"""
-        # 检查邮件配置是否已设置
-        if (self.smtp_config.get('from_email') == 'your_email@gmail.com' or 
-            self.smtp_config.get('to_email') == 'notify@example.com' or
-            self.smtp_config.get('password') == 'your_app_password' or
-            self.smtp_config.get('password') == 'your_sina_password'):
-            logger.warning("邮件配置未设置，跳过邮件发送。请在config.py中配置邮件信息。")
-            return False
+        with timer.phase('jsonp_strip'):
+            payload = strip_jsonp(text)
         
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.smtp_config['from_email']
-            # 支持多个收件人（逗号分隔）
-            to_emails = self.smtp_config['to_email']
-            if isinstance(to_emails, str):
-                # 如果是字符串，可能是多个邮箱用逗号分隔
-                to_emails = [e.strip() for e in to_emails.split(',')]
-            elif not isinstance(to_emails, list):
-                to_emails = [to_emails]
-            msg['To'] = ', '.join(to_emails)  # 邮件头使用逗号分隔
-            msg['Subject'] = subject
-            
-            # 构建纯文本邮件正文（作为备选）
-            email_body_plain = f"""
-监控时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-监控服务: {self.target_service}
-监控URL: {self.url}
+        with timer.phase('json_parse'):
+            data = json.loads(payload)
+        if self.recorder:
+            self.recorder.record(payload)
+        return payload, data
+    
+    def _evaluate_status_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """在接口数据中定位目标服务并判断是否存在未解决事件"""
+        with self._phase_timer.phase('evaluate'):
+            result = self.evaluator.evaluate_data(data)[self.target_service]
 
-"""
-            
-            if error_type:
-                email_body_plain += f"异常类型: {error_type}\n\n"
-            
-            email_body_plain += f"详细信息:\n{body}\n\n"
-            email_body_plain += f"查看具体状态: https://developer.apple.com/system-status/\n\n"
-            email_body_plain += f"---\n此邮件由 Apple Developer Status Monitor 自动发送"
-            
-            # 构建HTML邮件正文
-            status_url = "https://developer.apple.com/system-status/"
-            check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            email_body_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            background-color: #ffffff;
-            border-radius: 8px;
-            padding: 30px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .header {{
-            border-bottom: 2px solid #007AFF;
-            padding-bottom: 15px;
-            margin-bottom: 20px;
-        }}
-        .header h2 {{
-            margin: 0;
-            color: #007AFF;
-            font-size: 20px;
-        }}
-        .info-item {{
-            margin: 15px 0;
-            padding: 10px;
-            background-color: #f8f9fa;
-            border-left: 3px solid #007AFF;
-            border-radius: 4px;
-        }}
-        .info-label {{
-            font-weight: bold;
-            color: #555;
-            margin-bottom: 5px;
-        }}
-        .info-value {{
-            color: #333;
-        }}
-        .error-type {{
-            background-color: #fff3cd;
-            border-left-color: #ffc107;
-            padding: 15px;
-            margin: 20px 0;
-            border-radius: 4px;
-        }}
-        .error-type .info-label {{
-            color: #856404;
-        }}
-        .details {{
-            background-color: #f8f9fa;
-            padding: 15px;
-            border-radius: 4px;
-            margin: 20px 0;
-            white-space: pre-wrap;
-            word-wrap: break-word;
-        }}
-        .button-container {{
-            text-align: center;
-            margin: 30px 0;
-        }}
-        .status-button {{
-            display: inline-block;
-            padding: 14px 32px;
-            background-color: #007AFF;
-            color: #ffffff !important;
-            text-decoration: none;
-            border-radius: 6px;
-            font-weight: 600;
-            font-size: 16px;
-            transition: background-color 0.3s;
-            box-shadow: 0 2px 4px rgba(0,122,255,0.3);
-        }}
-        .status-button:hover {{
-            background-color: #0051D5;
-        }}
-        .footer {{
-            margin-top: 30px;
-            padding-top: 20px;
-            border-top: 1px solid #e0e0e0;
-            text-align: center;
-            color: #999;
-            font-size: 12px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h2>🍎 Apple Developer System Status Monitor</h2>
-        </div>
-        
-        <div class="info-item">
-            <div class="info-label">监控时间</div>
-            <div class="info-value">{check_time}</div>
-        </div>
-        
-        <div class="info-item">
-            <div class="info-label">监控服务</div>
-            <div class="info-value">{self.target_service}</div>
-        </div>
-        
-        <div class="info-item">
-            <div class="info-label">监控URL</div>
-            <div class="info-value">{self.url}</div>
-        </div>
-"""
-            
-            if error_type:
-                email_body_html += f"""
-        <div class="error-type">
-            <div class="info-label">异常类型</div>
-            <div class="info-value">{error_type}</div>
-        </div>
-"""
-            
-            email_body_html += f"""
-        <div class="info-item">
-            <div class="info-label">详细信息</div>
-            <div class="details">{body}</div>
-        </div>
+        if result.status == 'Unavailable':
+            logger.warning(result.error_message)
+        elif result.status == 'Available' and self.log_policy == FULL:
+            logger.info("状态数据接口返回：服务正常")
+        return result.to_dict()
+    
+    def _build_dispatcher(self) -> NotificationDispatcher:
+        return build_dispatcher(self.smtp_config, self.subscriptions)
+    
+    def _notify(self, subject: str, body: str, error_type: str = None) -> Dict[str, Any]:
+        """把一条通知并行发送到所有渠道，返回各渠道的耗时与结果"""
+        if self.check_only or self._superseded(f"发送通知: {subject}"):
+            return {'subject': subject, 'channels': []}
+        # 各渠道按自身超时计时（SMTP 连接也设置了超时），分发最长等待最慢渠道的超时
+        self.heartbeat.beat('notify', max((channel.timeout for channel in self.dispatcher.channels), default=0)
+                            + self.watchdog_grace)
+        notification = Notification.create(subject, body, error_type, self.target_service)
+        with self._phase_timer.phase('notify'):
+            results = self.dispatcher.dispatch(notification)
+        # 渠道内部的阶段（邮件渲染、SMTP 连接与发送）计入本次检测的阶段耗时，包含在 notify 之内
+        for result in results:
+            for phase, seconds in (result.phases or {}).items():
+                self._phase_timer.add(phase, seconds)
+        return {'subject': subject, 'channels': [result.to_dict() for result in results]}
+    
+    def _notify_service(self, subject: str, body: str, error_type: Optional[str], service: str) -> Dict[str, Any]:
+        return self._notify(subject=subject, body=body, error_type=error_type)
+    
+    def _log(self, level: int, message: str, service: Optional[str] = None):
+        """写日志并同步到 GUI 队列"""
+        logger.log(level, message)
+        _log_to_queue(self.log_queue, logging.getLevelName(level), message)
+    
+    @property
+    def event_tracker(self) -> EventTracker:
+        return self.processor.event_tracker
+    
+    @event_tracker.setter
+    def event_tracker(self, tracker: EventTracker):
+        self.processor.event_tracker = tracker
+    
+    def _check_and_notify(self) -> Dict[str, Any]:
+        """执行一次检测并发送通知（按需包裹性能分析）"""
+        with self.profiler.maybe_profile():
+            return self._perform_check()
+    
+    def _perform_check(self) -> Dict[str, Any]:
+        """检测主流程：拉取、判断、通知、保存，并记录各阶段耗时"""
+        check_time = self._begin_check()
+        # 仅使用官方状态数据接口
+        result = self._fetch_status_from_api()
+        if self._superseded("本次迟到的检测结果"):
+            # 拉取期间被看门狗判定为卡住并已由新线程接替：丢弃结果，避免重复通知与写状态
+            return result
+        return self._finish_check(result, check_time)
+    
+    def _begin_check(self) -> str:
+        """记录检测开始并重置阶段计时，返回检测时间"""
+        check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if self.log_policy == FULL:
+            log_msg = f"开始检测 [{check_time}]"
+            logger.info(log_msg)
+            _log_to_queue(self.log_queue, 'INFO', log_msg)
+        self._phase_timer = PhaseTimer()
+        self._last_payload_size = None
+        self._last_data = None
+        # 拉取最长为每次尝试的请求超时与重试间隔之和
+        self.heartbeat.beat('fetch', self.retry_count * (FETCH_TIMEOUT + self.retry_delay) + self.watchdog_grace)
+        return check_time
+    
+    def _finish_check(self, result: Dict[str, Any], check_time: str) -> Dict[str, Any]:
+        """拉取之后的流程：记录指标与日志、按事件变化通知、保存状态、汇总阶段耗时"""
+        self.heartbeat.beat('process', self.watchdog_grace)
+        timer = self._phase_timer
         
-        <div class="button-container">
-            <a href="{status_url}" class="status-button">查看具体状态</a>
-        </div>
+        # 状态保持正常时不逐次输出；否则先输出之前累计的汇总行
+        quiet = self._is_quiet(result)
+        if not quiet:
+            self._flush_log_rollup()
         
-        <div class="footer">
-            此邮件由 Apple Developer Status Monitor 自动发送
-        </div>
-    </div>
-</body>
-</html>
-"""
-            
-            # 添加HTML和纯文本两种格式（邮件客户端会自动选择）
-            msg.attach(MIMEText(email_body_plain, 'plain', 'utf-8'))
-            msg.attach(MIMEText(email_body_html, 'html', 'utf-8'))
-            
-            # 根据配置选择SSL或TLS连接
-            use_ssl = self.smtp_config.get('use_ssl', False)
-            use_tls = self.smtp_config.get('use_tls', False)
-            
-            # 准备收件人列表
-            to_emails = self.smtp_config['to_email']
-            if isinstance(to_emails, str):
-                to_emails = [e.strip() for e in to_emails.split(',')]
-            elif not isinstance(to_emails, list):
-                to_emails = [to_emails]
-            
-            if use_ssl:
-                # 使用SSL连接（如新浪邮箱）
-                with smtplib.SMTP_SSL(self.smtp_config['smtp_server'], self.smtp_config['smtp_port']) as server:
-                    server.login(self.smtp_config['from_email'], self.smtp_config['password'])
-                    server.sendmail(self.smtp_config['from_email'], to_emails, msg.as_string())
+        # 记录指标与日志，无法判断时通知，否则按事件变化逐条通知
+        with self._state_locked():
+            self.processor.process(self.target_service, result, time.time(), self.last_status, quiet, timer)
+            # 通知可能阻塞到超过期限，期间已由新线程接替：之后的每一步写入前都重新确认
+            if self._superseded("保存状态"):
+                return result
+            if result['status'] is None:
+                self._save_status("Unknown", check_time)
             else:
-                # 使用普通SMTP连接，可选TLS
-                with smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port']) as server:
-                    if use_tls:
-                        server.starttls()
-                    server.login(self.smtp_config['from_email'], self.smtp_config['password'])
-                    server.sendmail(self.smtp_config['from_email'], to_emails, msg.as_string())
-            
-            logger.info(f"邮件通知发送成功: {subject}")
-            return True
-            
-        except smtplib.SMTPAuthenticationError as e:
-            logger.error(f"邮件认证失败，请检查邮箱和密码配置: {e}")
-            return False
-        except smtplib.SMTPException as e:
-            logger.error(f"SMTP错误: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"发送邮件失败: {e}")
-            return False
-    
-    def _check_and_notify(self):
-        """执行一次检测并发送通知"""
-        check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_msg = f"开始检测 [{check_time}]"
-        logger.info(log_msg)
-        _log_to_queue(self.log_queue, 'INFO', log_msg)
+                self._save_status(result['status'], check_time)
+                self.last_status = result['status']
         
-        # 仅使用官方状态数据接口
-        result = self._fetch_status_from_api()
+        # 分阶段耗时写入检测结果与指标
+        timer.add('total', timer.total())
+        for phase, seconds in timer.seconds().items():
+            metrics.CHECK_DURATION.observe(seconds, phase=phase)
+        result['check_time'] = check_time
+        result['timings'] = timer.as_dict()
+        result['checked_at'] = time.time()
+        # 拉取失败（超时、连接错误、数据无法解析）时的耗时不反映接口正常响应的快慢：不计入基线，历史中记为 NaN
+        fetch_latency = self._fetch_latency(timer.seconds()) if self._last_data is not None else None
+        if self._superseded("记录检测历史与数据接口健康度"):
+            return result
+        self._record_history(result, fetch_latency)
+        feed_notification = self._observe_feed_health(fetch_latency)
+        if feed_notification:
+            result['notifications'].append(feed_notification)
+        if self.feed_health:
+            result['feed_health'] = self.feed_health.to_dict()
+        
+        if quiet and not result.get('notifications'):
+            line = self.log_rollup.add(fetch_latency, result['checked_at'])
+            if line:
+                logger.info(line)
+                _log_to_queue(self.log_queue, 'INFO', line)
+            self._notify_listeners(result)
+            return result
+        self._flush_log_rollup()
+        self._summarized_status = result['status']
         
-        # 记录检测结果总结（包含判断依据）
+        # 记录检测结果总结（包含判断依据与阶段耗时）
         summary_lines = [
             "=" * 80,
             f"检测结果总结 [{check_time}]",
@@ -447,85 +589,124 @@ class AppleStatusMonitor:
             summary_lines.append(f"  异常类型: {result['error_type']}")
         if result['error_message']:
             summary_lines.append(f"  详细信息: {result['error_message']}")
+        if self.feed_health and self.feed_health.degraded:
+            summary_lines.append(f"  数据接口: 降级（{'；'.join(self.feed_health.reasons)}）")
+        for notification in result.get('notifications') or []:
+            channels = ', '.join(f"{c['channel']}={c['outcome']}({c['elapsed_ms']:.0f}ms)"
+                                 for c in notification['channels'])
+            summary_lines.append(f"  通知: {notification['subject']} -> {channels}")
+        timing_line = f"  阶段耗时: {timer.format()}"
+        summary_lines.append(timing_line)
         summary_lines.append("=" * 80)
         
         for line in summary_lines:
             logger.info(line)
-            _log_to_queue(self.log_queue, 'INFO', line)
+            extra = {'timings': result['timings']} if line is timing_line else {}
+            _log_to_queue(self.log_queue, 'INFO', line, **extra)
         
-        # 记录日志
-        if result['status'] is None:
-            # 接口或配置问题
-            error_msg = f"检测失败: {result['error_message']}"
-            logger.error(error_msg)
-            _log_to_queue(self.log_queue, 'ERROR', error_msg)
-            self._send_email(
-                subject=f"⚠️ {result['error_type']} - {self.target_service}",
-                body=result['error_message'],
-                error_type=result['error_type']
-            )
-            self._save_status("Unknown", check_time)
-            
-        elif result['status'] == 'Unavailable':
-            # 服务不可用
-            warn_msg = f"服务状态异常: {result['error_message']}"
-            logger.warning(warn_msg)
-            _log_to_queue(self.log_queue, 'WARNING', warn_msg)
-            # 只在状态变化时发送通知
-            if self.last_status != 'Unavailable':
-                self._send_email(
-                    subject=f"⚠️ 服务状态异常 - {self.target_service}",
-                    body=result['error_message'],
-                    error_type=result['error_type']
-                )
-            self._save_status('Unavailable', check_time)
-            self.last_status = 'Unavailable'
-            
+        self._notify_listeners(result)
+        return result
+    
+    @staticmethod
+    def _fetch_latency(seconds: Dict[str, float]) -> Optional[float]:
+        """拉取耗时为等待与传输之和；使用共享缓存等未发出请求时为 None"""
+        if 'http_wait' in seconds or 'http_transfer' in seconds:
+            return seconds.get('http_wait', 0.0) + seconds.get('http_transfer', 0.0)
+        return None
+    
+    def _is_quiet(self, result: Dict[str, Any]) -> bool:
+        """日志预算：上次总结时已是正常、本次仍正常且没有错误的检测不逐次输出"""
+        return (self.log_rollup is not None and result['status'] == 'Available' and not result['error_type']
+                and self._summarized_status == 'Available')
+    
+    def _flush_log_rollup(self):
+        line = self.log_rollup.flush() if self.log_rollup else None
+        if line:
+            logger.info(line)
+            _log_to_queue(self.log_queue, 'INFO', line)
+    
+    def _seed_feed_health(self):
+        """用检测历史中最近 7 天的拉取耗时预热基线"""
+        if not self.history:
+            return
+        try:
+            self.feed_health.seed_latency(record.latency for record in self.history.iter_records(
+                self.target_service, start=time.time() - 7 * 86400))
+        except OSError as e:
+            logger.warning(f"读取检测历史失败，数据接口健康度基线将重新积累: {e}")
+    
+    def _observe_feed_health(self, latency: Optional[float]) -> Optional[Dict[str, Any]]:
+        """记录本次拉取的耗时与数据大小；进入或解除降级时记录日志并（按配置）发送低优先级通知"""
+        if not self.feed_health or latency is None:
+            # 使用共享缓存等未实际拉取时不计入
+            return None
+        change = self.feed_health.observe(latency, self._last_payload_size)
+        if change is None:
+            return None
+        metrics.FEED_DEGRADED.set(1 if change.degraded else 0, feed=change.feed)
+        if change.degraded:
+            detail = '；'.join(change.reasons)
+            log_msg = f"数据接口降级: {detail}"
+            logger.warning(log_msg)
+            _log_to_queue(self.log_queue, 'WARNING', log_msg)
+            subject = f"ℹ️ 数据接口降级 - {self.target_service}"
+            body = (f"状态数据接口 {change.feed} 的响应持续偏离基线：{detail}\n"
+                    f"服务状态判断不受影响，可能是接口即将出现故障的前兆")
+            error_type = '数据接口降级'
         else:
-            # 服务正常
-            info_msg = f"服务状态正常: {result['status']}"
-            logger.info(info_msg)
-            _log_to_queue(self.log_queue, 'INFO', info_msg)
-            # 如果从异常恢复到正常，也发送通知
-            if self.last_status == 'Unavailable':
-                self._send_email(
-                    subject=f"✅ 服务已恢复正常 - {self.target_service}",
-                    body=f"服务状态已恢复为 Available",
-                    error_type="状态恢复"
-                )
-            self._save_status('Available', check_time)
-            self.last_status = 'Available'
+            log_msg = "数据接口已恢复：拉取耗时与数据大小回到基线范围"
+            logger.info(log_msg)
+            _log_to_queue(self.log_queue, 'INFO', log_msg)
+            subject = f"ℹ️ 数据接口恢复 - {self.target_service}"
+            body = f"状态数据接口 {change.feed} 的拉取耗时与数据大小已回到基线范围"
+            error_type = '数据接口恢复'
+        if not self.feed_health_notify:
+            return None
+        return self._notify(subject=subject, body=body, error_type=error_type)
+    
+    def _record_history(self, result: Dict[str, Any], latency: Optional[float]):
+        """追加一条检测历史"""
+        if not self.history:
+            return
+        try:
+            self.history.append(self.target_service, result['checked_at'], result['status'], latency)
+        except OSError as e:
+            logger.error(f"写入检测历史失败: {e}")
+    
+    def add_listener(self, callback):
+        """注册检测结果回调，callback(result) 在监控线程中调用，应尽快返回"""
+        self._listeners.append(callback)
+    
+    def _notify_listeners(self, result: Dict[str, Any]):
+        if not self._listeners or self._superseded("回调检测结果订阅者"):
+            return
+        if self._last_data is not None:
+            result['services'] = self._summarize_services(self._last_data)
+        for callback in list(self._listeners):
+            try:
+                callback(result)
+            except Exception as e:
+                logger.error(f"检测结果回调执行失败: {e}", exc_info=True)
     
     def run(self):
-        """运行监控循环"""
+        """运行监控循环；启用看门狗时检测在工作线程中进行，当前线程等待停止"""
         self._running = True
-        startup_lines = [
-            "=" * 60,
-            "Apple Developer System Status Monitor 启动",
-            f"监控服务: {self.target_service}",
-            f"检测间隔: {self.check_interval}秒 ({self.check_interval // 60}分钟)",
-            f"重试次数: {self.retry_count}",
-            "=" * 60
-        ]
-        for line in startup_lines:
-            logger.info(line)
-            _log_to_queue(self.log_queue, 'INFO', line)
+        self._log_startup()
         
+        metrics_server = self._start_metrics_server()
+        watchdog = None
+        if getattr(config, 'WATCHDOG_ENABLED', True):
+            watchdog = Watchdog(self.heartbeat, self._on_stall,
+                                getattr(config, 'WATCHDOG_POLL_INTERVAL', DEFAULT_POLL_INTERVAL)).start()
         try:
-            while self._running and (self.stop_event is None or not self.stop_event.is_set()):
-                self._check_and_notify()
-                wait_msg = f"等待 {self.check_interval}秒后进行下次检测..."
-                logger.info(wait_msg)
-                _log_to_queue(self.log_queue, 'INFO', wait_msg)
-                
-                # 使用可中断的sleep
-                if self.stop_event:
-                    for _ in range(self.check_interval):
-                        if self.stop_event.is_set():
-                            break
-                        time.sleep(1)
-                else:
-                    time.sleep(self.check_interval)
+            if watchdog:
+                self._start_worker()
+                while not self._worker_exited.wait(1):
+                    pass
+                if self._worker_error is not None:
+                    raise self._worker_error
+            else:
+                self._run_loop()
             
             stop_msg = "监控已停止"
             logger.info(stop_msg)
@@ -542,6 +723,138 @@ class AppleStatusMonitor:
             raise
         finally:
             self._running = False
+            if watchdog:
+                watchdog.stop()
+                # 给正在进行的检测一点时间收尾（工作线程为守护线程，不会阻止进程退出）
+                worker = self._worker
+                if worker is not None and worker is not threading.current_thread():
+                    worker.join(timeout=5)
+            self._flush_log_rollup()
+            self.heartbeat.remove()
+            if metrics_server:
+                metrics_server.stop()
+            self.close()
+    
+    def _run_loop(self):
+        while self._running and (self.stop_event is None or not self.stop_event.is_set()):
+            self._check_and_notify()
+            if not self._is_current_worker():
+                return
+            if self.log_policy == FULL:
+                wait_msg = f"等待 {self.check_interval}秒后进行下次检测..."
+                logger.info(wait_msg)
+                _log_to_queue(self.log_queue, 'INFO', wait_msg)
+            self.heartbeat.beat('sleep', self.check_interval + self.watchdog_grace)
+            
+            # 使用可中断的sleep（stop() 与 stop_event 都在 1 秒内生效）
+            deadline = time.monotonic() + self.check_interval
+            while self._running and (self.stop_event is None or not self.stop_event.is_set()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(1.0, remaining))
+    
+    def _is_current_worker(self) -> bool:
+        """未启用看门狗（或单次检测）时总是 True；否则判断当前线程是否仍是负责检测的工作线程"""
+        return self._worker is None or threading.current_thread() is self._worker
+    
+    def _superseded(self, step: str) -> bool:
+        """当前线程已被看门狗替换时记录日志并返回 True：迟到的旧线程不再通知、写状态、记录历史或回调订阅者"""
+        if self._is_current_worker():
+            return False
+        logger.warning(f"检测线程已被看门狗替换，跳过{step}")
+        return True
+    
+    def _start_worker(self):
+        self._worker_exited.clear()
+        self._worker = threading.Thread(target=self._worker_main, name='monitor-worker', daemon=True)
+        self._worker.start()
+    
+    def _worker_main(self):
+        try:
+            self._run_loop()
+        except BaseException as e:
+            if self._is_current_worker():
+                self._worker_error = e
+            else:
+                logger.warning(f"已被替换的检测线程退出: {e}")
+        finally:
+            if self._is_current_worker():
+                self._worker_exited.set()
+    
+    def _on_stall(self, stall: Stall, stack: str):
+        """看门狗回调：记录卡住线程的调用栈，放弃该线程，换新的 HTTP 会话与工作线程继续检测"""
+        self.heartbeat.restarts += 1
+        metrics.WATCHDOG_RESTARTS.inc(phase=stall.phase)
+        error_msg = (f"检测线程在 {stall.phase} 阶段已 {stall.elapsed:.0f} 秒无响应（超过该阶段的期限），"
+                     f"已放弃该线程并使用新的 HTTP 会话重新开始检测（第 {self.heartbeat.restarts} 次）")
+        logger.error(f"{error_msg}\n卡住线程的调用栈:\n{stack}")
+        _log_to_queue(self.log_queue, 'ERROR', error_msg)
+        
+        # 线程无法被强制结束：旧线程持有的传输层直接关闭（可能使阻塞的读取提前出错返回），
+        # 新线程首次拉取时创建新的传输层；旧线程返回后发现已被替换会自行退出
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            try:
+                transport.close()
+            except Exception as e:
+                logger.warning(f"关闭卡住线程的 HTTP 会话失败: {e}")
+        # 卡住的线程可能已按本次数据更新了内存中的事件记录，但其后的通知与保存都会跳过：
+        # 新线程先换回状态文件中的记录，未发出的通知不会因此丢失
+        self._state_stale = True
+        self._start_worker()
+        
+        notification = Notification.create(f"⚠️ 监控线程卡住 - {self.target_service}",
+                                           f"{error_msg}\n卡住时的调用栈（最内层在最后）:\n{stack}",
+                                           '监控线程卡住', self.target_service)
+        self.dispatcher.dispatch(notification)
+    
+    def run_once(self) -> Dict[str, Any]:
+        """执行一次检测与通知后释放资源（归档在后台线程写完后才返回），供 --once / --check-only 使用"""
+        try:
+            return self._check_and_notify()
+        finally:
+            self.close()
+    
+    def close(self):
+        """关闭归档线程、对冲线程池、HTTP 连接与通知渠道"""
+        if self.recorder:
+            self.recorder.close()
+        if self.hedger:
+            self.hedger.close()
+        if self._transport:
+            self._transport.close()
+        self.dispatcher.close()
+    
+    def _log_startup(self):
+        startup_lines = [
+            "=" * 60,
+            "Apple Developer System Status Monitor 启动",
+            f"监控服务: {self.target_service}",
+            f"检测间隔: {self.check_interval}秒 ({self.check_interval // 60}分钟)",
+            f"重试次数: {self.retry_count}",
+            f"告警规则: {len(self.alert_rules)} 条" if self.alert_rules else "告警规则: 未配置（所有未解决事件均告警）",
+            "=" * 60
+        ]
+        for line in startup_lines:
+            logger.info(line)
+            _log_to_queue(self.log_queue, 'INFO', line)
+    
+    def _start_metrics_server(self) -> Optional['metrics.MetricsServer']:
+        """按配置启动本地指标端点（METRICS_PORT 未配置时不启动）"""
+        if self.log_queue is not None:
+            metrics.LOG_QUEUE_DEPTH.set_function(self.log_queue.qsize)
+        port = getattr(config, 'METRICS_PORT', None)
+        if not port:
+            return None
+        host = getattr(config, 'METRICS_HOST', '127.0.0.1')
+        try:
+            server = metrics.MetricsServer(host, port).start()
+        except OSError as e:
+            logger.warning(f"指标端点启动失败 ({host}:{port}): {e}")
+            return None
+        logger.info(f"指标端点已启动: http://{host}:{port}/metrics")
+        return server
     
     def stop(self):
         """停止监控"""
@@ -550,7 +863,53 @@ class AppleStatusMonitor:
             self.stop_event.set()
 
 
+# 单次检测模式的退出码：服务正常 / 服务异常 / 无法判断（接口错误、服务未找到等）
+EXIT_AVAILABLE = 0
+EXIT_UNAVAILABLE = 1
+EXIT_UNKNOWN = 2
+
+
+def one_shot_summary(result: Dict[str, Any], check_only: bool = False) -> Dict[str, Any]:
+    """单次检测输出的精简结果（一行 JSON）；只检测时没有发送通知，本应发送的通知主题放在 would_notify 中"""
+    subjects = [notification['subject'] for notification in result.get('notifications') or []]
+    return {
+        'service': config.TARGET_SERVICE,
+        'status': result['status'] or 'Unknown',
+        'check_time': result['check_time'],
+        'error_type': result['error_type'],
+        'error_message': result['error_message'],
+        'deltas': [{'kind': delta['kind'], 'summary': delta['summary']} for delta in result.get('deltas') or []],
+        'would_notify' if check_only else 'notifications': subjects,
+        'total_ms': result['timings'].get('total'),
+    }
+
+
+def main(argv=None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Apple Developer System Status 监控')
+    parser.add_argument('--once', action='store_true', help='检测并发送通知一次后退出（适合 cron / systemd timer）')
+    parser.add_argument('--check-only', action='store_true',
+                        help='只检测一次并输出结果，不发送通知、不写状态文件')
+    parser.add_argument('--log-file', action='store_true', help='单次模式下同时写入 logs/ 日志文件（默认只输出警告到标准错误）')
+    args = parser.parse_args(argv)
+
+    if not (args.once or args.check_only):
+        setup_logging()
+        monitor = AppleStatusMonitor()
+        install_signal_handler(monitor.profiler, getattr(config, 'PROFILE_CHECKS', 1))
+        monitor.run()
+        return 0
+
+    # 单次模式：标准输出只有一行 JSON 结果，退出码表示服务状态
+    setup_logging(log_file=args.log_file, console_level=logging.WARNING)
+    monitor = AppleStatusMonitor(check_only=args.check_only, one_shot=True)
+    result = monitor.run_once()
+    print(json.dumps(one_shot_summary(result, args.check_only), ensure_ascii=False, separators=(',', ':')))
+    if result['status'] == 'Available':
+        return EXIT_AVAILABLE
+    return EXIT_UNAVAILABLE if result['status'] == 'Unavailable' else EXIT_UNKNOWN
+
+
 if __name__ == "__main__":
-    monitor = AppleStatusMonitor()
-    monitor.run()
+    sys.exit(main())
 
@@ -46,6 +46,7 @@ class MonitorGUI:
         self.monitor = None
         self.monitor_thread = None
         self.log_queue = queue.Queue()
+        self.result_queue = queue.Queue()
         self.stop_event = threading.Event()
         self.is_running = False
         
@@ -82,6 +83,7 @@ class MonitorGUI:
             [sg.Text('=' * 60)],
             [sg.Text('状态: 未运行', key='-STATUS-')],
             [sg.Text('', key='-LAST_CHECK-')],
+            [sg.Text('', key='-FEED-', size=(80, 1))],
         ]
         
         window = sg.Window(
@@ -160,6 +162,8 @@ class MonitorGUI:
             log_queue=self.log_queue,
             stop_event=self.stop_event
         )
+        # 检测结果经队列交给界面线程更新最后检查时间（日志预算下正常的检测不再输出"开始检测"日志）
+        self.monitor.add_listener(self.result_queue.put)
         
         # 启动监控线程
         self.monitor_thread = threading.Thread(target=self.monitor.run, daemon=True)
@@ -225,12 +229,18 @@ class MonitorGUI:
             while True:
                 log_entry = self.log_queue.get_nowait()
                 self._add_log(log_entry['level'], log_entry['message'])
-                
-                # 更新最后检查时间
-                if '开始检测' in log_entry['message']:
-                    self.window['-LAST_CHECK-'].update(
-                        f'最后检查: {log_entry["timestamp"]}'
-                    )
+        except queue.Empty:
+            pass
+        
+        # 更新最后检查时间
+        try:
+            while True:
+                result = self.result_queue.get_nowait()
+                self.window['-LAST_CHECK-'].update(f"最后检查: {result['check_time']}")
+                health = result.get('feed_health')
+                if health:
+                    self.window['-FEED-'].update(
+                        f"数据接口: ⚠️ 降级 - {'；'.join(health['reasons'])}" if health['degraded'] else '数据接口: 正常')
         except queue.Empty:
             pass
     
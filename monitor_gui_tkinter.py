@@ -11,6 +11,7 @@ import threading
 import queue
 import sys
 import os
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -18,9 +19,123 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(__file__))
 
 from monitor import AppleStatusMonitor
+from check_history import CheckHistory, HistorySeries, status_code, AVAILABLE, UNAVAILABLE, UNKNOWN, EMPTY
 import config
 
 
+class HistoryTimeline:
+    """检测历史时间线：每个服务一行，按画布像素宽度降采样后合并成色块绘制；新的检测只重绘其所在的一列"""
+    
+    RANGES = [('1 小时', 3600), ('24 小时', 86400), ('7 天', 7 * 86400), ('30 天', 30 * 86400), ('1 年', 365 * 86400)]
+    COLORS = {AVAILABLE: '#27AE60', UNAVAILABLE: '#E74C3C', UNKNOWN: '#95A5A6'}
+    EMPTY_COLOR = '#ECF0F1'
+    ROW_HEIGHT = 30  # 服务名 14px + 色条 12px + 间距
+    BAR_HEIGHT = 12
+    
+    def __init__(self, parent, history, bg, fg, services=()):
+        self.history = history
+        self.series = {}
+        self.columns = {}
+        self.start = self.end = 0.0
+        self._redraw_pending = None
+        
+        header = tk.Frame(parent, bg=bg)
+        header.pack(fill=tk.X)
+        tk.Label(header, text='📈 历史记录', font=('Arial', 13, 'bold'), bg=bg, fg=fg).pack(side=tk.LEFT)
+        self.range_var = tk.StringVar(value=self.RANGES[1][0])
+        range_box = ttk.Combobox(header, textvariable=self.range_var, values=[name for name, _ in self.RANGES],
+                                 state='readonly', width=8)
+        range_box.pack(side=tk.RIGHT)
+        range_box.bind('<<ComboboxSelected>>', lambda _: self.redraw())
+        self.render_label = tk.Label(header, text='', font=('Arial', 8), bg=bg, fg='#95A5A6')
+        self.render_label.pack(side=tk.RIGHT, padx=10)
+        
+        self.canvas = tk.Canvas(parent, height=self.ROW_HEIGHT + 16, bg=bg, highlightthickness=0)
+        self.canvas.pack(fill=tk.X, pady=(8, 0))
+        self.canvas.bind('<Configure>', lambda _: self._schedule_redraw())
+        
+        self.load(services)
+    
+    @property
+    def span(self) -> float:
+        return dict(self.RANGES).get(self.range_var.get(), self.RANGES[1][1])
+    
+    def load(self, services=()):
+        """从历史文件读取全部服务（services 中的服务即使还没有记录也显示一行）"""
+        self.series = self.history.load_all() if self.history else {}
+        for service in services:
+            self.series.setdefault(service, HistorySeries())
+        self.canvas.config(height=max(1, len(self.series)) * self.ROW_HEIGHT + 16)
+        self._schedule_redraw()
+    
+    def _schedule_redraw(self):
+        # 拖动窗口大小时 <Configure> 连续触发，合并为一次重绘
+        if self._redraw_pending is not None:
+            self.canvas.after_cancel(self._redraw_pending)
+        self._redraw_pending = self.canvas.after(50, self.redraw)
+    
+    def redraw(self):
+        """整体重绘：时间窗口右端留出 1/20 的余量，之后的检测落在窗口内时只需增量绘制"""
+        self._redraw_pending = None
+        started = time.perf_counter()
+        width = max(1, self.canvas.winfo_width())
+        span = self.span
+        self.end = time.time() + span / 20
+        self.start = self.end - span
+        self.canvas.delete('all')
+        self.columns = {}
+        records = 0
+        for row, (service, series) in enumerate(self.series.items()):
+            records += len(series)
+            columns = series.downsample(self.start, self.end, width)
+            self.columns[service] = columns
+            top = row * self.ROW_HEIGHT
+            self.canvas.create_text(0, top, text=service, anchor=tk.NW, font=('Arial', 9), fill='#34495E')
+            self.canvas.create_rectangle(0, top + 14, width, top + 14 + self.BAR_HEIGHT,
+                                         fill=self.EMPTY_COLOR, width=0)
+            # 相邻同色的列合并为一个色块，画布上的图形数与状态变化次数相当，而不是与像素数或记录数相当
+            run_start = 0
+            for column in range(1, width + 1):
+                if column == width or columns[column] != columns[run_start]:
+                    self._draw_run(row, columns[run_start], run_start, column)
+                    run_start = column
+        axis_top = len(self.series) * self.ROW_HEIGHT
+        self.canvas.create_text(0, axis_top, anchor=tk.NW, font=('Arial', 8), fill='#95A5A6',
+                                text=datetime.fromtimestamp(self.start).strftime('%Y-%m-%d %H:%M'))
+        self.canvas.create_text(width, axis_top, anchor=tk.NE, font=('Arial', 8), fill='#95A5A6',
+                                text=datetime.fromtimestamp(self.end).strftime('%Y-%m-%d %H:%M'))
+        elapsed = (time.perf_counter() - started) * 1000
+        self.render_label.config(text=f"{records} 条记录，绘制 {elapsed:.0f}ms")
+    
+    def _draw_run(self, row: int, code: int, first: int, last: int):
+        if code == EMPTY:
+            return
+        top = row * self.ROW_HEIGHT + 14
+        # 每一列对应一个像素
+        self.canvas.create_rectangle(first, top, last, top + self.BAR_HEIGHT, fill=self.COLORS[code], width=0)
+    
+    def add_check(self, service: str, timestamp: float, status):
+        """追加一次检测；只重新计算并绘制它所在的那一列，超出时间窗口或出现新服务时才整体重绘"""
+        series = self.series.get(service)
+        if series is None:
+            # 新服务需要增加一行：重新读取历史文件（监控器已写入这次检测）
+            self.load([*self.series, service])
+            return
+        series.append(timestamp, status_code(status))
+        columns = self.columns.get(service)
+        if not columns or not self.start <= timestamp < self.end:
+            self._schedule_redraw()
+            return
+        width = len(columns)
+        step = (self.end - self.start) / width
+        column = min(width - 1, int((timestamp - self.start) / step))
+        lo = series.index_at(self.start + step * column)
+        code = series.worst_status(lo, series.index_at(self.start + step * (column + 1)))
+        if code != columns[column]:
+            columns[column] = code
+            self._draw_run(list(self.series).index(service), code, column, column + 1)
+
+
 class MonitorGUI:
     """监控程序GUI界面（使用tkinter）"""
     
@@ -28,6 +143,7 @@ class MonitorGUI:
         self.monitor = None
         self.monitor_thread = None
         self.log_queue = queue.Queue()
+        self.history_queue = queue.Queue()
         self.stop_event = threading.Event()
         self.is_running = False
         
@@ -35,7 +151,7 @@ class MonitorGUI:
         print("正在创建主窗口...")
         self.root = tk.Tk()
         self.root.title('Apple Developer System Status Monitor')
-        self.root.geometry('900x750')
+        self.root.geometry('900x850')
         self.root.resizable(True, True)
         
         print("窗口基础设置完成，开始创建界面组件...")
@@ -180,6 +296,14 @@ class MonitorGUI:
                                         fg='#7F8C8D')
         self.status_text_label.pack(side=tk.LEFT)
         
+        # 历史记录时间线
+        history_frame = tk.Frame(main_frame, bg=frame_bg, relief=tk.RAISED, bd=1, padx=15, pady=12)
+        history_frame.pack(fill=tk.X, pady=(0, 10))
+        history = None
+        if getattr(config, 'CHECK_HISTORY_ENABLED', True):
+            history = CheckHistory(Path(getattr(config, 'CHECK_HISTORY_DIR', None) or Path(__file__).parent / "history"))
+        self.timeline = HistoryTimeline(history_frame, history, frame_bg, title_color, [config.TARGET_SERVICE])
+        
         # 按钮区域 - 使用卡片式设计
         button_frame = tk.Frame(main_frame, bg=frame_bg, relief=tk.RAISED, bd=1, padx=15, pady=15)
         button_frame.pack(fill=tk.X, pady=(0, 10))
@@ -245,6 +369,24 @@ class MonitorGUI:
                                      highlightthickness=0)
         self.clear_button.pack(side=tk.LEFT, padx=8)
         
+        self.profile_button = tk.Button(button_container, 
+                                       text='🔬 性能分析', 
+                                       command=self._arm_profiling,
+                                       state=tk.DISABLED,
+                                       font=('Arial', 12, 'bold'),
+                                       bg='#8E44AD',
+                                       fg='#FFFFFF',
+                                       activebackground='#7D3C98',
+                                       activeforeground='#FFFFFF',
+                                       relief=tk.RAISED,
+                                       bd=3,
+                                       padx=25,
+                                       pady=10,
+                                       cursor='hand2',
+                                       highlightthickness=0,
+                                       disabledforeground='#FFFFFF')
+        self.profile_button.pack(side=tk.LEFT, padx=8)
+        
         # 日志区域 - 使用卡片式设计
         log_frame = tk.Frame(main_frame, bg=frame_bg, relief=tk.RAISED, bd=1, padx=15, pady=15)
         log_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
@@ -299,6 +441,24 @@ class MonitorGUI:
                                          bg=frame_bg)
         self.last_check_label.pack(anchor=tk.W)
         
+        self.timing_label = tk.Label(status_frame, 
+                                     text='', 
+                                     font=('Arial', 9), 
+                                     fg='#95A5A6', 
+                                     bg=frame_bg,
+                                     justify=tk.LEFT,
+                                     wraplength=820)
+        self.timing_label.pack(anchor=tk.W)
+        
+        self.feed_label = tk.Label(status_frame, 
+                                   text='', 
+                                   font=('Arial', 9), 
+                                   fg='#95A5A6', 
+                                   bg=frame_bg,
+                                   justify=tk.LEFT,
+                                   wraplength=820)
+        self.feed_label.pack(anchor=tk.W)
+        
         # 设置窗口背景
         self.root.configure(bg=bg_color)
         
@@ -364,6 +524,7 @@ class MonitorGUI:
         
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
+        self.profile_button.config(state=tk.NORMAL)
         
         # 重置停止事件
         self.stop_event.clear()
@@ -378,6 +539,10 @@ class MonitorGUI:
             stop_event=self.stop_event
         )
         
+        # 检测结果在监控线程中回调，经队列交给界面线程（时间线、最后检查时间、阶段耗时）；
+        # 日志预算下正常的检测不再输出日志，这些信息不能再从日志中解析
+        self.monitor.add_listener(self.history_queue.put)
+        
         # 启动监控线程
         self.monitor_thread = threading.Thread(target=self.monitor.run, daemon=True)
         self.monitor_thread.start()
@@ -412,6 +577,7 @@ class MonitorGUI:
         
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
+        self.profile_button.config(state=tk.DISABLED)
         
         # 更新状态指示器
         self.status_indicator.delete('all')
@@ -422,6 +588,14 @@ class MonitorGUI:
         self.status_label.config(text='状态: 已停止', fg='#E74C3C')
         self._add_log('INFO', '监控已停止')
     
+    def _arm_profiling(self):
+        """对接下来的检测开启 cProfile 分析，结果写入 logs/"""
+        if not self.monitor:
+            return
+        count = getattr(config, 'PROFILE_CHECKS', 1)
+        self.monitor.profiler.arm(count)
+        self._add_log('INFO', f'已开启性能分析：接下来 {count} 次检测，结果保存在 logs/ 目录')
+    
     def _add_log(self, level, message):
         """添加日志到显示区域"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -438,16 +612,34 @@ class MonitorGUI:
             while True:
                 log_entry = self.log_queue.get_nowait()
                 self._add_log(log_entry['level'], log_entry['message'])
-                
-                # 更新最后检查时间
-                if '开始检测' in log_entry['message']:
-                    self.last_check_label.config(text=f"最后检查: {log_entry['timestamp']}")
+        except queue.Empty:
+            pass
+        
+        try:
+            while True:
+                result = self.history_queue.get_nowait()
+                self.timeline.add_check(self.monitor.target_service, result['checked_at'], result['status'])
+                self.last_check_label.config(text=f"最后检查: {result['check_time']}")
+                text = '  '.join(f"{name} {ms:.0f}ms" for name, ms in result['timings'].items())
+                self.timing_label.config(text=f"阶段耗时: {text}")
+                self._update_feed_label(result.get('feed_health'))
         except queue.Empty:
             pass
         
         # 每100ms检查一次
         self.root.after(100, self._process_log_queue)
     
+    def _update_feed_label(self, health):
+        """数据接口健康度：降级时以醒目颜色显示偏离说明"""
+        if not health:
+            return
+        latency = health['latency']
+        if health['degraded']:
+            self.feed_label.config(text=f"数据接口: ⚠️ 降级 - {'；'.join(health['reasons'])}", fg='#E67E22')
+        elif latency['ewma'] is not None and latency['p50'] is not None:
+            self.feed_label.config(text=f"数据接口: 正常（拉取耗时近期 {latency['ewma'] * 1000:.0f}ms，"
+                                        f"基线 p50 {latency['p50'] * 1000:.0f}ms）", fg='#95A5A6')
+    
     def _clear_logs(self):
         """清空日志"""
         self.log_text.config(state=tk.NORMAL)
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知渠道
+每个渠道（邮件、Webhook、本地命令、文件）实现统一的 send 接口；分发器把同一条通知并行发送到所有启用的渠道，
+每个渠道有独立的超时，慢渠道不会拖慢其他渠道，结果（耗时与成败）返回给检测结果
+"""
+
+import json
+import logging
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import metrics
+from profiling import PhaseTimer
+
+logger = logging.getLogger(__name__)
+
+SUCCESS = 'success'
+FAILURE = 'failure'
+SKIPPED = 'skipped'
+TIMEOUT = 'timeout'
+
+# 各渠道默认超时（秒），可在 config.NOTIFY_CHANNEL_TIMEOUTS 中覆盖
+DEFAULT_CHANNEL_TIMEOUTS = {'email': 30.0, 'webhook': 15.0, 'command': 10.0, 'file': 5.0}
+
+# 示例配置中的占位值，未修改时跳过邮件发送
+EMAIL_PLACEHOLDERS = {
+    'from_email': {'your_email@gmail.com'},
+    'password': {'your_app_password', 'your_sina_password'},
+    'to_email': {'notify@example.com'},
+}
+
+
+class Notification(NamedTuple):
+    subject: str
+    body: str
+    error_type: Optional[str]
+    service: str
+    time: str
+    recipients: Optional[Tuple[str, ...]] = None  # 指定时代替配置中的默认收件人（多份监控定义共用一个分发器）
+
+    @classmethod
+    def create(cls, subject: str, body: str, error_type: Optional[str], service: str,
+               recipients: Optional[Sequence[str]] = None) -> 'Notification':
+        return cls(subject, body, error_type, service, datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                   tuple(recipients) if recipients is not None else None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self._asdict()
+        if self.recipients is None:
+            del data['recipients']
+        return data
+
+
+class ChannelResult(NamedTuple):
+    channel: str
+    outcome: str  # success / failure / skipped / timeout
+    elapsed: float  # 秒
+    detail: Optional[str] = None
+    phases: Optional[Dict[str, float]] = None  # 渠道内部的分阶段耗时（秒），如邮件的渲染、连接与发送
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {'channel': self.channel, 'outcome': self.outcome,
+                'elapsed_ms': round(self.elapsed * 1000, 1), 'detail': self.detail}
+        if self.phases:
+            data['phases_ms'] = {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()}
+        return data
+
+
+class ChannelSkipped(Exception):
+    """渠道未配置或本次通知无需发送"""
+
+
+class Channel:
+    """通知渠道基类：send 成功时返回说明文字（可为 None），失败时抛出异常；timer 用于记录渠道内部的阶段耗时，
+    deadline 为分发的整体期限（time.monotonic() 时刻），渠道的请求超时与重试不应超过它"""
+
+    name = 'channel'
+
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = float(timeout)
+
+    def send(self, notification: Notification, timer: Optional[PhaseTimer] = None,
+             deadline: Optional[float] = None) -> Optional[str]:
+        raise NotImplementedError
+
+    def time_left(self, deadline: Optional[float]) -> float:
+        """本次发送还可用的秒数：渠道超时与到整体期限的剩余时间中较小的一个"""
+        return self.timeout if deadline is None else min(self.timeout, deadline - time.monotonic())
+
+    def close(self):
+        pass
+
+
+class EmailChannel(Channel):
+    """SMTP 邮件；配置了订阅时按服务与级别解析收件人分组，每组一封"""
+
+    name = 'email'
+
+    def __init__(self, smtp_config: Dict[str, Any], monitor_url: str, subscriptions=None, timeout: float = 30.0):
+        super().__init__(timeout)
+        self.smtp_config = smtp_config
+        self.monitor_url = monitor_url
+        self.subscriptions = subscriptions
+
+    def is_configured(self) -> bool:
+        """发件人与密码是否已从示例值修改"""
+        for field in ('from_email', 'password'):
+            if self.smtp_config.get(field) in EMAIL_PLACEHOLDERS[field]:
+                return False
+        return True
+
+    def default_recipients(self) -> List[str]:
+        """配置中的收件人（支持逗号分隔的多个邮箱）"""
+        to_emails = self.smtp_config.get('to_email')
+        if not to_emails or to_emails in EMAIL_PLACEHOLDERS['to_email']:
+            return []
+        if isinstance(to_emails, str):
+            return [e.strip() for e in to_emails.split(',') if e.strip()]
+        if not isinstance(to_emails, list):
+            return [to_emails]
+        return to_emails
+
+    def recipient_groups(self, notification: Notification) -> List[List[str]]:
+        defaults = list(notification.recipients) if notification.recipients is not None else self.default_recipients()
+        if self.subscriptions is None:
+            return [defaults]
+        groups = self.subscriptions.recipient_groups(notification.service, notification.error_type, defaults)
+        if groups:
+            logger.info(f"通知收件人分组: {', '.join(f'{name}({len(recipients)})' for name, recipients in groups)}")
+        return [recipients for _, recipients in groups]
+
+    def send(self, notification: Notification, timer: Optional[PhaseTimer] = None,
+             deadline: Optional[float] = None) -> Optional[str]:
+        if not self.is_configured():
+            logger.warning("邮件配置未设置，跳过邮件发送。请在config.py中配置邮件信息。")
+            raise ChannelSkipped('邮件配置未设置')
+        groups = [group for group in self.recipient_groups(notification) if group]
+        if not groups:
+            logger.warning("没有收件人，跳过邮件发送")
+            raise ChannelSkipped('没有收件人')
+        timer = timer if timer is not None else PhaseTimer()
+
+        # 分阶段计时：渲染（含首次导入 email 模块）、连接（TCP/SSL、STARTTLS 与登录）、发送
+        with timer.phase('email_render'):
+            msg = self.render(notification)
+
+        import smtplib  # 连带导入 ssl、email 等模块，第一次发邮件时才导入
+        # 根据配置选择SSL或TLS连接
+        use_ssl = self.smtp_config.get('use_ssl', False)
+        use_tls = self.smtp_config.get('use_tls', False)
+        timeout = max(0.1, self.time_left(deadline))  # 连接与每次读写的超时
+        try:
+            with timer.phase('smtp_connect'):
+                if use_ssl:
+                    # 使用SSL连接（如新浪邮箱）
+                    server = smtplib.SMTP_SSL(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'],
+                                              timeout=timeout)
+                else:
+                    # 使用普通SMTP连接，可选TLS
+                    server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'],
+                                          timeout=timeout)
+            with server:
+                with timer.phase('smtp_connect'):
+                    if use_tls and not use_ssl:
+                        server.starttls()
+                    server.login(self.smtp_config['from_email'], self.smtp_config['password'])
+                # 同一连接内依次发送各组，只替换收件人邮件头
+                with timer.phase('smtp_send'):
+                    for to_emails in groups:
+                        del msg['To']
+                        msg['To'] = ', '.join(to_emails)  # 邮件头使用逗号分隔
+                        server.sendmail(self.smtp_config['from_email'], to_emails, msg.as_string())
+        except smtplib.SMTPAuthenticationError as e:
+            logger.error(f"邮件认证失败，请检查邮箱和密码配置: {e}")
+            raise
+        except smtplib.SMTPException as e:
+            logger.error(f"SMTP错误: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"发送邮件失败: {e}")
+            raise
+        logger.info(f"邮件通知发送成功: {notification.subject}")
+        return f"{sum(len(group) for group in groups)} 个收件人"
+
+    def render(self, notification: Notification) -> 'MIMEMultipart':
+        """构建邮件（纯文本 + HTML 两种格式），每条通知只渲染一次"""
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.text import MIMEText
+        subject, body, error_type, service = (notification.subject, notification.body,
+                                              notification.error_type, notification.service)
+        msg = MIMEMultipart()
+        msg['From'] = self.smtp_config['from_email']
+        msg['Subject'] = subject
+        
+        # 构建纯文本邮件正文（作为备选）
+        email_body_plain = f"""
+监控时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+监控服务: {service}
+监控URL: {self.monitor_url}
+
+"""
+        
+        if error_type:
+            email_body_plain += f"异常类型: {error_type}\n\n"
+        
+        email_body_plain += f"详细信息:\n{body}\n\n"
+        email_body_plain += f"查看具体状态: https://developer.apple.com/system-status/\n\n"
+        email_body_plain += f"---\n此邮件由 Apple Developer Status Monitor 自动发送"
+        
+        # 构建HTML邮件正文
+        status_url = "https://developer.apple.com/system-status/"
+        check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        email_body_html = f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+            background-color: #f5f5f5;
+        }}
+        .container {{
+            background-color: #ffffff;
+            border-radius: 8px;
+            padding: 30px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .header {{
+            border-bottom: 2px solid #007AFF;
+            padding-bottom: 15px;
+            margin-bottom: 20px;
+        }}
+        .header h2 {{
+            margin: 0;
+            color: #007AFF;
+            font-size: 20px;
+        }}
+        .info-item {{
+            margin: 15px 0;
+            padding: 10px;
+            background-color: #f8f9fa;
+            border-left: 3px solid #007AFF;
+            border-radius: 4px;
+        }}
+        .info-label {{
+            font-weight: bold;
+            color: #555;
+            margin-bottom: 5px;
+        }}
+        .info-value {{
+            color: #333;
+        }}
+        .error-type {{
+            background-color: #fff3cd;
+            border-left-color: #ffc107;
+            padding: 15px;
+            margin: 20px 0;
+            border-radius: 4px;
+        }}
+        .error-type .info-label {{
+            color: #856404;
+        }}
+        .details {{
+            background-color: #f8f9fa;
+            padding: 15px;
+            border-radius: 4px;
+            margin: 20px 0;
+            white-space: pre-wrap;
+            word-wrap: break-word;
+        }}
+        .button-container {{
+            text-align: center;
+            margin: 30px 0;
+        }}
+        .status-button {{
+            display: inline-block;
+            padding: 14px 32px;
+            background-color: #007AFF;
+            color: #ffffff !important;
+            text-decoration: none;
+            border-radius: 6px;
+            font-weight: 600;
+            font-size: 16px;
+            transition: background-color 0.3s;
+            box-shadow: 0 2px 4px rgba(0,122,255,0.3);
+        }}
+        .status-button:hover {{
+            background-color: #0051D5;
+        }}
+        .footer {{
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #e0e0e0;
+            text-align: center;
+            color: #999;
+            font-size: 12px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h2>🍎 Apple Developer System Status Monitor</h2>
+        </div>
+        
+        <div class="info-item">
+            <div class="info-label">监控时间</div>
+            <div class="info-value">{check_time}</div>
+        </div>
+        
+        <div class="info-item">
+            <div class="info-label">监控服务</div>
+            <div class="info-value">{service}</div>
+        </div>
+        
+        <div class="info-item">
+            <div class="info-label">监控URL</div>
+            <div class="info-value">{self.monitor_url}</div>
+        </div>
+"""
+        
+        if error_type:
+            email_body_html += f"""
+        <div class="error-type">
+            <div class="info-label">异常类型</div>
+            <div class="info-value">{error_type}</div>
+        </div>
+"""
+        
+        email_body_html += f"""
+        <div class="info-item">
+            <div class="info-label">详细信息</div>
+            <div class="details">{body}</div>
+        </div>
+        
+        <div class="button-container">
+            <a href="{status_url}" class="status-button">查看具体状态</a>
+        </div>
+        
+        <div class="footer">
+            此邮件由 Apple Developer Status Monitor 自动发送
+        </div>
+    </div>
+</body>
+</html>
+"""
+        
+        # 添加HTML和纯文本两种格式（邮件客户端会自动选择）
+        msg.attach(MIMEText(email_body_plain, 'plain', 'utf-8'))
+        msg.attach(MIMEText(email_body_html, 'html', 'utf-8'))
+        return msg
+
+
+class WebhookChannel(Channel):
+    """Webhook（并发投递到 webhook.WebhookNotifier 中的所有端点）"""
+
+    name = 'webhook'
+
+    def __init__(self, notifier, timeout: float = 15.0):
+        super().__init__(timeout)
+        self.notifier = notifier
+
+    def send(self, notification: Notification, timer: Optional[PhaseTimer] = None,
+             deadline: Optional[float] = None) -> Optional[str]:
+        results = self.notifier.send(notification.subject, notification.body, notification.error_type,
+                                     notification.service, timeout=max(0.0, self.time_left(deadline)))
+        failed = [result for result in results if not result.ok]
+        if failed:
+            raise RuntimeError('; '.join(f"{result.endpoint}: {result.error}" for result in failed))
+        return f"{len(results)} 个端点"
+
+    def close(self):
+        self.notifier.close()
+
+
+class CommandChannel(Channel):
+    """执行本地命令：通知内容通过环境变量 MONITOR_SUBJECT 等传入，同时以 JSON 写入标准输入"""
+
+    name = 'command'
+
+    def __init__(self, command: Union[str, Sequence[str]], timeout: float = 10.0):
+        super().__init__(timeout)
+        self.args = shlex.split(command) if isinstance(command, str) else list(command)
+
+    def send(self, notification: Notification, timer: Optional[PhaseTimer] = None,
+             deadline: Optional[float] = None) -> Optional[str]:
+        env = dict(os.environ,
+                   MONITOR_SUBJECT=notification.subject,
+                   MONITOR_BODY=notification.body,
+                   MONITOR_ERROR_TYPE=notification.error_type or '',
+                   MONITOR_SERVICE=notification.service,
+                   MONITOR_TIME=notification.time)
+        completed = subprocess.run(self.args, input=json.dumps(notification.to_dict(), ensure_ascii=False),
+                                   capture_output=True, text=True, env=env,
+                                   timeout=max(0.01, self.time_left(deadline)))
+        if completed.returncode != 0:
+            raise RuntimeError(f"退出码 {completed.returncode}: {completed.stderr.strip()[:200]}")
+        return completed.stdout.strip()[:200] or None
+
+
+class FileSinkChannel(Channel):
+    """追加写入 JSON Lines 文件（供其他程序读取或审计）"""
+
+    name = 'file'
+
+    def __init__(self, path: Union[str, Path], timeout: float = 5.0):
+        super().__init__(timeout)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, notification: Notification, timer: Optional[PhaseTimer] = None,
+             deadline: Optional[float] = None) -> Optional[str]:
+        line = json.dumps(notification.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+        return str(self.path)
+
+
+class NotificationDispatcher:
+    """把通知并行发送到所有渠道，每个渠道按自己的超时单独计时"""
+
+    def __init__(self, channels: Iterable[Channel], max_workers: Optional[int] = None):
+        self.channels: List[Channel] = list(channels)
+        # 线程数留有余量：超时的渠道仍会占用线程直到其自身返回，不应阻塞下一次分发
+        workers = max_workers or max(4, 2 * len(self.channels))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='notify')
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def _run(self, channel: Channel, notification: Notification, deadline: float) -> ChannelResult:
+        started = time.perf_counter()
+        timer = PhaseTimer()
+        try:
+            detail = channel.send(notification, timer, deadline)
+            outcome = SUCCESS
+        except ChannelSkipped as e:
+            detail, outcome = str(e), SKIPPED
+        except subprocess.TimeoutExpired:
+            detail, outcome = f"超过 {channel.timeout:g} 秒未完成", TIMEOUT
+        except Exception as e:
+            detail, outcome = str(e) or type(e).__name__, FAILURE
+        return ChannelResult(channel.name, outcome, time.perf_counter() - started, detail, timer.seconds() or None)
+
+    def dispatch(self, notification: Notification) -> List[ChannelResult]:
+        """返回各渠道结果（顺序与渠道一致）；超时的渠道记为 timeout，不再等待。
+        期限同时传给各渠道：渠道的请求超时不超过剩余时间，到期后不再重试，不会在报告超时之后才送达"""
+        started = time.monotonic()
+        deadlines_by_channel = {channel: started + channel.timeout for channel in self.channels}
+        futures = {self._executor.submit(self._run, channel, notification, deadlines_by_channel[channel]): channel
+                   for channel in self.channels}
+        deadlines = {future: deadlines_by_channel[channel] for future, channel in futures.items()}
+        results: Dict[Channel, ChannelResult] = {}
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            for future in [future for future in pending if deadlines[future] <= now]:
+                pending.discard(future)
+                channel = futures[future]
+                results[channel] = ChannelResult(channel.name, TIMEOUT, now - started,
+                                                 f"超过 {channel.timeout:g} 秒未完成")
+            if not pending:
+                break
+            done, pending = wait(pending, timeout=min(deadlines[future] for future in pending) - now,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                results[futures[future]] = future.result()
+
+        ordered = [results[channel] for channel in self.channels]
+        for result in ordered:
+            metrics.NOTIFICATIONS_TOTAL.inc(channel=result.channel, outcome=result.outcome)
+            if result.outcome != SKIPPED:
+                metrics.NOTIFICATION_DURATION.observe(result.elapsed, channel=result.channel)
+            if result.outcome in (FAILURE, TIMEOUT):
+                logger.error(f"通知渠道 {result.channel} 发送失败（{result.outcome}）: {result.detail}")
+        return ordered
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for channel in self.channels:
+            try:
+                channel.close()
+            except Exception:
+                pass
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口原始数据归档
+每份不同的数据按内容哈希压缩保存一次（objects/ab/abcdef….json.gz），
+index.jsonl 按时间记录每次检测对应的哈希；写入在后台线程完成，不占用检测耗时
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import lzma
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPRESSORS = {
+    'gzip': ('.json.gz', gzip.compress, gzip.decompress),
+    'lzma': ('.json.xz', lzma.compress, lzma.decompress),
+}
+INDEX_FILE = 'index.jsonl'
+
+
+class IndexEntry(NamedTuple):
+    timestamp: float
+    digest: str
+    size: int
+
+
+class PayloadRecorder:
+    """后台线程写入的内容寻址归档"""
+
+    _STOP = object()
+
+    def __init__(self, archive_dir: Path, compression: str = 'gzip', queue_size: int = 256):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"不支持的压缩格式: {compression}")
+        self.archive_dir = Path(archive_dir)
+        self.compression = compression
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._known = set()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def record(self, payload: str, timestamp: Optional[float] = None):
+        """登记一次数据（仅入队，立即返回）"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.time() if timestamp is None else timestamp, payload))
+        except queue.Full:
+            logger.warning("接口数据归档队列已满，丢弃本次记录")
+
+    def close(self, timeout: float = 5.0):
+        """写完队列中剩余的数据后停止后台线程"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(self._STOP)
+        thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name='payload-recorder', daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            timestamp, payload = item
+            try:
+                self._write(timestamp, payload)
+            except Exception as e:
+                logger.error(f"接口数据归档失败: {e}")
+
+    def _write(self, timestamp: float, payload: str):
+        raw = payload.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest not in self._known:
+            suffix, compress, _ = COMPRESSORS[self.compression]
+            blob = self.archive_dir / 'objects' / digest[:2] / f"{digest}{suffix}"
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+                tmp.write_bytes(compress(raw))
+                os.replace(tmp, blob)
+            self._known.add(digest)
+        line = json.dumps({
+            'ts': round(timestamp, 3),
+            'time': datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S'),
+            'hash': digest,
+            'size': len(raw)
+        }, separators=(',', ':'))
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.archive_dir / INDEX_FILE, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class ArchiveReader:
+    """按时间顺序读取归档"""
+
+    def __init__(self, archive_dir: Path):
+        self.archive_dir = Path(archive_dir)
+        self._blobs: Dict[str, Path] = {}
+
+    def entries(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[IndexEntry]:
+        index = self.archive_dir / INDEX_FILE
+        if not index.exists():
+            return
+        with open(index, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue  # 进程中断可能留下半行
+                ts = item['ts']
+                if (start is not None and ts < start) or (end is not None and ts >= end):
+                    continue
+                yield IndexEntry(ts, item['hash'], item.get('size', 0))
+
+    def blob_path(self, digest: str) -> Optional[Path]:
+        path = self._blobs.get(digest)
+        if path is None:
+            for suffix, _, _ in COMPRESSORS.values():
+                candidate = self.archive_dir / 'objects' / digest[:2] / f"{digest}{suffix}"
+                if candidate.exists():
+                    path = self._blobs[digest] = candidate
+                    break
+        return path
+
+    def load(self, digest: str) -> bytes:
+        path = self.blob_path(digest)
+        if path is None:
+            raise FileNotFoundError(f"归档中缺少数据: {digest}")
+        return load_blob(path)
+
+
+def load_blob(path: Path) -> bytes:
+    """按扩展名解压单个归档文件"""
+    path = Path(path)
+    for suffix, _, decompress in COMPRESSORS.values():
+        if path.name.endswith(suffix):
+            return decompress(path.read_bytes())
+    return path.read_bytes()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+检测流程的分阶段计时与按需性能分析（cProfile / tracemalloc）
+"""
+
+import io
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+
+
+class PhaseTimer:
+    """记录单次检测中各阶段的单调时钟耗时（同名阶段累加，如多次重试）"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self._phases[name] = self._phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def seconds(self) -> Dict[str, float]:
+        return dict(self._phases)
+
+    def as_dict(self) -> Dict[str, float]:
+        """各阶段耗时（毫秒，保留两位小数）"""
+        return {name: round(seconds * 1000, 2) for name, seconds in self._phases.items()}
+
+    def format(self) -> str:
+        return ', '.join(f"{name}={ms:.1f}ms" for name, ms in self.as_dict().items())
+
+
+class CheckProfiler:
+    """对接下来 N 次检测启用 cProfile 或 tracemalloc，并把结果写入日志目录"""
+
+    def __init__(self, output_dir: Path, logger=None):
+        self.output_dir = Path(output_dir)
+        self.logger = logger
+        self.mode = 'cprofile'
+        self._remaining = 0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    def arm(self, count: int = 1, mode: Optional[str] = None):
+        """为接下来 count 次检测开启分析（可从信号处理器或 GUI 线程调用）"""
+        mode = (mode or self.mode).lower()
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的分析模式: {mode}")
+        with self._lock:
+            self.mode = mode
+            self._remaining = max(0, int(count))
+        if self.logger:
+            self.logger.info(f"已开启性能分析: 接下来 {self._remaining} 次检测 ({self.mode})")
+
+    def arm_from_env(self, value: Optional[str] = None) -> bool:
+        """解析 MONITOR_PROFILE 环境变量，格式: "3"、"cprofile:3" 或 "tracemalloc:1" """
+        value = value if value is not None else os.environ.get('MONITOR_PROFILE', '')
+        value = value.strip()
+        if not value:
+            return False
+        mode, _, count = value.rpartition(':') if ':' in value else (None, '', value)
+        try:
+            self.arm(int(count or 1), mode or None)
+        except ValueError as e:
+            if self.logger:
+                self.logger.warning(f"MONITOR_PROFILE 配置无效 ({value}): {e}")
+            return False
+        return True
+
+    def _take(self) -> Optional[str]:
+        with self._lock:
+            if self._remaining <= 0:
+                return None
+            self._remaining -= 1
+            return self.mode
+
+    @contextmanager
+    def maybe_profile(self):
+        """若已开启则对 with 块内的检测进行分析，否则零开销直接执行"""
+        mode = self._take()
+        if mode is None:
+            yield
+            return
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if mode == 'cprofile':
+            import cProfile
+            import pstats
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                path = self.output_dir / f"profile_{stamp}.prof"
+                profiler.dump_stats(str(path))
+                text = io.StringIO()
+                pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(40)
+                (self.output_dir / f"profile_{stamp}.txt").write_text(text.getvalue(), encoding='utf-8')
+                self._report(path)
+        else:
+            import tracemalloc
+            started_here = not tracemalloc.is_tracing()
+            if started_here:
+                tracemalloc.start(25)
+            before = tracemalloc.take_snapshot()
+            try:
+                yield
+            finally:
+                after = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if started_here:
+                    tracemalloc.stop()
+                lines = [f"current={current} bytes, peak={peak} bytes", ""]
+                lines.extend(str(stat) for stat in after.compare_to(before, 'lineno')[:40])
+                path = self.output_dir / f"tracemalloc_{stamp}.txt"
+                path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+                self._report(path)
+
+    def _report(self, path: Path):
+        if self.logger:
+            self.logger.info(f"性能分析结果已保存: {path}（剩余 {self._remaining} 次）")
+
+
+def install_signal_handler(profiler: CheckProfiler, count: int = 1) -> bool:
+    """注册 SIGUSR1：收到信号后对接下来 count 次检测开启分析（仅主线程、仅 POSIX）"""
+    sigusr1 = getattr(signal, 'SIGUSR1', None)
+    if sigusr1 is None or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(sigusr1, lambda signum, frame: profiler.arm(count))
+    return True
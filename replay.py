@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回放归档的接口数据
+用模拟时钟把历史数据依次送入评估与实时监控相同的结果处理流程（不等待、不联网、不发邮件），
+输出状态变化时间线以及当时会发送的告警，用于验证检测逻辑调整后的效果
+"""
+
+import argparse
+import json
+import sys
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# 添加当前目录到路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+from alert_rules import AlertRuleSet, compile_rules
+from check_processor import CheckProcessor
+from evaluation import Evaluator, EventRule, ServiceResult, evaluate
+from payload_recorder import ArchiveReader, INDEX_FILE, load_blob
+from service_match import DEFAULT_THRESHOLD
+
+PAYLOAD_SUFFIXES = ('.js', '.json', '.gz', '.xz')
+PARALLEL_THRESHOLD = 64  # 不同数据份数超过该值时才启用进程池
+CHUNK_SIZE = 32  # 每块的不同数据份数
+
+
+class ReplayEntry(NamedTuple):
+    timestamp: float
+    key: str  # 相同 key 的数据只评估一次
+    path: Path
+
+
+class Alert(NamedTuple):
+    timestamp: float
+    subject: str
+    body: str
+    error_type: str
+
+
+def iter_entries(source: Path, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[ReplayEntry]:
+    """归档目录按 index.jsonl 的时间顺序；普通目录按文件修改时间"""
+    source = Path(source)
+    if (source / INDEX_FILE).exists():
+        reader = ArchiveReader(source)
+        for entry in reader.entries(start, end):
+            path = reader.blob_path(entry.digest)
+            if path is not None:
+                yield ReplayEntry(entry.timestamp, entry.digest, path)
+        return
+    files = [path for path in source.iterdir() if path.is_file() and path.name.endswith(PAYLOAD_SUFFIXES)]
+    for path in sorted(files, key=lambda p: (p.stat().st_mtime, p.name)):
+        mtime = path.stat().st_mtime
+        if (start is None or mtime >= start) and (end is None or mtime < end):
+            yield ReplayEntry(mtime, str(path), path)
+
+
+def evaluate_file(path: Path, service: str, threshold: float = DEFAULT_THRESHOLD,
+                  rules: Optional[EventRule] = None, now: Optional[float] = None) -> ServiceResult:
+    """评估单份数据中目标服务的状态（无副作用，可在子进程中执行）"""
+    try:
+        payload = load_blob(path)
+    except OSError as e:
+        return ServiceResult(service, None, 0.0, None, '数据接口错误', f'状态数据接口请求失败: {e}', (), (),
+                             time.time() if now is None else now)
+    return evaluate(payload, [service], rules, now, threshold)[service]
+
+
+def evaluate_file_at(path: Path, service: str, times: Sequence[float], threshold: float = DEFAULT_THRESHOLD,
+                     rules: Optional[EventRule] = None) -> List[ServiceResult]:
+    """同一份数据在多个时刻的评估结果：只读取、解析一次，之后按各时刻对已解析的事件重新应用规则"""
+    first = evaluate_file(path, service, threshold, rules, times[0])
+    evaluator = Evaluator([service], rules, threshold)
+    return [first] + [evaluator.reevaluate(first, now) for now in times[1:]]
+
+
+def _evaluation_key(key: str, timestamp: float, rules: Optional[AlertRuleSet]) -> str:
+    """规则与事件持续时间有关时，同一份数据在不同时刻的结果可能不同，需按时刻分别取结果"""
+    if rules is not None and rules.uses_time:
+        return f"{key}@{timestamp}"
+    return key
+
+
+def _evaluate_items(items, service: str, threshold: float,
+                    rules: Optional[AlertRuleSet]) -> List[Tuple[str, ServiceResult]]:
+    results = []
+    for key, path, times in items:
+        for now, result in zip(times, evaluate_file_at(path, service, times, threshold, rules)):
+            results.append((_evaluation_key(key, now, rules), result))
+    return results
+
+
+def _evaluate_chunk(args) -> List[Tuple[str, ServiceResult]]:
+    items, service, threshold, rule_specs, default_action = args
+    # 编译后的规则无法跨进程传递，在子进程中按配置重新编译
+    return _evaluate_items(items, service, threshold, compile_rules(rule_specs, default_action))
+
+
+def evaluate_all(entries: List[ReplayEntry], service: str, threshold: float, workers: Optional[int] = None,
+                 rule_specs: Optional[List[Dict]] = None, default_action: str = 'alert') -> Dict[str, ServiceResult]:
+    """每份不同的数据只读取、解析一次（规则与时间有关时再按各时刻应用规则）；数量较多时按数据分块交给进程池"""
+    rules = compile_rules(rule_specs, default_action)
+    per_time = rules is not None and rules.uses_time
+    distinct: Dict[str, Tuple[Path, List[float]]] = {}
+    for entry in entries:
+        path, times = distinct.setdefault(entry.key, (entry.path, []))
+        if per_time or not times:
+            times.append(entry.timestamp)
+    items = [(key, path, times) for key, (path, times) in distinct.items()]
+    if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+        return dict(_evaluate_items(items, service, threshold, rules))
+    chunks = [(items[i:i + CHUNK_SIZE], service, threshold, rule_specs, default_action)
+              for i in range(0, len(items), CHUNK_SIZE)]
+    results: Dict[str, ServiceResult] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(_evaluate_chunk, chunks):
+            results.update(chunk)
+    return results
+
+
+def replay(entries: List[ReplayEntry], evaluations: Dict[str, ServiceResult], service: str,
+           rules: Optional[AlertRuleSet] = None, state: Optional[Dict] = None):
+    """按时间顺序把评估结果送入 CheckProcessor（与实时监控相同的事件变化、首次基线与模糊匹配通知），
+    捕获本应发送的通知；state 为起始的状态文件内容（默认从空状态开始）。返回 (状态变化时间线, 告警列表)"""
+    state = state or {}
+    timeline: List[Tuple[float, str, str]] = []
+    alerts: List[Alert] = []
+    now = 0.0
+
+    def notify(subject: str, body: str, error_type: Optional[str], service: str) -> Dict:
+        alerts.append(Alert(now, subject, body, error_type))
+        return {'subject': subject, 'channels': []}
+
+    processor = CheckProcessor(rules, notify, lambda level, message, service: None, state)
+    last_status = state.get('last_status')  # 与实时监控一致：只在能判断状态时更新
+    previous = None
+    last_key = None
+    for entry in entries:
+        now = entry.timestamp
+        key = _evaluation_key(entry.key, entry.timestamp, rules)
+        evaluation = evaluations[key]
+        status = evaluation.status or 'Unknown'
+        if status != previous:
+            timeline.append((entry.timestamp, previous or '-', status))
+        # 数据未变化时事件集合与匹配结果不可能变化，跳过处理（无法判断时每次检测都会告警，仍需处理）
+        if evaluation.status is None or key != last_key:
+            processor.process(service, evaluation.to_dict(), now, last_status)
+        if evaluation.status is not None:
+            last_status = evaluation.status
+        previous = status
+        last_key = key if evaluation.status is not None else None
+    return timeline, alerts
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"时间格式应为 YYYY-MM-DD 或 'YYYY-MM-DD HH:MM:SS': {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='回放归档的接口数据，输出状态时间线与会发送的告警')
+    parser.add_argument('source', nargs='?', default=str(Path(__file__).parent / 'archive'),
+                        help='归档目录（含 index.jsonl）或存放接口数据文件的目录')
+    parser.add_argument('--service', default=config.TARGET_SERVICE, help='目标服务名称')
+    parser.add_argument('--start', help='开始时间（含）')
+    parser.add_argument('--end', help='结束时间（不含）')
+    parser.add_argument('--workers', type=int, default=None, help='评估进程数，1 表示不使用进程池')
+    parser.add_argument('--format', choices=('text', 'jsonl'), default='text', help='输出格式')
+    parser.add_argument('--state', help='从该状态文件（state.json）的内容开始回放，默认从空状态开始')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    threshold = getattr(config, 'SERVICE_MATCH_THRESHOLD', DEFAULT_THRESHOLD)
+    rule_specs = getattr(config, 'ALERT_RULES', None)
+    default_action = getattr(config, 'ALERT_RULES_DEFAULT_ACTION', 'alert')
+    rules = compile_rules(rule_specs, default_action)
+    entries = list(iter_entries(Path(args.source), _parse_time(args.start), _parse_time(args.end)))
+    evaluations = evaluate_all(entries, args.service, threshold, args.workers, rule_specs, default_action)
+    state = None
+    if args.state:
+        with open(args.state, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    timeline, alerts = replay(entries, evaluations, args.service, rules, state)
+    elapsed = time.perf_counter() - started
+
+    out = sys.stdout
+    if args.format == 'jsonl':
+        records = [(ts, {'type': 'transition', 'time': _format_time(ts), 'old_status': old, 'new_status': new})
+                   for ts, old, new in timeline]
+        records += [(alert.timestamp, {'type': 'alert', 'time': _format_time(alert.timestamp),
+                                       'subject': alert.subject, 'body': alert.body,
+                                       'error_type': alert.error_type}) for alert in alerts]
+        for _, record in sorted(records, key=lambda item: item[0]):
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return
+
+    out.write(f"回放服务: {args.service}\n")
+    out.write("=" * 80 + "\n状态变化时间线\n")
+    for ts, old, new in timeline:
+        out.write(f"  {_format_time(ts)}  {old} -> {new}\n")
+    out.write("=" * 80 + "\n会发送的告警\n")
+    for alert in alerts:
+        out.write(f"  {_format_time(alert.timestamp)}  {alert.subject}\n")
+        for line in alert.body.splitlines():
+            if line:
+                out.write(f"      {line}\n")
+    out.write("=" * 80 + "\n")
+    distinct = len({entry.key for entry in entries})
+    out.write(f"共 {len(entries)} 次检测，{distinct} 份不同数据，"
+              f"{len(timeline)} 次状态变化，{len(alerts)} 条告警，耗时 {elapsed:.2f} 秒\n")
+
+
+if __name__ == "__main__":
+    main()
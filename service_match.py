@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务名称归一化与模糊匹配
+苹果曾调整服务名称（如连字符变为 en/em dash），精确匹配失败时用三元组倒排索引找最接近的服务。
+模糊匹配只用于容忍连字符与空白的差异：比较去掉空白与连字符后的名称，要求相似度很高且明显高于第二接近的服务，
+避免 "App Store - In-App Purchases" 被匹配到 "App Store - Sandbox In-App Purchases" 这类不同的服务
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_DASHES = str.maketrans({'–': '-', '—': '-', '‐': '-', '‑': '-', '‒': '-', '−': '-'})
+_SEPARATORS_RE = re.compile(r'[\s\-_]+')
+
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MARGIN = 0.1  # 最接近的服务须比第二接近的高出的相似度
+
+
+@lru_cache(maxsize=1024)
+def normalize_service_name(text: Optional[str]) -> str:
+    """统一服务名称便于匹配（结果缓存，服务名集合很小且稳定）"""
+    if not text:
+        return ""
+    normalized = unicodedata.normalize('NFKC', str(text)).translate(_DASHES).lower()
+    return _WHITESPACE_RE.sub(' ', normalized).strip()
+
+
+def is_fuzzy_match(service: str, matched: Optional[str]) -> bool:
+    """matched 是否为模糊匹配得到的其他名称（归一化后不同）"""
+    return matched is not None and normalize_service_name(matched) != normalize_service_name(service)
+
+
+def fuzzy_match_notification(service: str, matched: str, score: float) -> Tuple[str, str, str]:
+    """采用模糊匹配时的通知内容 (subject, body, error_type)"""
+    return (f"⚠️ 服务名称变化 - {service}",
+            f"状态数据接口中未找到与 '{service}' 完全一致的服务，已按名称相似度 {score:.2f} 匹配到 '{matched}'，"
+            f"之后的状态判断以该服务为准。\n请确认这是同一个服务，并在配置中更新服务名称。",
+            '服务名称变化')
+
+
+def _compact(normalized: str) -> str:
+    """去掉空白与连字符，"App Store-In-App Purchases" 与 "App Store - In App Purchases" 相同"""
+    return _SEPARATORS_RE.sub('', normalized)
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ServiceIndex:
+    """一次接口数据中所有服务名的索引：精确查找 O(1)，模糊查找只比较共享三元组的候选"""
+
+    def __init__(self, names: Iterable[str]):
+        self._exact: Dict[str, str] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, List[str]] = {}
+        for name in names:
+            key = normalize_service_name(name)
+            if not key or key in self._exact:
+                continue
+            self._exact[key] = name
+            grams = _trigrams(_compact(key))
+            self._grams[key] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key)
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def exact(self, name: str) -> Optional[str]:
+        return self._exact.get(normalize_service_name(name))
+
+    def closest(self, name: str, threshold: float = DEFAULT_THRESHOLD,
+                margin: float = DEFAULT_MARGIN) -> Optional[Tuple[str, float]]:
+        """返回 (服务原名, Dice 相似度)；低于阈值、或与第二接近的服务相差不足 margin（无法确定是哪个）时返回 None"""
+        key = normalize_service_name(name)
+        found = self._exact.get(key)
+        if found is not None:
+            return found, 1.0
+        grams = _trigrams(_compact(key))
+        if not grams:
+            return None
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        best, best_score, runner_up = None, 0.0, 0.0
+        for candidate, count in shared.items():
+            score = 2.0 * count / (len(grams) + len(self._grams[candidate]))
+            if score > best_score:
+                best, best_score, runner_up = candidate, score, best_score
+            elif score > runner_up:
+                runner_up = score
+        if best is None or best_score < threshold or best_score - runner_up < margin:
+            return None
+        return self._exact[best], best_score
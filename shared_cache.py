@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨进程共享的状态数据缓存
+多个监控进程（CLI、多个GUI）共用一次接口拉取：文件锁保证同一时间只有一个进程拉取，
+数据通过内存映射文件共享；读取无需加锁，以序号 + CRC 校验保证不会读到写了一半的数据
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Tuple
+
+MAGIC = b'ASMCACHE'
+# magic, 序号（写入中为奇数）, 拉取时间戳, 数据长度, CRC32
+HEADER = struct.Struct('<8sQdQI')
+MIN_CAPACITY = 64 * 1024
+READ_ATTEMPTS = 5
+
+
+def cache_path_for(url: str, directory: Path) -> Path:
+    """每个数据接口 URL 对应一个缓存文件"""
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+    return Path(directory) / f"status_cache_{digest}.bin"
+
+
+if sys.platform == 'win32':
+    import msvcrt
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout: float):
+    """获取跨进程排他锁；超时仍未获得则 yield False（调用方自行决定是否继续）"""
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    acquired = False
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            acquired = _try_lock(fd)
+            if acquired or time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+        yield acquired
+    finally:
+        if acquired:
+            _unlock(fd)
+        os.close(fd)
+
+
+class SharedStatusCache:
+    """基于文件锁与内存映射文件的跨进程缓存（单条记录）"""
+
+    def __init__(self, path: Path, lock_timeout: float = 60.0):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self.lock_timeout = lock_timeout
+        self._map: Optional[mmap.mmap] = None
+        self._map_size = 0
+
+    # ---- 读取（无锁） ----
+
+    def _mapping(self) -> Optional[mmap.mmap]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return None
+        if size < HEADER.size:
+            return None
+        if self._map is None or size != self._map_size:
+            self.close()
+            with open(self.path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self._map_size = size
+        return self._map
+
+    def read(self, max_age: Optional[float] = None) -> Optional[Tuple[float, bytes]]:
+        """返回 (拉取时间戳, 数据)；无数据、过期或多次校验失败时返回 None"""
+        view = self._mapping()
+        if view is None:
+            return None
+        for _ in range(READ_ATTEMPTS):
+            magic, seq, fetched_at, length, crc = HEADER.unpack_from(view, 0)
+            if magic != MAGIC:
+                return None
+            if seq % 2 == 1 or HEADER.size + length > len(view):
+                time.sleep(0.001)  # 正在写入或文件即将扩容
+                view = self._mapping() or view
+                continue
+            data = view[HEADER.size:HEADER.size + length]
+            if HEADER.unpack_from(view, 0)[1] != seq or zlib.crc32(data) != crc:
+                continue
+            if max_age is not None and time.time() - fetched_at >= max_age:
+                return None
+            return fetched_at, data
+        return None
+
+    # ---- 写入（需持有锁） ----
+
+    def write(self, data: bytes, fetched_at: Optional[float] = None):
+        """写入新数据，调用方须已通过 locked() 取得锁"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        needed = HEADER.size + len(data)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size < needed:
+                os.ftruncate(fd, max(MIN_CAPACITY, needed * 2))
+                size = os.fstat(fd).st_size
+            with mmap.mmap(fd, size, access=mmap.ACCESS_WRITE) as view:
+                seq = 0
+                if view[:len(MAGIC)] == MAGIC:
+                    seq = HEADER.unpack_from(view, 0)[1]
+                seq += 2 if seq % 2 == 0 else 1
+                # 先标记写入中（奇数序号），写完数据与头部后再改为偶数
+                HEADER.pack_into(view, 0, MAGIC, seq - 1, 0.0, 0, 0)
+                view[HEADER.size:needed] = data
+                HEADER.pack_into(view, 0, MAGIC, seq, fetched_at, len(data), zlib.crc32(data))
+                view.flush()
+        finally:
+            os.close(fd)
+
+    def locked(self):
+        """获取跨进程排他锁；超时仍未获得则 yield False（调用方自行拉取但不写缓存）"""
+        return file_lock(self.lock_path, self.lock_timeout)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._map_size = 0
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Apple Developer System Status Monitor - 守护进程模式
+运行一个监控实例，并通过本地 HTTP/JSON 接口向多个使用方提供最近一次的评估结果
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import unquote
+
+# 添加当前目录到路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+import metrics
+from monitor import AppleStatusMonitor, logger
+from status_stream import StatusStreamServer, attach_transition_stream
+
+
+class _CachedResponse:
+    """预先序列化好的响应体与 ETag"""
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, document: Dict[str, Any]):
+        self.body = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+
+class StatusCache:
+    """按服务缓存最近一次评估结果
+
+    更新在监控线程中完成（序列化、计算 ETag），然后整体替换引用；
+    读取只做一次字典查找，不加锁。
+    检测失败（没有拿到接口数据）时保留上一次的各服务状态，标记为 stale 并附带本次的异常信息。
+    """
+
+    def __init__(self, check_interval: int, normalize=None):
+        self.check_interval = check_interval
+        self._normalize = normalize or (lambda name: name)
+        self._responses: Dict[str, _CachedResponse] = {}
+        self._known: Dict[str, Dict[str, Any]] = {}  # 最近一次成功检测的各服务状态（含该次检测时间）
+        self.expires_at = 0.0
+
+    def update(self, result: Dict[str, Any]):
+        check_time = result.get('check_time')
+        services = result.get('services') or {}
+        if services:
+            self._known = {name: {'check_time': check_time, **info} for name, info in services.items()}
+            entries = self._known
+        else:
+            # 拉取失败时结果中没有各服务状态：沿用上次的（check_time 为上次成功检测的时间）
+            stale = {'stale': True, 'error_type': result.get('error_type'), 'error_message': result.get('error_message')}
+            entries = {name: {**info, **stale} for name, info in self._known.items()}
+            services = {name: {key: value for key, value in info.items() if key != 'check_time'}
+                        for name, info in entries.items()}
+        overview = {
+            'check_time': check_time,
+            'target_service': result.get('target_service'),
+            'status': result.get('status') or 'Unknown',
+            'error_type': result.get('error_type'),
+            'error_message': result.get('error_message'),
+            'services': services,
+        }
+        responses = {'': _CachedResponse(overview)}
+        for name, info in entries.items():
+            responses[self._normalize(name)] = _CachedResponse({'service': name, **info})
+        self._responses = responses
+        self.expires_at = time.time() + self.check_interval
+
+    def lookup(self, service: str = '') -> Optional[_CachedResponse]:
+        responses = self._responses
+        found = responses.get(service)
+        if found is None and service:
+            found = responses.get(self._normalize(service))
+        return found
+
+    def max_age(self) -> int:
+        return max(0, int(self.expires_at - time.time()))
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._responses)
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """GET /status、/status/<服务名>、/metrics"""
+    protocol_version = 'HTTP/1.1'  # 保持连接，减少高频读取的握手开销
+    disable_nagle_algorithm = True  # 响应头与响应体分两次写出，避免 Nagle 与延迟确认叠加的 40ms 等待
+    cache: StatusCache = None
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            self._send(200, metrics.REGISTRY.render().encode('utf-8'),
+                       'text/plain; version=0.0.4; charset=utf-8')
+            return
+        if path in ('/status', '/status/'):
+            service = ''
+        elif path.startswith('/status/'):
+            service = unquote(path[len('/status/'):])
+        else:
+            self._send_json_error(404, '未知路径')
+            return
+
+        if not self.cache.ready:
+            self._send_json_error(503, '尚未完成首次检测', {'Retry-After': '5'})
+            return
+        cached = self.cache.lookup(service)
+        if cached is None:
+            self._send_json_error(404, f'未找到服务: {service}')
+            return
+
+        headers = {
+            'ETag': cached.etag,
+            'Cache-Control': f'public, max-age={self.cache.max_age()}',
+        }
+        if self.headers.get('If-None-Match') == cached.etag:
+            self._send(304, b'', None, headers)
+        else:
+            self._send(200, cached.body, 'application/json; charset=utf-8', headers)
+
+    def _send_json_error(self, code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        self._send(code, body, 'application/json; charset=utf-8', {'Cache-Control': 'no-store', **(headers or {})})
+
+    def _send(self, code: int, body: bytes, content_type: Optional[str], headers: Optional[Dict[str, str]] = None):
+        self.send_response(code)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 高频读取不写入监控日志
+
+
+class StatusApiServer:
+    """在独立线程中运行的状态查询服务"""
+
+    def __init__(self, cache: StatusCache, host: str = '127.0.0.1', port: int = 8765):
+        handler = type('BoundStatusRequestHandler', (StatusRequestHandler,), {'cache': cache})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='status-api', daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self) -> 'StatusApiServer':
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def attach_status_cache(monitor: AppleStatusMonitor) -> StatusCache:
+    """为监控实例创建状态缓存，并在每次检测后刷新"""
+    cache = StatusCache(monitor.check_interval, monitor._normalize_service_name)
+
+    def on_result(result):
+        cache.update({**result, 'target_service': monitor.target_service})
+
+    monitor.add_listener(on_result)
+    return cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apple Developer System Status Monitor 守护进程')
+    parser.add_argument('--host', default=getattr(config, 'STATUS_API_HOST', '127.0.0.1'), help='监听地址')
+    parser.add_argument('--port', type=int, default=getattr(config, 'STATUS_API_PORT', 8765), help='监听端口')
+    parser.add_argument('--stream-port', type=int, default=getattr(config, 'STATUS_STREAM_PORT', 8766),
+                        help='状态变化推送（SSE/长轮询）端口，0 表示关闭')
+    args = parser.parse_args()
+
+    monitor = AppleStatusMonitor()
+    cache = attach_status_cache(monitor)
+    server = StatusApiServer(cache, args.host, args.port).start()
+    logger.info(f"状态 API 已启动: http://{args.host}:{server.address[1]}/status")
+    stream = None
+    if args.stream_port:
+        stream = StatusStreamServer(args.host, args.stream_port,
+                                    history_size=getattr(config, 'STATUS_STREAM_HISTORY', 1000),
+                                    buffer_size=getattr(config, 'STATUS_STREAM_BUFFER', 100)).start()
+        attach_transition_stream(monitor, stream)
+        logger.info(f"状态变化推送已启动: http://{args.host}:{stream.address[1]}/events")
+    try:
+        monitor.run()
+    finally:
+        server.stop()
+        if stream:
+            stream.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务状态变化推送（Server-Sent Events / 长轮询）
+基于 asyncio 单线程事件循环，空闲连接只占用一个协程；
+每个客户端使用有界缓冲区，断线重连可通过 Last-Event-ID 续传
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from monitor import logger
+
+HEARTBEAT_INTERVAL = 15  # SSE 心跳间隔（秒），用于发现已断开的空闲连接
+MAX_HEADER_BYTES = 8192
+
+
+class StreamEvent:
+    """一次状态变化事件（预先编码为 SSE 帧与 JSON）"""
+    __slots__ = ('id', 'data', 'frame')
+
+    def __init__(self, event_id: int, data: Dict[str, Any]):
+        self.id = event_id
+        self.data = data
+        payload = json.dumps({'id': event_id, **data}, ensure_ascii=False, separators=(',', ':'))
+        self.frame = f"id: {event_id}\nevent: transition\ndata: {payload}\n\n".encode('utf-8')
+
+
+class _Subscriber:
+    __slots__ = ('queue', 'overflowed')
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+
+class EventBroker:
+    """在事件循环线程内分发事件：保留最近 history_size 条用于续传"""
+
+    def __init__(self, history_size: int = 1000, buffer_size: int = 100):
+        self.history: deque = deque(maxlen=history_size)
+        self.buffer_size = buffer_size
+        self.subscribers = set()
+        # 以毫秒时间戳为起点，重启后事件 ID 仍保持递增
+        self._last_id = int(time.time() * 1000)
+
+    def publish(self, data: Dict[str, Any]) -> StreamEvent:
+        self._last_id += 1
+        event = StreamEvent(self._last_id, data)
+        self.history.append(event)
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # 慢客户端：断开连接，由客户端携带 Last-Event-ID 重连补齐
+                subscriber.overflowed = True
+                self.subscribers.discard(subscriber)
+        return event
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def since(self, last_id: Optional[int]) -> List[StreamEvent]:
+        if last_id is None:
+            return []
+        return [event for event in self.history if event.id > last_id]
+
+    def subscribe(self) -> _Subscriber:
+        subscriber = _Subscriber(self.buffer_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        self.subscribers.discard(subscriber)
+
+
+class StatusStreamServer:
+    """SSE（GET /events）与长轮询（GET /poll）服务，运行在独立线程的事件循环中"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8766,
+                 history_size: int = 1000, buffer_size: int = 100):
+        self.host = host
+        self.port = port
+        self.broker = EventBroker(history_size, buffer_size)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._ready = threading.Event()
+        self._startup_error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self._run_loop, name='status-stream', daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.sockets[0].getsockname()[:2]
+
+    @property
+    def client_count(self) -> int:
+        return len(self.broker.subscribers)
+
+    def start(self) -> 'StatusStreamServer':
+        self.thread.start()
+        self._ready.wait()
+        if self._startup_error:
+            raise self._startup_error
+        return self
+
+    def stop(self):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+
+    def publish(self, data: Dict[str, Any]):
+        """线程安全：从监控线程投递事件"""
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.broker.publish, data)
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, backlog=1024))
+        except OSError as e:
+            self._startup_error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), timeout=10)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                return
+            if len(head) > MAX_HEADER_BYTES:
+                return
+            lines = head.decode('latin-1').split('\r\n')
+            parts = lines[0].split(' ')
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self._respond(writer, 405, {'error': '仅支持 GET'})
+                return
+            headers = {}
+            for line in lines[1:]:
+                name, sep, value = line.partition(':')
+                if sep:
+                    headers[name.strip().lower()] = value.strip()
+            url = urlsplit(parts[1])
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+            if url.path == '/events':
+                await self._serve_sse(writer, headers, query)
+            elif url.path == '/poll':
+                await self._serve_poll(writer, query)
+            else:
+                await self._respond(writer, 404, {'error': '未知路径'})
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _parse_id(value: Optional[str]) -> Optional[int]:
+        try:
+            return int(value) if value not in (None, '') else None
+        except ValueError:
+            return None
+
+    async def _serve_sse(self, writer: asyncio.StreamWriter, headers: Dict[str, str], query: Dict[str, str]):
+        last_id = self._parse_id(headers.get('last-event-id') or query.get('last_event_id'))
+        subscriber = self.broker.subscribe()
+        try:
+            writer.write(b'HTTP/1.1 200 OK\r\n'
+                         b'Content-Type: text/event-stream; charset=utf-8\r\n'
+                         b'Cache-Control: no-cache\r\n'
+                         b'Connection: keep-alive\r\n\r\n'
+                         b'retry: 3000\n\n')
+            # 续传：先补发缓冲区中 ID 更大的事件，再跳过订阅后重复收到的部分
+            for event in self.broker.since(last_id):
+                writer.write(event.frame)
+                last_id = event.id
+            await writer.drain()
+            # 缓冲区溢出后发送完已排队的事件即断开，客户端重连时按 Last-Event-ID 补齐
+            while not (subscriber.overflowed and subscriber.queue.empty()):
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    writer.write(b': keep-alive\n\n')
+                else:
+                    if last_id is not None and event.id <= last_id:
+                        continue
+                    writer.write(event.frame)
+                    last_id = event.id
+                await writer.drain()
+        finally:
+            self.broker.unsubscribe(subscriber)
+
+    async def _serve_poll(self, writer: asyncio.StreamWriter, query: Dict[str, str]):
+        since = self._parse_id(query.get('since'))
+        try:
+            timeout = min(max(float(query.get('timeout', 30)), 0), 120)
+        except ValueError:
+            timeout = 30
+        events = self.broker.since(since)
+        if not events and timeout > 0:
+            subscriber = self.broker.subscribe()
+            try:
+                first = await asyncio.wait_for(subscriber.queue.get(), timeout=timeout)
+                events = [first]
+                while not subscriber.queue.empty():
+                    events.append(subscriber.queue.get_nowait())
+            except asyncio.TimeoutError:
+                events = []
+            finally:
+                self.broker.unsubscribe(subscriber)
+        last_id = events[-1].id if events else (since if since is not None else self.broker.last_id)
+        await self._respond(writer, 200, {
+            'last_event_id': last_id,
+            'events': [{'id': event.id, **event.data} for event in events]
+        })
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, code: int, document: Dict[str, Any]):
+        reasons = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}
+        body = json.dumps(document, ensure_ascii=False).encode('utf-8')
+        writer.write(f"HTTP/1.1 {code} {reasons.get(code, 'OK')}\r\n"
+                     f"Content-Type: application/json; charset=utf-8\r\n"
+                     f"Cache-Control: no-store\r\n"
+                     f"Content-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+
+
+def attach_transition_stream(monitor, server: StatusStreamServer):
+    """比较相邻两次检测中各服务的状态，把变化推送给订阅者"""
+    previous: Dict[str, Dict[str, Any]] = {}
+
+    def on_result(result):
+        services = result.get('services')
+        if services is None:
+            # 拉取失败时没有服务明细，仅对目标服务推送 Unknown
+            services = {monitor.target_service: {'status': 'Unknown', 'events': []}}
+        for name, info in services.items():
+            old = previous.get(name)
+            if old is not None and old['status'] != info['status']:
+                server.publish({
+                    'service': name,
+                    'old_status': old['status'],
+                    'new_status': info['status'],
+                    'events': info.get('events', []),
+                    'check_time': result.get('check_time'),
+                })
+            previous[name] = info
+        logger.debug(f"状态推送订阅者数量: {server.client_count}")
+
+    monitor.add_listener(on_result)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多团队订阅
+订阅关系保存在 JSON 文件中，加载时建立 (服务, 级别) -> 订阅 的倒排索引；
+每次状态变化只查找命中的订阅，合并去重收件人后按订阅分组，每组发送一封邮件
+
+文件格式：
+{
+  "subscriptions": [
+    {"name": "内购团队", "recipients": ["a@example.com", "b@example.com"],
+     "services": ["App Store - In-App Purchases"], "severities": ["critical", "warning"]},
+    {"name": "值班", "recipients": ["oncall@example.com"], "services": ["*"], "severities": ["critical"]}
+  ]
+}
+services / severities 省略或为 "*" 表示全部
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from service_match import normalize_service_name
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = '*'
+SEVERITIES = ('critical', 'warning', 'info')
+
+# 通知的异常类型对应的级别
+SEVERITY_BY_ERROR_TYPE = {
+    '服务状态异常': 'critical',
+    '数据接口错误': 'critical',
+    '服务未找到': 'critical',
+    '配置错误': 'critical',
+    '事件更新': 'warning',
+    '服务名称变化': 'warning',
+    '状态恢复': 'info',
+    '数据接口降级': 'info',
+    '数据接口恢复': 'info',
+    '监控线程卡住': 'warning',
+}
+
+
+def severity_of(error_type: Optional[str]) -> str:
+    return SEVERITY_BY_ERROR_TYPE.get(error_type or '', 'critical')
+
+
+class Subscription(NamedTuple):
+    name: str
+    recipients: Tuple[str, ...]
+    services: Tuple[str, ...]  # 已归一化，WILDCARD 表示全部
+    severities: Tuple[str, ...]
+
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return [WILDCARD]
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(',') if part.strip()]
+    return [str(part).strip() for part in value if str(part).strip()]
+
+
+def parse_subscription(item: Dict, index: int) -> Subscription:
+    """校验并规范化单条订阅，配置有误时抛出 ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError(f"第 {index + 1} 条订阅应为对象")
+    name = str(item.get('name') or f"subscription{index + 1}")
+    recipients = tuple(_as_list(item.get('recipients') or []))
+    if not recipients:
+        raise ValueError(f"订阅 {name} 没有收件人")
+    services = tuple(WILDCARD if service == WILDCARD else normalize_service_name(service)
+                     for service in _as_list(item.get('services')))
+    severities = tuple(severity.lower() for severity in _as_list(item.get('severities')))
+    unknown = [severity for severity in severities if severity != WILDCARD and severity not in SEVERITIES]
+    if unknown:
+        raise ValueError(f"订阅 {name} 的级别无效: {', '.join(unknown)}（可选 {', '.join(SEVERITIES)}）")
+    return Subscription(name, recipients, services, severities)
+
+
+class SubscriptionIndex:
+    """(归一化服务名 或 *, 级别 或 *) -> 订阅序号 的倒排索引"""
+
+    def __init__(self, subscriptions: Iterable[Subscription]):
+        self.subscriptions: List[Subscription] = list(subscriptions)
+        self._postings: Dict[Tuple[str, str], List[int]] = {}
+        for position, subscription in enumerate(self.subscriptions):
+            for service in subscription.services:
+                for severity in subscription.severities:
+                    self._postings.setdefault((service, severity), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self.subscriptions)
+
+    def match(self, service: str, severity: str) -> List[Subscription]:
+        """命中的订阅（按文件中的顺序）；只访问最多 4 个倒排列表"""
+        key = normalize_service_name(service)
+        positions: Set[int] = set()
+        for posting in ((key, severity), (key, WILDCARD), (WILDCARD, severity), (WILDCARD, WILDCARD)):
+            positions.update(self._postings.get(posting, ()))
+        return [self.subscriptions[position] for position in sorted(positions)]
+
+    def recipient_groups(self, service: str, severity: str,
+                         extra: Sequence[str] = ()) -> List[Tuple[str, List[str]]]:
+        """返回 [(组名, 收件人列表)]：同一地址只出现在第一个命中的组中，extra 为默认收件人"""
+        seen: Set[str] = set()
+        groups: List[Tuple[str, List[str]]] = []
+        candidates = [('default', list(extra))] if extra else []
+        candidates += [(subscription.name, list(subscription.recipients))
+                       for subscription in self.match(service, severity)]
+        for name, recipients in candidates:
+            unique = []
+            for address in recipients:
+                key = address.lower()
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(address)
+            if unique:
+                groups.append((name, unique))
+        return groups
+
+
+class SubscriptionRegistry:
+    """从 JSON 文件加载订阅，文件修改后在下次查询时自动重新加载"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._mtime: Optional[float] = None
+        self._index = SubscriptionIndex([])
+
+    def index(self) -> SubscriptionIndex:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return self._index
+        if mtime != self._mtime:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                items = data.get('subscriptions', []) if isinstance(data, dict) else data
+                self._index = SubscriptionIndex(parse_subscription(item, i) for i, item in enumerate(items))
+                logger.info(f"已加载订阅配置 {self.path}：{len(self._index)} 条订阅")
+            except (OSError, ValueError) as e:
+                # 保留上一次有效的订阅，避免编辑文件过程中漏发通知
+                logger.error(f"加载订阅配置失败，继续使用上一次的订阅: {e}")
+            self._mtime = mtime
+        return self._index
+
+    def recipient_groups(self, service: str, error_type: Optional[str],
+                         extra: Sequence[str] = ()) -> List[Tuple[str, List[str]]]:
+        return self.index().recipient_groups(service, severity_of(error_type), extra)
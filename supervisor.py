@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多监控定义的单进程运行器
+从一个 JSON 文件加载多份监控定义（服务集合、收件人、检测间隔、告警规则），在同一进程中运行：
+同一数据接口地址每轮只拉取、解析一次，所有定义共用一个线程池、一个 HTTP 传输后端与一个通知分发器；
+每份定义有独立的状态文件与日志文件
+
+配置文件示例（monitors.json）：
+    {
+      "monitors": [
+        {"name": "iap", "services": ["App Store - In-App Purchases"], "to_email": "iap@example.com",
+         "interval": 300},
+        {"name": "push", "services": ["APNS", "APNS Sandbox"], "to_email": ["a@example.com", "b@example.com"],
+         "interval": 60, "rules": [{"statusType": "Maintenance", "action": "ignore"}]}
+      ]
+    }
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+# 添加当前目录到路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+import metrics
+from alert_rules import compile_rules
+from check_processor import CheckProcessor
+from evaluation import Evaluator, strip_jsonp
+from monitor import build_dispatcher, log_dir, logger, FETCH_HEADERS, FETCH_TIMEOUT
+from notifiers import Notification, NotificationDispatcher
+from payload_recorder import PayloadRecorder
+from service_match import DEFAULT_THRESHOLD
+from subscriptions import SubscriptionRegistry
+from transport import create_transport
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class MonitorDefinition(NamedTuple):
+    name: str  # 同时用作状态文件与日志文件名
+    services: Tuple[str, ...]
+    recipients: Optional[Tuple[str, ...]]  # None 表示使用 EMAIL_CONFIG 中的 to_email
+    interval: int
+    url: str
+    rules: Optional[List[Dict[str, Any]]]
+    default_action: str
+
+
+def _as_tuple(value) -> Tuple[str, ...]:
+    if isinstance(value, str):
+        return tuple(part.strip() for part in value.split(',') if part.strip())
+    return tuple(str(part).strip() for part in value or () if str(part).strip())
+
+
+def parse_definition(item: Dict, index: int) -> MonitorDefinition:
+    """校验并规范化单份监控定义，配置有误时抛出 ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError(f"第 {index + 1} 份监控定义应为对象")
+    name = str(item.get('name') or f"monitor{index + 1}")
+    if not _NAME_PATTERN.match(name):
+        raise ValueError(f"监控定义名称只能包含字母、数字、'.'、'_'、'-': {name}")
+    services = _as_tuple(item.get('services') or item.get('service'))
+    if not services:
+        raise ValueError(f"监控定义 {name} 没有指定服务")
+    recipients = item.get('to_email', item.get('recipients'))
+    interval = int(item.get('interval', config.CHECK_INTERVAL))
+    if interval <= 0:
+        raise ValueError(f"监控定义 {name} 的检测间隔应为正数: {interval}")
+    url = item.get('url') or getattr(config, 'STATUS_DATA_URL', None)
+    if not url:
+        raise ValueError(f"监控定义 {name} 没有数据接口地址（url 或 STATUS_DATA_URL）")
+    rules = item.get('rules', getattr(config, 'ALERT_RULES', None))
+    default_action = item.get('rules_default_action', getattr(config, 'ALERT_RULES_DEFAULT_ACTION', 'alert'))
+    compile_rules(rules, default_action)  # 启动时即暴露规则配置错误
+    return MonitorDefinition(name, services, _as_tuple(recipients) if recipients is not None else None,
+                             interval, url, rules, default_action)
+
+
+def load_definitions(path: Path) -> List[MonitorDefinition]:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    items = data.get('monitors', []) if isinstance(data, dict) else data
+    definitions = [parse_definition(item, i) for i, item in enumerate(items)]
+    names = [definition.name for definition in definitions]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"监控定义名称重复: {', '.join(duplicates)}")
+    return definitions
+
+
+class FeedFetcher:
+    """按数据接口地址拉取并解析数据，所有监控定义共用一个带连接池的传输后端"""
+
+    def __init__(self, retry_count: int, retry_delay: float, recorder: Optional[PayloadRecorder] = None,
+                 pool_size: int = 8, backend: Optional[str] = None):
+        self.retry_count = retry_count
+        self.retry_delay = retry_delay
+        self.recorder = recorder
+        self.transport = create_transport(backend, pool_size)
+
+    def fetch(self, url: str) -> Tuple[Optional[Dict[str, Any]], Optional[Exception]]:
+        """返回 (解析结果, 最后一次错误)"""
+        last_error = None
+        for attempt in range(1, self.retry_count + 1):
+            if attempt > 1:
+                metrics.FETCH_RETRIES.inc()
+            try:
+                started = time.perf_counter()
+                response = self.transport.get(url, FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+                response.raise_for_status()
+                metrics.CHECK_DURATION.observe(time.perf_counter() - started, phase='http_wait')
+                metrics.FETCH_BYTES.inc(len(response.content))
+                payload = strip_jsonp(response.text)
+                data = json.loads(payload)
+                if self.recorder:
+                    self.recorder.record(payload)
+                return data, None
+            except Exception as e:
+                last_error = e
+                metrics.FETCH_FAILURES.inc()
+                logger.warning(f"调用状态数据接口失败 [{url}] (尝试 {attempt}/{self.retry_count}): {e}")
+                if attempt < self.retry_count:
+                    time.sleep(self.retry_delay)
+        return None, last_error
+
+    def close(self):
+        self.transport.close()
+
+
+def _definition_logger(name: str) -> logging.Logger:
+    """每份定义写入自己的日志文件，不再传给根日志（避免所有定义混在 monitor_*.log 中）"""
+    definition_logger = logging.getLogger(f"supervisor.{name}")
+    if not definition_logger.handlers:
+        definition_logger.setLevel(logging.INFO)
+        file_handler = logging.FileHandler(log_dir / f"{name}_{datetime.now().strftime('%Y%m%d')}.log",
+                                           encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(f"%(asctime)s - %(levelname)s - [{name}] %(message)s"))
+        definition_logger.addHandler(file_handler)
+        definition_logger.addHandler(console_handler)
+        definition_logger.propagate = False
+    return definition_logger
+
+
+class DefinitionRunner:
+    """单份监控定义：评估共享拉取的数据、按服务交给 CheckProcessor 处理（与单服务监控器相同的流程）、保存自己的状态文件"""
+
+    def __init__(self, definition: MonitorDefinition, dispatcher: NotificationDispatcher, state_dir: Path,
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.definition = definition
+        self.dispatcher = dispatcher
+        self.logger = _definition_logger(definition.name)
+        rules = compile_rules(definition.rules, definition.default_action)
+        self.evaluator = Evaluator(definition.services, rules, threshold)
+        self.state_file = state_dir / f"{definition.name}.json"
+        state = self._load_state()
+        self.last_status: Dict[str, str] = state.get('last_status') or {}
+        self.processor = CheckProcessor(rules, self._notify, self._log, state)
+        self.next_due = 0.0
+        self.pending: Optional[Future] = None
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                self.logger.warning(f"加载状态文件失败: {e}")
+        return {}
+
+    def _save_state(self, check_time: str):
+        try:
+            state = {
+                'last_status': self.last_status,
+                'last_check_time': check_time,
+                **self.processor.to_state()
+            }
+            tmp_file = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            self.logger.error(f"保存状态文件失败: {e}")
+
+    def _log(self, level: int, message: str, service: str):
+        self.logger.log(level, f"[{service}] {message}")
+
+    def _notify(self, subject: str, body: str, error_type: Optional[str], service: str) -> Dict[str, Any]:
+        notification = Notification.create(subject, body, error_type, service, self.definition.recipients)
+        results = self.dispatcher.dispatch(notification)
+        channels = ', '.join(f"{r.channel}={r.outcome}({r.elapsed * 1000:.0f}ms)" for r in results)
+        self.logger.info(f"通知: {subject} -> {channels}")
+        return {'subject': subject, 'channels': [result.to_dict() for result in results]}
+
+    def process(self, data: Optional[Dict[str, Any]], error: Optional[Exception]) -> Dict[str, Any]:
+        """处理一轮拉取结果，返回 {服务名: 检测结果}"""
+        check_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        now = time.time()
+        if data is None:
+            # 拉取失败时每个服务各自判断为无法检测，按服务分别通知（订阅按服务路由）
+            message = f'状态数据接口请求失败: {error}'
+            evaluated = {service: {'status': None, 'error_type': '数据接口错误', 'error_message': message}
+                         for service in self.definition.services}
+        else:
+            evaluated = {service: result.to_dict()
+                         for service, result in self.evaluator.evaluate_data(data, now).items()}
+        results = {}
+        for service, result in evaluated.items():
+            results[service] = self.processor.process(service, result, now, self.last_status.get(service))
+            self.last_status[service] = result['status'] or 'Unknown'
+        self._save_state(check_time)
+        return results
+
+
+class Supervisor:
+    """调度所有监控定义：到期的定义按数据接口地址分组，每个地址拉取一次后交给各定义处理"""
+
+    def __init__(self, definitions: Sequence[MonitorDefinition], max_workers: int = 8,
+                 state_dir: Optional[Path] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.state_dir = Path(state_dir or getattr(config, 'SUPERVISOR_STATE_DIR', None)
+                              or Path(__file__).parent / "state")
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+
+        recorder = None
+        if getattr(config, 'PAYLOAD_ARCHIVE_ENABLED', True):
+            archive_dir = Path(getattr(config, 'PAYLOAD_ARCHIVE_DIR', None) or Path(__file__).parent / "archive")
+            recorder = PayloadRecorder(archive_dir, getattr(config, 'PAYLOAD_ARCHIVE_COMPRESSION', 'gzip'))
+        self.fetcher = FeedFetcher(config.RETRY_COUNT, config.RETRY_DELAY, recorder, self.max_workers,
+                                   getattr(config, 'HTTP_BACKEND', None))
+
+        subscriptions_file = getattr(config, 'SUBSCRIPTIONS_FILE', None)
+        subscriptions = SubscriptionRegistry(subscriptions_file) if subscriptions_file else None
+        self.dispatcher = build_dispatcher(config.EMAIL_CONFIG.copy(), subscriptions)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='supervisor')
+        threshold = getattr(config, 'SERVICE_MATCH_THRESHOLD', DEFAULT_THRESHOLD)
+        self.runners = [DefinitionRunner(definition, self.dispatcher, self.state_dir, threshold)
+                        for definition in definitions]
+        self._stop = threading.Event()
+
+    def feeds(self) -> Dict[str, List[DefinitionRunner]]:
+        grouped: Dict[str, List[DefinitionRunner]] = {}
+        for runner in self.runners:
+            grouped.setdefault(runner.definition.url, []).append(runner)
+        return grouped
+
+    def tick(self, now: Optional[float] = None) -> List[Future]:
+        """拉取到期定义所需的数据并提交处理，返回各定义的处理任务"""
+        now = time.monotonic() if now is None else now
+        due: Dict[str, List[DefinitionRunner]] = {}
+        for runner in self.runners:
+            if runner.next_due > now:
+                continue
+            if runner.pending is not None and not runner.pending.done():
+                runner.logger.warning("上一轮检测尚未完成（通知发送较慢？），跳过本轮")
+            else:
+                due.setdefault(runner.definition.url, []).append(runner)
+            # 按计划时间推进（而非完成时间），间隔成倍数的定义会落在同一轮，共用一次拉取；
+            # 首次运行或落后多轮时从当前时间重新计时
+            runner.next_due += runner.definition.interval
+            if runner.next_due <= now:
+                runner.next_due = now + runner.definition.interval
+        if not due:
+            return []
+
+        fetches = {url: self.executor.submit(self.fetcher.fetch, url) for url in due}
+        submitted = []
+        for url, runners in due.items():
+            data, error = fetches[url].result()
+            for runner in runners:
+                runner.pending = self.executor.submit(self._process, runner, data, error)
+                submitted.append(runner.pending)
+        return submitted
+
+    def _process(self, runner: DefinitionRunner, data, error) -> Dict[str, Any]:
+        try:
+            return runner.process(data, error)
+        except Exception as e:
+            runner.logger.error(f"检测过程发生未预期错误: {e}", exc_info=True)
+            return {}
+
+    def run_once(self) -> Dict[str, Dict[str, Any]]:
+        """所有定义各检测一次，返回 {定义名: {服务名: 检测结果}}"""
+        for runner in self.runners:
+            runner.next_due = 0.0
+        futures = self.tick()
+        wait(futures)
+        return {runner.definition.name: runner.pending.result() for runner in self.runners if runner.pending}
+
+    def run(self):
+        feeds = self.feeds()
+        startup_lines = [
+            "=" * 60,
+            "Apple Developer System Status Monitor 多定义运行器启动",
+            f"监控定义: {len(self.runners)} 份（{', '.join(runner.definition.name for runner in self.runners)}）",
+            f"数据接口: {len(feeds)} 个",
+            f"线程池: {self.max_workers}",
+            "=" * 60
+        ]
+        for line in startup_lines:
+            logger.info(line)
+        try:
+            while not self._stop.is_set():
+                self.tick()
+                next_due = min(runner.next_due for runner in self.runners)
+                self._stop.wait(max(0.0, next_due - time.monotonic()))
+            logger.info("监控已停止")
+        except KeyboardInterrupt:
+            logger.info("监控已停止（用户中断）")
+        finally:
+            self.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self.fetcher.recorder:
+            self.fetcher.recorder.close()
+        self.fetcher.close()
+        self.dispatcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在一个进程中运行多份监控定义')
+    parser.add_argument('config_file', nargs='?',
+                        default=getattr(config, 'SUPERVISOR_CONFIG', None) or str(Path(__file__).parent / 'monitors.json'),
+                        help='监控定义文件（JSON）')
+    parser.add_argument('--workers', type=int, default=getattr(config, 'SUPERVISOR_MAX_WORKERS', 8),
+                        help='共用线程池大小')
+    parser.add_argument('--once', action='store_true', help='所有定义各检测一次后退出')
+    args = parser.parse_args()
+
+    try:
+        definitions = load_definitions(Path(args.config_file))
+    except (OSError, ValueError) as e:
+        parser.error(f"加载监控定义失败: {e}")
+    if not definitions:
+        parser.error(f"{args.config_file} 中没有监控定义")
+
+    supervisor = Supervisor(definitions, args.workers)
+    if args.once:
+        try:
+            for name, results in supervisor.run_once().items():
+                statuses = ', '.join(f"{service}={result.get('status') or 'Unknown'}"
+                                     for service, result in results.items())
+                print(f"{name}: {statuses}")
+        finally:
+            supervisor.close()
+    else:
+        supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试告警规则（纯逻辑，不访问网络、不发邮件）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from alert_rules import compile_rules
+from evaluation import Evaluator
+from event_tracker import EventTracker, NEW, RESOLVED
+
+failures = []
+
+NOW = 1_760_000_000.0
+SERVICE = 'App Store - In-App Purchases'
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def event(message_id, status_type='Outage', started_ago=60.0, **extra):
+    data = {'messageId': message_id, 'statusType': status_type, 'eventStatus': 'ongoing',
+            'epochStartDate': int((NOW - started_ago) * 1000), 'message': f"事件 {message_id}",
+            'usersAffected': 'Some users are affected'}
+    data.update(extra)
+    return data
+
+
+def test_compile_errors():
+    print("\n规则校验：未知字段、无效动作、无效正则、持续时间与事件类型的类型")
+    for spec, expected in (({'statusType': 'Outage', 'colour': 'red'}, '未知字段'),
+                           ({'action': 'drop'}, 'action'),
+                           ({'message': '('}, '正则无效'),
+                           ({'name': '短暂问题', 'max_duration': '300'}, '短暂问题 的 max_duration'),
+                           ({'min_duration': -1}, 'rule1 的 min_duration'),
+                           ({'min_duration': True}, 'min_duration'),
+                           ({'min_duration': 600, 'max_duration': 300}, 'min_duration 大于 max_duration'),
+                           ({'name': '维护', 'statusType': 3}, '维护 的 statusType'),
+                           ({'statusType': ['Outage', None]}, 'statusType'),
+                           ({'statusType': []}, 'statusType'),
+                           ({'usersAffected': 1}, 'usersAffected 应为正则字符串')):
+        try:
+            compile_rules([spec])
+            check(f"拒绝 {spec}", False)
+        except ValueError as e:
+            check(f"拒绝 {spec}", expected in str(e), f"({e})")
+    rule = compile_rules([{'statusType': ('Outage', ' Issue '), 'min_duration': 60, 'max_duration': 3600}]).rules[0]
+    check('合法配置统一为小写集合与浮点秒数', rule.status_types == {'outage', 'issue'} and rule.uses_time)
+    check('未配置规则时返回 None', compile_rules([]) is None)
+
+
+def test_first_match():
+    print("\n按声明顺序取第一条命中的规则")
+    rules = compile_rules([
+        {'name': '忽略维护', 'statusType': 'Maintenance', 'action': 'ignore'},
+        {'name': '部分用户', 'usersAffected': r'\bsome users\b', 'action': 'alert'},
+        {'name': '全部忽略', 'action': 'ignore'},
+    ])
+    check('类型规则先命中', rules.match(event('1', 'Maintenance'), NOW).name == '忽略维护')
+    check('正则规则命中', rules.match(event('2'), NOW).name == '部分用户')
+    check('其余落到兜底规则', rules.match(event('3', usersAffected='All users'), NOW).name == '全部忽略')
+    check('alert 规则告警', rules(event('2'), NOW))
+    check('ignore 规则不告警', not rules(event('1', 'Maintenance'), NOW))
+    check('已结束的事件不告警', not rules(event('2', eventStatus='resolved'), NOW))
+
+    durations = compile_rules([{'statusType': 'Issue', 'max_duration': 300, 'action': 'ignore'}])
+    check('短暂问题被忽略', not durations(event('4', 'Issue', started_ago=120), NOW))
+    check('持续较久的问题告警', durations(event('4', 'Issue', started_ago=600), NOW))
+    check('缺少开始时间时规则不命中（按默认动作告警）', durations(event('5', 'Issue', epochStartDate=None), NOW))
+
+
+def test_rule_change_is_not_recovery():
+    print("\n规则使已告警的事件不再告警时，不应发出已解决通知")
+    rules = compile_rules([{'min_duration': 86400, 'action': 'ignore'}])
+    tracker = EventTracker()
+    outage = event('100', started_ago=60)
+
+    deltas = tracker.diff(SERVICE, [outage], lambda e: rules(e, NOW))
+    check('开始时告警', [d.kind for d in deltas] == [NEW])
+
+    later = NOW + 86400
+    deltas = tracker.diff(SERVICE, [outage], lambda e: rules(e, later))
+    check('持续 24 小时后被规则忽略：无通知', deltas == [], f"({[d.kind for d in deltas]})")
+    check('事件仍在跟踪，服务未恢复', bool(tracker.alerting(SERVICE)))
+
+    ended = dict(outage, eventStatus='resolved', endDate='12/10/2025 08:50 PST')
+    deltas = tracker.diff(SERVICE, [ended], lambda e: rules(e, later))
+    check('真正结束时发出已解决', [d.kind for d in deltas] == [RESOLVED])
+    check('服务已恢复', not tracker.alerting(SERVICE))
+
+    print("\n重启后新增忽略规则：已跟踪的事件不应被视为已解决")
+    restored = EventTracker({SERVICE: {'messageId:200': {'statusType': 'Outage', 'eventStatus': 'ongoing',
+                                                         'message': '事件 200', 'usersAffected': None,
+                                                         'endDate': None, 'epochEndDate': None}}})
+    ignore_all = compile_rules([{'statusType': 'Outage', 'action': 'ignore'}])
+    deltas = restored.diff(SERVICE, [event('200')], lambda e: ignore_all(e, NOW))
+    check('旧状态中的事件继续跟踪，无通知', deltas == [], f"({[d.kind for d in deltas]})")
+
+    print("\n被忽略的事件之后命中告警：作为新增通知，结束时发出已解决")
+    tracker = EventTracker()
+    short = compile_rules([{'max_duration': 300, 'action': 'ignore'}])
+    issue = event('300', 'Issue', started_ago=60)
+    check('短暂时静默跟踪', tracker.diff(SERVICE, [issue], lambda e: short(e, NOW)) == []
+          and not tracker.alerting(SERVICE))
+    deltas = tracker.diff(SERVICE, [issue], lambda e: short(e, NOW + 600))
+    check('超过 5 分钟后新增告警', [d.kind for d in deltas] == [NEW])
+    check('消失时发出已解决', [d.kind for d in tracker.diff(SERVICE, [], lambda e: True)] == [RESOLVED])
+
+    tracker = EventTracker()
+    tracker.diff(SERVICE, [issue], lambda e: short(e, NOW))
+    check('未告警过的事件结束时不通知', tracker.diff(SERVICE, [], lambda e: True) == [])
+
+
+def test_reevaluate():
+    print("\n同一份数据在另一时刻重新应用规则，与重新评估结果一致")
+    rules = compile_rules([{'statusType': 'Issue', 'max_duration': 300, 'action': 'ignore'}])
+    evaluator = Evaluator([SERVICE], rules)
+    data = {'services': [{'serviceName': SERVICE, 'events': [event('400', 'Issue', started_ago=60)]}]}
+    first = evaluator.evaluate_data(data, NOW)[SERVICE]
+    later = evaluator.reevaluate(first, NOW + 600)
+    check('开始时被忽略', first.status == 'Available')
+    check('10 分钟后告警', later == evaluator.evaluate_data(data, NOW + 600)[SERVICE], f"({later.status})")
+    check('复用已解析的事件', later.events is first.events)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试告警规则")
+    print("=" * 60)
+    test_compile_errors()
+    test_first_match()
+    test_rule_change_is_not_recovery()
+    test_reevaluate()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 asyncio 版监控器：按服务分开的状态文件、aclose() 与同步的 run_once()
+（本地桩服务提供数据，不访问外部网络、不发送邮件）
+"""
+
+import sys
+import os
+import json
+import asyncio
+import inspect
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+import monitor
+from async_monitor import AsyncAppleStatusMonitor
+from webhook_stub import StubWebhookServer
+
+failures = []
+
+EVENT = {'messageId': 'test-async-1', 'statusType': 'Outage', 'eventStatus': 'ongoing', 'epochStartDate': 1733700000000,
+         'epochEndDate': None, 'startDate': '12/09/2025 08:50 PST', 'endDate': '',
+         'usersAffected': 'Some users were affected', 'message': 'Users may be experiencing issues.'}
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def payload(events_by_service) -> bytes:
+    data = {'services': [{'serviceName': name, 'events': list(events)} for name, events in events_by_service.items()]}
+    return f"jsonCallback({json.dumps(data)});".encode('utf-8')
+
+
+def subjects(result):
+    return [notification['subject'] for notification in result.get('notifications') or []]
+
+
+async def check_once(instance):
+    try:
+        return await instance.check()
+    finally:
+        await instance.aclose()
+
+
+def test_fresh_instance(stub):
+    print("\n新建的监控器不读取命令行与 GUI 的 state.json")
+    shared = Path(monitor.__file__).parent / "state.json"
+    before = shared.read_bytes() if shared.exists() else None
+    try:
+        # state.json 中记录着进行中的事件，数据中已没有：共用该文件时会发出"事件已解决"
+        shared.write_text(json.dumps({'last_status': 'Unavailable', 'last_check_time': '2025-12-09 08:00:00',
+                                      'events': {config.TARGET_SERVICE: {'messageId:test-async-1': EVENT}}}),
+                          encoding='utf-8')
+        written = shared.read_bytes()
+        stub.get_body = payload({config.TARGET_SERVICE: []})
+        instance = AsyncAppleStatusMonitor(one_shot=True)
+        try:
+            result = asyncio.run(check_once(instance))
+            check('状态文件按服务放在 state/ 下', instance.state_file.parent.name == 'state'
+                  and instance.state_file.name.startswith('standalone-'), f"({instance.state_file})")
+            check('不发送通知', subjects(result) == [], f"({subjects(result)})")
+            check('state.json 未被改写', shared.read_bytes() == written)
+        finally:
+            instance.state_file.unlink(missing_ok=True)
+            instance.state_file.with_name(instance.state_file.name + '.lock').unlink(missing_ok=True)
+    finally:
+        if before is None:
+            shared.unlink(missing_ok=True)
+        else:
+            shared.write_bytes(before)
+
+
+def test_two_targets(stub, directory: Path):
+    print("\n同一事件循环监控两个服务：各自的状态文件与通知")
+    stub.get_body = payload({'APNS': [EVENT], config.TARGET_SERVICE: []})
+
+    async def run_both():
+        apns = AsyncAppleStatusMonitor(target_service='APNS', state_file=directory / 'apns.json', one_shot=True)
+        target = AsyncAppleStatusMonitor(state_file=directory / 'target.json', one_shot=True)
+        async with apns, target:
+            first = await asyncio.gather(apns.check(), target.check())
+            second = await asyncio.gather(apns.check(), target.check())
+        return first, second
+
+    (apns_first, target_first), (apns_second, target_second) = asyncio.run(run_both())
+    check('APNS 的事件只通知 APNS 监控器', len(subjects(apns_first)) == 1 and 'APNS' in subjects(apns_first)[0]
+          and subjects(target_first) == [], f"({subjects(apns_first)} / {subjects(target_first)})")
+    check('第二次检测不重复通知', subjects(apns_second) == [] and subjects(target_second) == [])
+    apns_state = json.loads((directory / 'apns.json').read_text(encoding='utf-8'))
+    target_state = json.loads((directory / 'target.json').read_text(encoding='utf-8'))
+    check('状态文件记录所属服务', apns_state.get('target_service') == 'APNS'
+          and target_state.get('target_service') == config.TARGET_SERVICE)
+    check('事件只记录在 APNS 的状态文件', apns_state.get('events', {}).get('APNS')
+          and not any(target_state.get('events', {}).values()), f"({target_state.get('events')})")
+
+    print("\n状态文件属于其他服务时不采用")
+    stub.get_body = payload({'APNS': [], config.TARGET_SERVICE: []})
+    instance = AsyncAppleStatusMonitor(state_file=directory / 'apns.json', one_shot=True)
+    result = asyncio.run(check_once(instance))
+    check('不发送"事件已解决"', subjects(result) == [], f"({subjects(result)})")
+
+
+def test_sync_close(stub, directory: Path):
+    print("\nclose() 仍为同步方法，继承的 run_once() 可用")
+    stub.get_body = payload({config.TARGET_SERVICE: []})
+    check('close 不是协程', not inspect.iscoroutinefunction(AsyncAppleStatusMonitor.close))
+    instance = AsyncAppleStatusMonitor(state_file=directory / 'once.json', one_shot=True)
+    result = instance.run_once()
+    check('run_once 返回检测结果', result.get('status') == 'Available', f"({result.get('status')})")
+    asyncio.run(instance.http_client.close())
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试 asyncio 版监控器")
+    print("=" * 60)
+    stub = StubWebhookServer().start()
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            config.STATUS_DATA_URL = f"{stub.url}/status.js"
+            config.RETRY_COUNT = 1
+            config.RETRY_DELAY = 0
+            config.ALERT_RULES = None
+            config.SHARED_CACHE_ENABLED = False
+            config.PAYLOAD_ARCHIVE_ENABLED = False
+            config.CHECK_HISTORY_ENABLED = False
+            config.FETCH_HEDGE_ENABLED = False
+            # 不发送邮件与 Webhook
+            config.EMAIL_CONFIG = dict(config.EMAIL_CONFIG, password='your_app_password')
+            config.WEBHOOKS = []
+            config.NOTIFY_COMMAND = None
+            config.SUBSCRIPTIONS_FILE = None
+            config.NOTIFY_FILE = None
+            test_fresh_instance(stub)
+            test_two_targets(stub, Path(temp))
+            test_sync_close(stub, Path(temp))
+    finally:
+        stub.stop()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
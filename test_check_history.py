@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试检测历史（在临时目录中读写，不访问网络、不发邮件）
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from check_history import (CheckHistory, HistorySeries, RECORD, RECORD_SIZE,
+                           AVAILABLE, UNAVAILABLE, UNKNOWN, EMPTY)
+
+failures = []
+
+SERVICE = 'App Store - In-App Purchases'
+T0 = 1_760_000_000.0
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def test_round_trip(history):
+    print("\n写入与读取：状态、拉取耗时（未拉取为 None）、时间范围")
+    statuses = ['Available', 'Available', 'Unavailable', None, 'Available']
+    for i, status in enumerate(statuses):
+        history.append(SERVICE, T0 + 60 * i, status, None if i == 3 else 0.1 * (i + 1))
+    check('服务列表（名称含空格与连字符）', history.services() == [SERVICE])
+    records = list(history.iter_records(SERVICE))
+    check('记录数', len(records) == 5)
+    check('状态码', [r.status for r in records] == [AVAILABLE, AVAILABLE, UNAVAILABLE, UNKNOWN, AVAILABLE])
+    check('未拉取的耗时为 None', records[3].latency is None and abs(records[4].latency - 0.5) < 1e-6)
+    ranged = list(history.iter_records(SERVICE, T0 + 60, T0 + 180))
+    check('时间范围 [start, end)', [r.timestamp for r in ranged] == [T0 + 60, T0 + 120])
+    transitions = [(t.old_status, t.new_status) for t in history.iter_transitions(SERVICE, T0 + 60)]
+    check('状态变化与范围前的最后一条比较',
+          transitions == [(AVAILABLE, UNAVAILABLE), (UNAVAILABLE, UNKNOWN), (UNKNOWN, AVAILABLE)], f"({transitions})")
+    series = history.load(SERVICE)
+    check('内存中的序列', len(series) == 5 and series.first_timestamp == T0 and series.last_timestamp == T0 + 240)
+    check('按时间定位', series.index_at(T0 + 90) == 2)
+
+
+def test_downsample():
+    print("\n降采样：每段取最严重的状态，没有检测的段为 EMPTY")
+    series = HistorySeries()
+    for minute in range(100):
+        series.append(T0 + 60 * minute, UNAVAILABLE if minute == 37 else AVAILABLE)
+    columns = series.downsample(T0, T0 + 6000, 10)
+    check('一分钟的异常不被平均掉', columns == [AVAILABLE] * 3 + [UNAVAILABLE] + [AVAILABLE] * 6, f"({columns})")
+    check('范围外的段为空', series.downsample(T0 + 6000, T0 + 7200, 2) == [EMPTY, EMPTY])
+    series.append(T0 + 6000, UNKNOWN)
+    check('Unknown 比 Available 严重', series.downsample(T0 + 5940, T0 + 6060, 1) == [UNKNOWN])
+
+
+def test_torn_write(history):
+    print("\n写入中断留下半条记录：之后的追加与读取不受影响")
+    path = history.path_for('torn')
+    history.append('torn', T0, 'Available', 0.2)
+    with open(path, 'ab') as f:
+        f.write(RECORD.pack(T0 + 60, 0.2, AVAILABLE)[:7])
+    for i in range(2, 5):
+        history.append('torn', T0 + 60 * i, 'Unavailable', 0.3)
+    check('文件按记录对齐', path.stat().st_size == 4 * RECORD_SIZE, f"({path.stat().st_size} 字节)")
+    records = list(history.iter_records('torn'))
+    check('中断之后的记录完整', [r.status for r in records] == [AVAILABLE] + [UNAVAILABLE] * 3
+          and records[-1].timestamp == T0 + 240)
+
+    print("\n旧版本写入中断后错位的文件：读取时重新对齐并跳过无效记录")
+    data = RECORD.pack(T0, 0.2, AVAILABLE) + b'\x00' * 5 + RECORD.pack(T0 + 60, 0.2, AVAILABLE) * 3
+    series = HistorySeries(data)
+    check('重新对齐，错位之后的记录全部保留', len(series) == 4 and series.last_timestamp == T0 + 60, f"({len(series)} 条)")
+    check('状态码全部有效', all(series.record(i)[2] <= UNAVAILABLE for i in range(len(series))))
+    check('时间有序', all(series.record(i)[0] <= series.record(i + 1)[0] for i in range(len(series) - 1)))
+    garbage = HistorySeries(RECORD.pack(T0, 0.2, 7) + RECORD.pack(T0 + 60, 0.2, AVAILABLE))
+    check('无法识别的状态码不算 Available', len(garbage) == 1 and garbage.worst_status(0, 1) == AVAILABLE)
+    raw = HistorySeries()
+    raw._data += RECORD.pack(T0, 0.2, 7)
+    check('降采样把未知状态码视为 Unknown', raw.worst_status(0, 1) == UNKNOWN)
+
+
+def test_out_of_order(history):
+    print("\n两个进程交替写入：较早的时间戳不打乱顺序")
+    history.append('shared', T0 + 60, 'Available')
+    history.append('shared', T0 + 30, 'Unavailable')  # 另一个进程稍早开始的检测
+    history.append('shared', T0 + 120, 'Available')
+    timestamps = [r.timestamp for r in history.iter_records('shared')]
+    check('文件中时间有序', timestamps == sorted(timestamps), f"({timestamps})")
+    series = history.load('shared')
+    check('二分定位正确', series.index_at(T0 + 61) == 2 and series.worst_status(0, 2) == UNAVAILABLE)
+
+    unordered = RECORD.pack(T0 + 120, 0.1, AVAILABLE) + RECORD.pack(T0, 0.1, UNAVAILABLE)
+    series = HistorySeries(unordered)
+    check('读取乱序的旧文件时重新排序', series.first_timestamp == T0 and series.index_at(T0 + 60) == 1)
+    with_nan = (RECORD.pack(T0, 0.1, AVAILABLE) + RECORD.pack(float('nan'), 0.1, AVAILABLE)
+                + RECORD.pack(T0 + 60, 0.1, UNAVAILABLE))
+    series = HistorySeries(with_nan)
+    check('时间戳为 NaN 的记录被丢弃', len(series) == 2 and series.last_timestamp == T0 + 60, f"({len(series)})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试检测历史")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as directory:
+        history = CheckHistory(Path(directory))
+        test_round_trip(history)
+        test_downsample()
+        test_torn_write(history)
+        test_out_of_order(history)
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试事件跟踪（新增 / 更新 / 解决的增量计算，纯逻辑，不访问网络、不发邮件）
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.dirname(__file__))
+
+from event_tracker import EventTracker, delta_notification, event_key, NEW, UPDATED, RESOLVED
+from models import Event
+
+failures = []
+
+SERVICE = 'App Store - In-App Purchases'
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def event(message_id, message='Users may be experiencing issues.', **extra):
+    data = {'messageId': message_id, 'statusType': 'Outage', 'eventStatus': 'ongoing',
+            'epochStartDate': 1733700000000, 'startDate': '12/09/2025 08:50 PST', 'endDate': '',
+            'usersAffected': 'Some users were affected', 'message': message}
+    data.update(extra)
+    return data
+
+
+def kinds(deltas):
+    return [(delta.kind, delta.key) for delta in deltas]
+
+
+def test_new_updated_resolved():
+    print("\n新增、更新、解决")
+    tracker = EventTracker()
+    check('首次检测没有事件：无变化', tracker.diff(SERVICE, []) == [] and tracker.has_baseline(SERVICE))
+    deltas = tracker.diff(SERVICE, [event('1')])
+    check('新增', kinds(deltas) == [(NEW, 'messageId:1')])
+    check('内容不变：无变化', tracker.diff(SERVICE, [event('1')]) == [])
+    deltas = tracker.diff(SERVICE, [event('1', message='Resolved for most users.')])
+    check('消息变化：更新', kinds(deltas) == [(UPDATED, 'messageId:1')]
+          and deltas[0].previous['message'] == 'Users may be experiencing issues.')
+    check('未跟踪的字段变化：无变化', tracker.diff(SERVICE, [event('1', message='Resolved for most users.',
+                                                                     datePosted='12/09/2025 10:00 PST')]) == [])
+    deltas = tracker.diff(SERVICE, [event('1', message='Resolved for most users.', eventStatus='resolved',
+                                          endDate='12/09/2025 11:00 PST')])
+    check('事件仍在列表中但已结束：解决，使用最新内容', kinds(deltas) == [(RESOLVED, 'messageId:1')]
+          and deltas[0].event['endDate'] == '12/09/2025 11:00 PST')
+    check('解决后不再跟踪', not tracker.alerting(SERVICE))
+
+    tracker.diff(SERVICE, [event('2')])
+    deltas = tracker.diff(SERVICE, [])
+    check('事件从列表中消失：解决，沿用上次快照', kinds(deltas) == [(RESOLVED, 'messageId:2')]
+          and deltas[0].event['message'] == 'Users may be experiencing issues.')
+
+
+def test_recovery_and_notification():
+    print("\n多个事件：全部解决后才算恢复")
+    tracker = EventTracker()
+    tracker.diff(SERVICE, [event('1'), event('2')])
+    deltas = tracker.diff(SERVICE, [event('2')])
+    subject, body, error_type = delta_notification(deltas[0], SERVICE, not tracker.alerting(SERVICE))
+    check('仍有事件时不提示恢复', error_type == '状态恢复' and 'Available' not in body)
+    deltas = tracker.diff(SERVICE, [])
+    subject, body, error_type = delta_notification(deltas[0], SERVICE, not tracker.alerting(SERVICE))
+    check('最后一个事件解决时提示恢复', subject.startswith('✅') and '服务状态已恢复为 Available' in body)
+    subject, body, error_type = delta_notification(
+        tracker.diff(SERVICE, [event('3')])[0], SERVICE, False)
+    check('新增事件通知', error_type == '服务状态异常' and '新增未解决事件' in body)
+
+
+def test_keys_and_state():
+    print("\n事件标识、多个服务、状态文件往返")
+    check('优先使用 messageId', event_key(SERVICE, event('9')) == 'messageId:9')
+    anonymous = event(None)
+    check('没有标识时使用服务名、开始时间与类型', event_key(SERVICE, anonymous) == f"{SERVICE}|1733700000000|Outage")
+
+    tracker = EventTracker()
+    tracker.diff(SERVICE, [event('1')])
+    tracker.diff('APNS', [event('1')])
+    check('不同服务的同一事件分别跟踪', kinds(tracker.diff('APNS', [])) == [(RESOLVED, 'messageId:1')]
+          and bool(tracker.alerting(SERVICE)))
+
+    restored = EventTracker(json.loads(json.dumps(tracker.to_dict())))
+    check('从状态文件恢复后内容不变：无变化', restored.diff(SERVICE, [event('1')]) == [])
+    check('从状态文件恢复后可以解决', kinds(restored.diff(SERVICE, [])) == [(RESOLVED, 'messageId:1')])
+
+    typed = EventTracker()
+    check('数据模型 Event 与原始字典结果一致',
+          kinds(typed.diff(SERVICE, [Event.from_dict(event('5'))])) == [(NEW, 'messageId:5')]
+          and typed.diff(SERVICE, [event('5')]) == [])
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试事件跟踪")
+    print("=" * 60)
+    test_new_updated_resolved()
+    test_recovery_and_notification()
+    test_keys_and_state()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试数据接口健康度（P² 分位数估计与降级 / 恢复判断，纯逻辑，不访问网络、不发邮件）
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.dirname(__file__))
+
+from feed_health import P2Quantile, FeedHealth
+
+failures = []
+
+FEED = 'https://www.apple.com/support/systemstatus/data/system_status_en_US.js'
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def exact_quantile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def test_p2_accuracy():
+    print("\nP² 估计与精确分位数的误差")
+    rng = random.Random(20251209)
+    samples = {
+        '均匀分布': [rng.uniform(0.1, 0.5) for _ in range(5000)],
+        '正态分布': [rng.gauss(0.3, 0.05) for _ in range(5000)],
+        '对数正态（长尾，类似拉取耗时）': [rng.lognormvariate(-1.5, 0.5) for _ in range(5000)],
+    }
+    for name, values in samples.items():
+        for p in (0.5, 0.95):
+            estimator = P2Quantile(p)
+            for x in values:
+                estimator.add(x)
+            exact = exact_quantile(values, p)
+            error = abs(estimator.value() - exact) / exact
+            check(f"{name} p{int(p * 100)} 相对误差 < 3%", error < 0.03, f"({error:.2%})")
+
+
+def test_p2_small_samples():
+    print("\n样本不足 5 个时取排序后的对应位置")
+    estimator = P2Quantile(0.5)
+    check('没有样本时为 None', estimator.value() is None)
+    for x in (0.4, 0.1, 0.3):
+        estimator.add(x)
+    check('3 个样本的 p50 为中间值', estimator.value() == 0.3)
+    p95 = P2Quantile(0.95)
+    for x in (0.4, 0.1, 0.3, 0.2, 0.5):
+        p95.add(x)
+    check('5 个样本的 p95 为最大值', p95.value() == 0.5)
+    try:
+        P2Quantile(1.0)
+        check('分位数超出范围时报错', False)
+    except ValueError:
+        check('分位数超出范围时报错', True)
+
+
+def observe_many(health, latency, count, size=100_000):
+    changes = []
+    for _ in range(count):
+        change = health.observe(latency, size)
+        if change:
+            changes.append(change)
+    return changes
+
+
+def test_degrade_and_recover():
+    print("\n预热期内不判断；连续偏离 sustain 次后降级，连续正常 sustain 次后恢复")
+    health = FeedHealth(FEED, warmup=20, sustain=3)
+    check('预热期内再慢也不判断', observe_many(health, 5.0, 19) == [] and not health.degraded)
+
+    health = FeedHealth(FEED, warmup=20, sustain=3)
+    rng = random.Random(1)
+    for _ in range(200):
+        health.observe(rng.uniform(0.2, 0.3), 100_000)
+    check('正常波动不降级', not health.degraded)
+    changes = [health.observe(3.0, 100_000) for _ in range(3)]
+    check('偏离未持续 sustain 次前不降级', changes[:2] == [None, None])
+    changes = [change for change in changes if change] + observe_many(health, 3.0, 5)
+    check('持续变慢后降级一次', len(changes) == 1 and changes[0].degraded and health.degraded
+          and '拉取耗时' in changes[0].reasons[0], f"({changes})")
+    changes = observe_many(health, 0.25, 30)
+    check('回到基线后恢复一次', len(changes) == 1 and not changes[0].degraded and not health.degraded,
+          f"({changes})")
+
+    print("\n数据大小偏离")
+    health = FeedHealth(FEED, warmup=20, sustain=3)
+    observe_many(health, 0.25, 100)
+    changes = observe_many(health, 0.25, 10, size=5_000)
+    check('数据异常变小时降级', len(changes) == 1 and '数据大小' in changes[0].reasons[0], f"({changes})")
+
+
+def test_seed_latency():
+    print("\n用检测历史预热：跳过未拉取（None / NaN）的记录")
+    health = FeedHealth(FEED, warmup=20, sustain=3)
+    health.seed_latency([0.25] * 30 + [None, float('nan')])
+    check('只计入有效耗时', health.latency.count == 30 and health.latency.p50.value() == 0.25)
+    check('预热后无需重新积累即可判断', len(observe_many(health, 3.0, 5, size=None)) == 1 and health.degraded)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试数据接口健康度")
+    print("=" * 60)
+    test_p2_accuracy()
+    test_p2_small_samples()
+    test_degrade_and_recover()
+    test_seed_latency()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
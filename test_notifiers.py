@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试通知分发与邮件渠道的分阶段耗时（使用本地 SMTP 桩服务，不会发送真实邮件）
+"""
+
+import sys
+import os
+import socketserver
+import threading
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+from notifiers import EmailChannel, Notification, NotificationDispatcher, SUCCESS, WebhookChannel
+from profiling import PhaseTimer
+from webhook import WebhookEndpoint, WebhookNotifier
+from webhook_stub import StubWebhookServer
+
+failures = []
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+class StubSMTPServer(socketserver.ThreadingTCPServer):
+    """最简 SMTP 服务：接受 AUTH PLAIN，记录收到的邮件；connect_delay / data_delay 模拟慢速服务器"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_delay: float = 0.0, data_delay: float = 0.0):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.connect_delay = connect_delay
+        self.data_delay = data_delay
+        self.messages = []
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> 'StubSMTPServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def reply(self, line: str):
+        self.wfile.write((line + '\r\n').encode('ascii'))
+
+    def handle(self):
+        time.sleep(self.server.connect_delay)
+        self.reply('220 stub ESMTP')
+        recipients = []
+        for raw in self.rfile:
+            command = raw.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb == 'EHLO':
+                self.reply('250-stub')
+                self.reply('250 AUTH PLAIN LOGIN')
+            elif verb == 'AUTH':
+                self.reply('235 2.7.0 Authentication successful')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                for data in self.rfile:
+                    if data in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data)
+                time.sleep(self.server.data_delay)
+                self.server.messages.append((list(recipients), b''.join(lines)))
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+def smtp_config(port: int):
+    return {'smtp_server': '127.0.0.1', 'smtp_port': port, 'from_email': 'monitor@example.com',
+            'password': 'stub-password', 'to_email': 'ops@example.com', 'use_ssl': False, 'use_tls': False}
+
+
+def test_email_phases():
+    print("\n邮件渠道：渲染、SMTP 连接与发送分别计时")
+    server = StubSMTPServer(connect_delay=0.2, data_delay=0.3).start()
+    dispatcher = NotificationDispatcher([EmailChannel(smtp_config(server.port), 'https://example.com', timeout=5)])
+    try:
+        notification = Notification.create('⚠️ 服务状态异常 - 测试', '测试内容', '服务状态异常', '测试服务')
+        result = dispatcher.dispatch(notification)[0]
+        phases = result.phases or {}
+        print(f"    {result.outcome} {result.to_dict().get('phases_ms')}")
+        check('发送成功', result.outcome == SUCCESS and len(server.messages) == 1, f"({result.detail})")
+        check('记录三个阶段', set(phases) == {'email_render', 'smtp_connect', 'smtp_send'}, f"({sorted(phases)})")
+        check('连接耗时包含服务器问候前的等待', phases.get('smtp_connect', 0) >= 0.2)
+        check('发送耗时包含 DATA 之后的等待', phases.get('smtp_send', 0) >= 0.3)
+        check('各阶段之和不超过渠道总耗时', sum(phases.values()) <= result.elapsed + 1e-3)
+        check('结果中包含阶段耗时（毫秒）', set(result.to_dict().get('phases_ms', {})) == set(phases))
+    finally:
+        dispatcher.close()
+        server.stop()
+
+
+def test_channel_deadline():
+    print("\n渠道超时传给渠道本身：Webhook 端点始终返回 503、重试 5 次，渠道超时 0.5 秒")
+    stub = StubWebhookServer().start()
+    notifier = WebhookNotifier([WebhookEndpoint(f"{stub.url}/flaky?fail=-1&status=503", name='flaky',
+                                                timeout=5, retries=5, retry_delay=0.2)])
+    dispatcher = NotificationDispatcher([WebhookChannel(notifier, timeout=0.5)])
+    try:
+        notification = Notification.create('⚠️ 服务状态异常 - 测试', '测试内容', '服务状态异常', '测试服务')
+        result = dispatcher.dispatch(notification)[0]
+        time.sleep(2.0)  # 不带期限时此时已重试 4 次
+        hits = stub.counts.get('/flaky', 0)
+        check('渠道未在期限内完成', result.outcome != SUCCESS, f"({result.outcome})")
+        check('报告之后不再投递', hits <= 2, f"(收到 {hits} 次)")
+    finally:
+        dispatcher.close()
+        stub.stop()
+
+
+def test_monitor_timings():
+    print("\n监控器：邮件阶段计入检测的阶段耗时")
+    import monitor
+    server = StubSMTPServer().start()
+    config.EMAIL_CONFIG = smtp_config(server.port)
+    config.WEBHOOKS = []
+    config.NOTIFY_COMMAND = None
+    config.NOTIFY_FILE = None
+    config.SUBSCRIPTIONS_FILE = None
+    instance = monitor.AppleStatusMonitor(one_shot=True)
+    try:
+        instance._phase_timer = PhaseTimer()
+        instance._notify('⚠️ 服务状态异常 - 测试', '测试内容', '服务状态异常')
+        timings = instance._phase_timer.as_dict()
+        print(f"    {instance._phase_timer.format()}")
+        check('包含邮件各阶段', all(name in timings for name in ('email_render', 'smtp_connect', 'smtp_send')),
+              f"({sorted(timings)})")
+        check('邮件阶段包含在 notify 之内',
+              timings['email_render'] + timings['smtp_connect'] + timings['smtp_send'] <= timings['notify'] + 0.1)
+    finally:
+        instance.dispatcher.close()
+        server.stop()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试通知分发")
+    print("=" * 60)
+    test_email_phases()
+    test_channel_deadline()
+    test_monitor_timings()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
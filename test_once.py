@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试单次检测模式（--once / --check-only）的输出与退出码
+数据接口使用本地桩服务，不访问外部网络；邮件、Webhook、命令渠道均关闭，通知写入临时文件
+"""
+
+import sys
+import os
+import io
+import json
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+import monitor
+from webhook_stub import StubWebhookServer
+
+failures = []
+
+SERVICE = config.TARGET_SERVICE
+EVENT = {'messageId': 'test-once-1', 'statusType': 'Outage', 'eventStatus': 'ongoing', 'epochStartDate': 1733700000000,
+         'epochEndDate': None, 'startDate': '12/09/2025 08:50 PST', 'endDate': '',
+         'usersAffected': 'Some users were affected', 'message': 'Users may be experiencing issues.'}
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def payload(name=SERVICE, events=()) -> bytes:
+    data = {'services': [{'serviceName': 'APNS', 'events': []}, {'serviceName': name, 'events': list(events)}]}
+    return f"jsonCallback({json.dumps(data)});".encode('utf-8')
+
+
+def run(*args):
+    """在当前进程中执行 monitor.main，返回 (退出码, 输出的 JSON)"""
+    out = io.StringIO()
+    with redirect_stdout(out):
+        code = monitor.main(list(args))
+    return code, json.loads(out.getvalue().strip().splitlines()[-1])
+
+
+def test_exit_codes(stub):
+    print("\n--check-only：退出码 0 正常、1 异常、2 无法判断，输出 would_notify")
+    stub.get_body = payload()
+    code, summary = run('--check-only')
+    check('服务正常 -> 0', code == monitor.EXIT_AVAILABLE and summary['status'] == 'Available', f"({code})")
+
+    stub.get_body = payload(events=[EVENT])
+    code, summary = run('--check-only')
+    check('服务异常 -> 1', code == monitor.EXIT_UNAVAILABLE and summary['status'] == 'Unavailable', f"({code})")
+    # 只检测时仍以现有状态文件为基准计算事件变化，新增事件一定在其中
+    check('只检测时输出本应发送的通知', 'notifications' not in summary
+          and any('服务状态异常' in subject for subject in summary.get('would_notify', [])),
+          f"({summary.get('would_notify')})")
+
+    stub.get_body = payload(name='Something Else')
+    code, summary = run('--check-only')
+    check('服务未找到 -> 2', code == monitor.EXIT_UNKNOWN and summary['error_type'] == '服务未找到', f"({code})")
+
+    stub.get_body = b'<html>Service Unavailable</html>'
+    code, summary = run('--check-only')
+    check('数据无法解析 -> 2', code == monitor.EXIT_UNKNOWN and summary['error_type'] == '数据接口错误', f"({code})")
+
+
+def test_check_only_writes_nothing(stub, directory: Path):
+    print("\n--check-only 不写状态文件、共享缓存与锁文件")
+    state_file = Path(monitor.__file__).parent / "state.json"
+    before = state_file.read_bytes() if state_file.exists() else None
+    stub.get_body = payload(events=[EVENT])
+    config.SHARED_CACHE_ENABLED = True
+    try:
+        run('--check-only')
+    finally:
+        config.SHARED_CACHE_ENABLED = False
+    check('没有写入共享缓存与锁文件', not list(directory.glob('status_cache_*')), f"({list(directory.iterdir())})")
+    check('状态文件不变', (state_file.read_bytes() if state_file.exists() else None) == before)
+    check('没有写入检测历史', not (directory / 'history').exists())
+
+
+def test_once(stub, sink: Path):
+    print("\n--once：按事件变化发送通知并保存状态，退出码与 --check-only 相同")
+    state_file = Path(monitor.__file__).parent / "state.json"
+    before = state_file.read_bytes() if state_file.exists() else None
+    try:
+        state_file.unlink(missing_ok=True)
+        stub.get_body = payload(events=[EVENT])
+        code, summary = run('--once')
+        check('服务异常 -> 1，发送新增事件通知', code == monitor.EXIT_UNAVAILABLE and len(summary['notifications']) == 1,
+              f"({code}, {summary.get('notifications')})")
+        check('通知写入文件渠道', sink.exists() and len(sink.read_text(encoding='utf-8').splitlines()) == 1)
+        code, summary = run('--once')
+        check('事件未变化时不重复通知', code == monitor.EXIT_UNAVAILABLE and summary['notifications'] == [])
+        stub.get_body = payload()
+        code, summary = run('--once')
+        check('事件消失 -> 0，发送已解决通知', code == monitor.EXIT_AVAILABLE and len(summary['notifications']) == 1,
+              f"({code}, {summary.get('notifications')})")
+    finally:
+        # 恢复运行测试前的状态文件
+        if before is None:
+            state_file.unlink(missing_ok=True)
+        else:
+            state_file.write_bytes(before)
+
+
+def test_shared_state(stub, sink: Path):
+    print("\nGUI 与 --once 共用状态文件：不覆盖对方的已告警事件，也不重复通知")
+    state_file = Path(monitor.__file__).parent / "state.json"
+    before = state_file.read_bytes() if state_file.exists() else None
+    sent = lambda: len(sink.read_text(encoding='utf-8').splitlines()) if sink.exists() else 0
+    try:
+        state_file.unlink(missing_ok=True)
+        stub.get_body = payload()
+        gui = monitor.AppleStatusMonitor(one_shot=True)  # 模拟先启动、一直运行的 GUI
+        gui._check_and_notify()
+        stub.get_body = payload(events=[EVENT])
+        count = sent()
+        code, summary = run('--once')
+        check('命令行发送新增事件通知', len(summary['notifications']) == 1 and sent() == count + 1)
+        result = gui._check_and_notify()
+        check('GUI 不再重复通知同一事件', result['notifications'] == [] and sent() == count + 1,
+              f"({[n['subject'] for n in result['notifications']]})")
+        events = json.loads(state_file.read_text(encoding='utf-8'))['events'].get(SERVICE, {})
+        check('状态文件保留已告警的事件', len(events) == 1 and all(e.get('notified') for e in events.values()),
+              f"({events})")
+        stub.get_body = payload()
+        result = gui._check_and_notify()
+        check('GUI 发送已解决通知', len(result['notifications']) == 1 and sent() == count + 2)
+        code, summary = run('--once')
+        check('命令行不再重复发送已解决通知', summary['notifications'] == [] and sent() == count + 2)
+        gui.dispatcher.close()
+    finally:
+        if before is None:
+            state_file.unlink(missing_ok=True)
+        else:
+            state_file.write_bytes(before)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试单次检测模式")
+    print("=" * 60)
+    stub = StubWebhookServer().start()
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            directory = Path(temp)
+            config.STATUS_DATA_URL = f"{stub.url}/status.js"
+            config.RETRY_COUNT = 1
+            config.SHARED_CACHE_ENABLED = False
+            config.SHARED_CACHE_DIR = temp
+            config.PAYLOAD_ARCHIVE_ENABLED = False
+            config.CHECK_HISTORY_DIR = str(directory / 'history')
+            config.FETCH_HEDGE_ENABLED = False
+            # 不发送邮件与 Webhook，通知只写入临时文件
+            config.EMAIL_CONFIG = dict(config.EMAIL_CONFIG, password='your_app_password')
+            config.WEBHOOKS = []
+            config.NOTIFY_COMMAND = None
+            config.SUBSCRIPTIONS_FILE = None
+            config.NOTIFY_FILE = str(directory / 'notifications.jsonl')
+            test_exit_codes(stub)
+            test_check_only_writes_nothing(stub, directory)
+            test_once(stub, Path(config.NOTIFY_FILE))
+            test_shared_state(stub, Path(config.NOTIFY_FILE))
+    finally:
+        stub.stop()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试回放与实时监控的告警一致
+同一串接口数据分别交给 replay.py 与实时监控（本地桩服务提供数据，不访问外部网络、不发送邮件），比较会发送的通知
+"""
+
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+import monitor
+from replay import iter_entries, evaluate_all, replay
+from webhook_stub import StubWebhookServer
+
+failures = []
+
+SERVICE = config.TARGET_SERVICE
+EVENT = {'messageId': 'test-replay-1', 'statusType': 'Outage', 'eventStatus': 'ongoing', 'epochStartDate': 1733700000000,
+         'epochEndDate': None, 'startDate': '12/09/2025 08:50 PST', 'endDate': '',
+         'usersAffected': 'Some users were affected', 'message': 'Users may be experiencing issues.'}
+UPDATED = dict(EVENT, message='Users may be unable to make purchases.')
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def payload(name=SERVICE, events=()) -> bytes:
+    data = {'services': [{'serviceName': 'APNS', 'events': []}, {'serviceName': name, 'events': list(events)}]}
+    return f"jsonCallback({json.dumps(data)});".encode('utf-8')
+
+
+# 正常 -> 新增事件 -> 未变化 -> 事件更新 -> 数据无法解析 -> 未变化 -> 服务改名（模糊匹配）-> 事件解决 -> 服务未找到
+SEQUENCE = [
+    payload(),
+    payload(events=[EVENT]),
+    payload(events=[EVENT]),
+    payload(events=[UPDATED]),
+    b'<html>Service Unavailable</html>',
+    payload(events=[UPDATED]),
+    payload(name=SERVICE.replace('In-App', 'In App'), events=[UPDATED]),
+    payload(name=SERVICE.replace('In-App', 'In App')),
+    payload(name='App Store Connect'),
+]
+
+
+def run_replay(directory: Path, payloads, state=None):
+    """把数据写成按修改时间排序的文件后回放，返回通知的 (主题, 异常类型)"""
+    for index, body in enumerate(payloads):
+        path = directory / f"{index:03d}.js"
+        path.write_bytes(body)
+        os.utime(path, (1733700000 + index * 60, 1733700000 + index * 60))
+    entries = list(iter_entries(directory))
+    evaluations = evaluate_all(entries, SERVICE, 0.8, workers=1)
+    _, alerts = replay(entries, evaluations, SERVICE, None, state)
+    return [(alert.subject, alert.error_type) for alert in alerts]
+
+
+def run_live(stub, payloads, state=None):
+    """同一串数据交给实时监控依次检测，返回发送的通知主题（异常类型从主题中取不到，按主题比较）"""
+    state_file = Path(monitor.__file__).parent / "state.json"
+    before = state_file.read_bytes() if state_file.exists() else None
+    try:
+        state_file.unlink(missing_ok=True)
+        if state is not None:
+            state_file.write_text(json.dumps(state), encoding='utf-8')
+        instance = monitor.AppleStatusMonitor(one_shot=True)
+        subjects = []
+        for body in payloads:
+            stub.get_body = body
+            result = instance._check_and_notify()
+            subjects.extend(notification['subject'] for notification in result.get('notifications') or [])
+        instance.dispatcher.close()
+        return subjects
+    finally:
+        if before is None:
+            state_file.unlink(missing_ok=True)
+        else:
+            state_file.write_bytes(before)
+
+
+def test_same_alerts(stub, directory: Path):
+    print("\n新增、更新、无法判断、模糊匹配、解决、服务未找到")
+    replayed = run_replay(directory / 'sequence', SEQUENCE)
+    live = run_live(stub, SEQUENCE)
+    for subject, error_type in replayed:
+        print(f"    {error_type}: {subject}")
+    check('与实时监控发送的通知相同', [subject for subject, _ in replayed] == live, f"({live})")
+    check('包含服务名称变化', any(error_type == '服务名称变化' for _, error_type in replayed))
+    check('无法判断时每次都告警', sum(error_type == '数据接口错误' for _, error_type in replayed) == 1
+          and sum(error_type == '服务未找到' for _, error_type in replayed) == 1)
+
+
+def test_legacy_baseline(stub, directory: Path):
+    print("\n旧版状态文件（只有 last_status）：首次检测只建立基线，不重复告警")
+    state = {'last_status': 'Unavailable', 'last_check_time': '2025-12-09 08:00:00'}
+    payloads = [payload(events=[EVENT]), payload()]
+    replayed = run_replay(directory / 'legacy', payloads, state)
+    live = run_live(stub, payloads, state)
+    check('与实时监控发送的通知相同', [subject for subject, _ in replayed] == live, f"({replayed} / {live})")
+    check('首次检测不告警，事件结束时通知已解决', [error_type for _, error_type in replayed] == ['状态恢复'])
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试回放与实时监控一致")
+    print("=" * 60)
+    stub = StubWebhookServer().start()
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            directory = Path(temp)
+            (directory / 'sequence').mkdir()
+            (directory / 'legacy').mkdir()
+            config.STATUS_DATA_URL = f"{stub.url}/status.js"
+            config.RETRY_COUNT = 1
+            config.RETRY_DELAY = 0
+            config.ALERT_RULES = None
+            config.SHARED_CACHE_ENABLED = False
+            config.PAYLOAD_ARCHIVE_ENABLED = False
+            config.CHECK_HISTORY_ENABLED = False
+            config.FETCH_HEDGE_ENABLED = False
+            # 不发送邮件与 Webhook
+            config.EMAIL_CONFIG = dict(config.EMAIL_CONFIG, password='your_app_password')
+            config.WEBHOOKS = []
+            config.NOTIFY_COMMAND = None
+            config.SUBSCRIPTIONS_FILE = None
+            config.NOTIFY_FILE = None
+            test_same_alerts(stub, directory)
+            test_legacy_baseline(stub, directory)
+    finally:
+        stub.stop()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试服务名称匹配（纯逻辑，不访问网络、不发邮件）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from service_match import ServiceIndex, is_fuzzy_match, fuzzy_match_notification
+from evaluation import Evaluator
+
+failures = []
+
+SERVICE = 'App Store - In-App Purchases'
+NAMES = ['APNS', 'App Store', 'App Store Connect', 'App Store - Sandbox In-App Purchases',
+         'App Store - In-App Purchases', 'iCloud Account and Sign In', 'Apple Pay & Wallet']
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def test_exact():
+    print("\n精确匹配：大小写、en/em dash、多余空白")
+    index = ServiceIndex(NAMES)
+    for variant in ('app store - in-app purchases', 'App Store – In‑App Purchases', ' App  Store -  In-App Purchases '):
+        check(f"'{variant}'", index.exact(variant) == SERVICE)
+
+
+def test_fuzzy_separators():
+    print("\n模糊匹配只容忍空白与连字符差异")
+    index = ServiceIndex([name for name in NAMES if name != SERVICE] + ['App Store-In-App Purchases'])
+    found = index.closest(SERVICE)
+    check('连字符两侧空白不同', found is not None and found[0] == 'App Store-In-App Purchases', f"({found})")
+    found = ServiceIndex(['iCloud Account & Sign In', 'iCloud-Account and Sign-In']).closest('iCloud Account and Sign In')
+    check('空格变连字符', found is not None and found[0] == 'iCloud-Account and Sign-In', f"({found})")
+
+
+def test_fuzzy_rejects_other_services():
+    print("\n名称不同的服务不应被误匹配")
+    index = ServiceIndex([name for name in NAMES if name != SERVICE])
+    check('In-App Purchases 不匹配 Sandbox In-App Purchases', index.closest(SERVICE) is None,
+          f"({index.closest(SERVICE)})")
+    index = ServiceIndex(['App Store Connect', 'TestFlight'])
+    check('App Store Connect API 不匹配 App Store Connect', index.closest('App Store Connect API') is None)
+    index = ServiceIndex(['Apple Pay', 'Apple TV+'])
+    check('Apple Pay & Wallet 不匹配 Apple Pay', index.closest('Apple Pay & Wallet') is None)
+    index = ServiceIndex(['App Store-In App Purchases', 'App Store In-App-Purchases'])
+    check('两个同样接近的候选时不确定，不匹配', index.closest(SERVICE) is None)
+
+
+def test_reporting():
+    print("\n评估结果标记模糊匹配，并生成通知")
+    services = [{'serviceName': name, 'events': []} for name in NAMES if name != SERVICE]
+    services.append({'serviceName': 'App Store-In-App Purchases', 'events': []})
+    result = Evaluator([SERVICE]).evaluate_data({'services': services})[SERVICE]
+    check('按模糊匹配判断为可用', result.status == 'Available' and result.matched == 'App Store-In-App Purchases',
+          f"({result.status}, {result.matched})")
+    check('识别为模糊匹配', is_fuzzy_match(SERVICE, result.matched))
+    check('大小写、dash 不同不算模糊匹配', not is_fuzzy_match(SERVICE, 'app store – in-app purchases'))
+    subject, body, error_type = fuzzy_match_notification(SERVICE, result.matched, result.score)
+    check('通知包含原名称与匹配名称', SERVICE in subject and result.matched in body and error_type == '服务名称变化')
+
+    services = [{'serviceName': name, 'events': []} for name in NAMES if name != SERVICE]
+    result = Evaluator([SERVICE]).evaluate_data({'services': services})[SERVICE]
+    check('没有足够接近的服务时报告未找到', result.status is None and result.matched is None,
+          f"({result.status}, {result.error_type})")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试服务名称匹配")
+    print("=" * 60)
+    test_exact()
+    test_fuzzy_separators()
+    test_fuzzy_rejects_other_services()
+    test_reporting()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试守护进程的状态 API（本地端口，不访问外部网络）
+"""
+
+import sys
+import os
+import json
+from http.client import HTTPConnection
+sys.path.insert(0, os.path.dirname(__file__))
+
+from status_daemon import StatusApiServer, StatusCache
+
+failures = []
+
+SERVICES = {
+    'APNS': {'status': 'Available', 'events': []},
+    'App Store - In-App Purchases': {'status': 'Unavailable', 'events': [{'statusType': 'Outage'}]},
+}
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def get(server, path, headers=None):
+    connection = HTTPConnection(*server.address, timeout=5)
+    try:
+        connection.request('GET', path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        return response.status, (json.loads(body) if body else None), response.getheader('ETag')
+    finally:
+        connection.close()
+
+
+def test_lookup(cache, server):
+    print("\n成功检测后：总览与单个服务")
+    code, body, _ = get(server, '/status')
+    check('首次检测前返回 503', code == 503, f"({code})")
+    cache.update({'check_time': '2025-12-09 10:00:00', 'target_service': 'App Store - In-App Purchases',
+                  'status': 'Unavailable', 'error_type': '服务状态异常', 'error_message': 'Outage',
+                  'services': SERVICES})
+    code, body, _ = get(server, '/status')
+    check('总览', code == 200 and set(body['services']) == set(SERVICES), f"({code})")
+    code, body, etag = get(server, '/status/apns')
+    check('单个服务（不区分大小写）', code == 200 and body['status'] == 'Available' and not body.get('stale'))
+    code, _, _ = get(server, '/status/apns', {'If-None-Match': etag})
+    check('ETag 未变化时返回 304', code == 304, f"({code})")
+    code, _, _ = get(server, '/status/Nope')
+    check('未知服务返回 404', code == 404, f"({code})")
+    return etag
+
+
+def test_failed_check(cache, server, etag):
+    print("\n检测失败后：保留上次的各服务状态并标记为 stale")
+    cache.update({'check_time': '2025-12-09 10:05:00', 'target_service': 'App Store - In-App Purchases',
+                  'status': None, 'error_type': '数据接口错误', 'error_message': '状态数据接口请求失败: timeout'})
+    code, body, new_etag = get(server, '/status/APNS')
+    check('已知服务仍返回 200', code == 200, f"({code})")
+    check('标记为 stale 并附带异常', body and body.get('stale') is True and body.get('error_type') == '数据接口错误',
+          f"({body})")
+    check('保留上次的状态与检测时间', body and body.get('status') == 'Available'
+          and body.get('check_time') == '2025-12-09 10:00:00')
+    check('ETag 随之变化', new_etag != etag)
+    code, body, _ = get(server, '/status')
+    check('总览为本次失败，服务列表为上次的结果',
+          code == 200 and body['status'] == 'Unknown' and body['check_time'] == '2025-12-09 10:05:00'
+          and all(info.get('stale') for info in body['services'].values()))
+    code, _, _ = get(server, '/status/Nope')
+    check('未知服务仍返回 404', code == 404, f"({code})")
+
+    cache.update({'check_time': '2025-12-09 10:10:00', 'target_service': 'App Store - In-App Purchases',
+                  'status': 'Unavailable', 'error_type': '服务状态异常', 'error_message': 'Outage',
+                  'services': SERVICES})
+    code, body, _ = get(server, '/status/APNS')
+    check('恢复后不再标记为 stale', code == 200 and 'stale' not in body and body['check_time'] == '2025-12-09 10:10:00')
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试状态 API")
+    print("=" * 60)
+    cache = StatusCache(300, normalize=lambda name: name.lower())
+    server = StatusApiServer(cache, port=0).start()
+    try:
+        etag = test_lookup(cache, server)
+        test_failed_check(cache, server, etag)
+    finally:
+        server.stop()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
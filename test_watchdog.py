@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试看门狗替换卡住的检测线程：检测线程在发送通知时阻塞超过期限，被替换后不再通知、写状态、记录历史或回调订阅者，
+新线程接着发出未发出的通知（本地桩服务提供数据，不访问外部网络、不发送邮件）
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import config
+import monitor
+from notifiers import ChannelResult, SUCCESS
+from webhook_stub import StubWebhookServer
+
+failures = []
+
+SERVICE = config.TARGET_SERVICE
+EVENTS = [{'messageId': f'test-watchdog-{i}', 'statusType': 'Outage', 'eventStatus': 'ongoing',
+           'epochStartDate': 1733700000000 + i, 'epochEndDate': None, 'startDate': '12/09/2025 08:50 PST',
+           'endDate': '', 'usersAffected': 'Some users were affected', 'message': f'Issue {i}.'} for i in (1, 2)]
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def payload(events=()) -> bytes:
+    data = {'services': [{'serviceName': SERVICE, 'events': list(events)}]}
+    return f"jsonCallback({json.dumps(data)});".encode('utf-8')
+
+
+class BlockingDispatcher:
+    """代替通知分发器：第一条通知阻塞到看门狗发出"监控线程卡住"为止，记录每条通知及发送线程"""
+
+    def __init__(self):
+        self.channels = []
+        self.sent = []  # (线程, 主题)
+        self.stalled = threading.Event()
+        self._first = True
+
+    def dispatch(self, notification):
+        self.sent.append((threading.current_thread(), notification.subject))
+        if notification.error_type == '监控线程卡住':
+            self.stalled.set()
+        elif self._first:
+            self._first = False
+            self.stalled.wait(10)
+        return [ChannelResult('stub', SUCCESS, 0.0)]
+
+    def close(self):
+        pass
+
+
+def test_stalled_notify(stub, directory: Path):
+    print("\n检测线程在发送通知时卡住，被看门狗替换")
+    stub.get_body = payload(EVENTS)
+    instance = monitor.AppleStatusMonitor(check_interval=3600, state_file=directory / 'state.json')
+    instance.watchdog_grace = 0.5
+    instance.state_lock_timeout = 10
+    instance.history = monitor.CheckHistory(directory / 'history')
+    dispatcher = instance.dispatcher = BlockingDispatcher()
+    saves, listened = [], []
+    save_status = instance._save_status
+    instance._save_status = lambda *args: (saves.append(threading.current_thread()), save_status(*args))
+    instance.add_listener(lambda result: listened.append(threading.current_thread()))
+
+    runner = threading.Thread(target=instance.run, daemon=True)
+    runner.start()
+    try:
+        check('看门狗发出"监控线程卡住"', dispatcher.stalled.wait(10))
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and not saves:
+            time.sleep(0.05)
+        time.sleep(0.5)
+    finally:
+        instance.stop()
+        runner.join(10)
+
+    stuck = dispatcher.sent[0][0]
+    replacement = instance._worker
+    late = [subject for thread, subject in dispatcher.sent if thread is stuck]
+    fresh = [subject for thread, subject in dispatcher.sent if thread is replacement]
+    print(f"    旧线程: {late}")
+    print(f"    新线程: {fresh}")
+    check('旧线程在卡住之后不再发送通知', len(late) == 1, f"({len(late)} 条)")
+    check('旧线程不保存状态、不回调订阅者', stuck not in saves and stuck not in listened)
+    check('新线程发出全部事件的通知', sum('服务状态异常' in subject for subject in fresh) == len(EVENTS), f"({fresh})")
+    check('新线程保存状态并回调订阅者', saves == [replacement] and listened == [replacement])
+    records = list(instance.history.iter_records(SERVICE))
+    check('检测历史只有新线程的一条', len(records) == 1, f"({len(records)} 条)")
+    state = json.loads((directory / 'state.json').read_text(encoding='utf-8'))
+    check('状态文件记录了两个事件', len(state.get('events', {}).get(SERVICE, {})) == len(EVENTS))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试看门狗")
+    print("=" * 60)
+    stub = StubWebhookServer().start()
+    try:
+        with tempfile.TemporaryDirectory() as temp:
+            config.STATUS_DATA_URL = f"{stub.url}/status.js"
+            config.RETRY_COUNT = 1
+            config.RETRY_DELAY = 0
+            config.ALERT_RULES = None
+            config.SHARED_CACHE_ENABLED = False
+            config.PAYLOAD_ARCHIVE_ENABLED = False
+            config.CHECK_HISTORY_ENABLED = False
+            config.FETCH_HEDGE_ENABLED = False
+            config.FEED_HEALTH_ENABLED = False
+            config.METRICS_PORT = None
+            config.WATCHDOG_ENABLED = True
+            config.WATCHDOG_POLL_INTERVAL = 0.1
+            config.WATCHDOG_HEARTBEAT_FILE = None
+            # 不发送邮件与 Webhook（通知分发器在测试中被替换）
+            config.EMAIL_CONFIG = dict(config.EMAIL_CONFIG, password='your_app_password')
+            config.WEBHOOKS = []
+            config.NOTIFY_COMMAND = None
+            config.SUBSCRIPTIONS_FILE = None
+            config.NOTIFY_FILE = None
+            test_stalled_notify(stub, Path(temp))
+    finally:
+        stub.stop()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
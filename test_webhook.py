@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试 Webhook 通知（使用本地桩服务，不会访问外部网络）
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(__file__))
+
+from webhook import WebhookEndpoint, WebhookNotifier
+from webhook_stub import StubWebhookServer
+
+failures = []
+
+
+def check(name, condition, detail=''):
+    print(f"  {'✅' if condition else '❌'} {name} {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def test_fan_out(stub):
+    print("\n并发投递：正常、慢速、前两次失败、始终失败、业务错误码")
+    notifier = WebhookNotifier([
+        WebhookEndpoint(f"{stub.url}/ok", name='ok', format='slack'),
+        WebhookEndpoint(f"{stub.url}/slow?delay=1", name='slow', format='feishu', timeout=3),
+        WebhookEndpoint(f"{stub.url}/flaky?fail=2&status=503", name='flaky', format='dingtalk',
+                        secret='SEC123', retries=2, retry_delay=0.1),
+        WebhookEndpoint(f"{stub.url}/down?fail=-1", name='down', retries=1, retry_delay=0.1),
+        WebhookEndpoint(f"{stub.url}/errcode?errcode=310000", name='errcode', format='dingtalk'),
+    ], max_workers=8)
+    started = time.perf_counter()
+    results = {r.endpoint: r for r in notifier.send('⚠️ 服务状态异常 - 测试', '测试内容', '服务状态异常', '测试服务')}
+    elapsed = time.perf_counter() - started
+    for result in results.values():
+        print(f"    {result.endpoint:8} ok={result.ok} status={result.status_code} "
+              f"attempts={result.attempts} {result.elapsed * 1000:.0f}ms {result.error or ''}")
+    check('正常端点成功', results['ok'].ok)
+    check('慢速端点成功', results['slow'].ok)
+    check('失败后重试成功', results['flaky'].ok and results['flaky'].attempts == 3)
+    check('始终失败的端点报告失败', not results['down'].ok and results['down'].attempts == 2)
+    check('业务错误码报告失败且不重试', not results['errcode'].ok and results['errcode'].attempts == 1)
+    check('并发投递，总耗时取决于最慢端点', elapsed < 1.6, f"({elapsed:.2f}s)")
+    flaky = [item for item in stub.received if item['path'] == '/flaky']
+    check('钉钉格式', flaky and flaky[-1]['body'].get('msgtype') == 'markdown')
+    notifier.close()
+
+
+def test_rate_limit(stub):
+    print("\n限速：每秒 5 个、突发 2 个，连续发送 6 条")
+    notifier = WebhookNotifier([WebhookEndpoint(f"{stub.url}/limited", name='limited', rate=5, burst=2)])
+    started = time.perf_counter()
+    for i in range(6):
+        notifier.send(f"消息 {i}", '限速测试')
+    elapsed = time.perf_counter() - started
+    times = [item['time'] for item in stub.received if item['path'] == '/limited']
+    check('全部送达', len(times) == 6)
+    check('超出突发后按速率发送', elapsed >= 0.7, f"({elapsed:.2f}s，理论约 0.8s)")
+    notifier.close()
+
+
+def test_keep_alive(stub):
+    print("\n连接复用：同一端点连续发送 20 条")
+    notifier = WebhookNotifier([WebhookEndpoint(f"{stub.url}/keepalive", name='keepalive', rate=1000, burst=1000)],
+                               max_workers=2)
+    before = len(stub.connections)
+    for i in range(20):
+        notifier.send(f"消息 {i}", '连接复用测试')
+    check('复用 keep-alive 连接', len(stub.connections) - before <= 2,
+          f"(新建连接 {len(stub.connections) - before} 个)")
+    notifier.close()
+
+
+def test_overall_timeout(stub):
+    print("\n整体等待上限：端点延迟 2 秒，send(timeout=0.5)")
+    notifier = WebhookNotifier([WebhookEndpoint(f"{stub.url}/hang?delay=2", name='hang', timeout=5)])
+    started = time.perf_counter()
+    results = notifier.send('超时测试', '超时测试', timeout=0.5)
+    elapsed = time.perf_counter() - started
+    check('超时后立即返回', elapsed < 1.0 and not results[0].ok, f"({elapsed:.2f}s, {results[0].error})")
+    notifier.close()
+
+
+def test_no_retry_after_deadline(stub):
+    print("\n整体期限后不再重试：端点始终返回 503，重试 5 次，send(timeout=0.5)")
+    notifier = WebhookNotifier([WebhookEndpoint(f"{stub.url}/deadline?fail=-1&status=503", name='deadline',
+                                                timeout=5, retries=5, retry_delay=0.2)])
+    results = notifier.send('期限测试', '期限测试', timeout=0.5)
+    time.sleep(2.0)  # 不带期限时此时已重试 4 次
+    hits = stub.counts.get('/deadline', 0)
+    check('期限内最多尝试 2 次', hits <= 2, f"(收到 {hits} 次)")
+    check('结果记为失败', not results[0].ok, f"({results[0].error})")
+    notifier.close()
+
+
+def test_request_timeout_within_deadline(stub):
+    print("\n请求超时不超过剩余时间：端点延迟 2 秒，send(timeout=0.5) 后线程池立即空闲")
+    notifier = WebhookNotifier([WebhookEndpoint(f"{stub.url}/slow?delay=2", name='slow', timeout=5)], max_workers=1)
+    notifier.send('期限测试', '期限测试', timeout=0.5)
+    started = time.perf_counter()
+    notifier._executor.submit(lambda: None).result()  # 唯一的工作线程须先结束上一次的请求
+    elapsed = time.perf_counter() - started
+    check('请求在期限处中止', elapsed < 0.5, f"(工作线程再等待 {elapsed:.2f}s 才空闲)")
+    notifier.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("测试 Webhook 通知")
+    print("=" * 60)
+    stub = StubWebhookServer().start()
+    try:
+        test_fan_out(stub)
+        test_rate_limit(stub)
+        test_keep_alive(stub)
+        test_overall_timeout(stub)
+        test_no_retry_after_deadline(stub)
+        test_request_timeout_within_deadline(stub)
+    finally:
+        stub.stop()
+    print("\n" + ("测试完成！" if not failures else f"失败: {', '.join(failures)}"))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP 传输层
+拉取状态数据只需要 GET，各后端统一为 Transport.get(url, headers, timeout) -> Response，由 config.HTTP_BACKEND 选择：
+    requests     requests.Session（默认，与之前的行为一致）
+    http.client  仅标准库，按主机复用 keep-alive 连接，导入开销最小
+    urllib3      urllib3.PoolManager（requests 的底层库，省去 requests 自身的导入）
+    async        async_http.AsyncHttpClient，运行在后台事件循环线程中
+各后端依赖的库只在创建该后端时导入；性能对比见 bench_transport.py
+"""
+
+import gzip
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_BACKEND = 'requests'
+MAX_REDIRECTS = 3
+DEFAULT_HEADERS = {'Accept': '*/*', 'Accept-Encoding': 'gzip, deflate'}
+
+
+class TransportError(Exception):
+    """HTTP 状态码错误或响应格式错误（网络错误保持各后端原有的异常类型）"""
+
+
+def _charset(content_type: str) -> str:
+    for part in content_type.split(';'):
+        key, _, value = part.strip().partition('=')
+        if key.lower() == 'charset' and value:
+            return value.strip('"')
+    return 'utf-8'
+
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    encoding = encoding.lower()
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        return zlib.decompress(body)
+    return body
+
+
+class Response:
+    """get 在收到响应头后返回；首次访问 content 时才读取正文，便于分别统计等待与下载耗时"""
+
+    __slots__ = ('url', 'status_code', 'headers', '_content', '_reader')
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: Optional[bytes] = None,
+                 reader: Optional[Callable[[], bytes]] = None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers  # 键为小写
+        self._content = content
+        self._reader = reader
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            reader, self._reader = self._reader, None
+            self._content = reader() if reader else b''
+        return self._content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(_charset(self.headers.get('content-type', '')), errors='replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            self.content  # 读完正文，连接才能放回连接池
+            raise TransportError(f"HTTP {self.status_code}: {self.url}")
+
+
+class Transport:
+    """传输后端基类"""
+
+    name = ''
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    name = 'requests'
+
+    def __init__(self, pool_size: int = 4):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+        response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+        return Response(response.url, response.status_code,
+                        {name.lower(): value for name, value in response.headers.items()},
+                        reader=lambda: response.content)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpClientTransport(Transport):
+    """标准库 http.client；每个 (协议, 主机, 端口) 保留最多 pool_size 个空闲连接"""
+
+    name = 'http.client'
+
+    def __init__(self, pool_size: int = 4):
+        import http.client
+        self._http = http.client
+        self._ssl = None  # 加载 CA 证书约需数十毫秒，首次 HTTPS 连接时才创建
+        self.pool_size = max(1, int(pool_size))
+        self._idle: Dict[Tuple[str, str, int], List] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, key: Tuple[str, str, int], timeout: float):
+        scheme, host, port = key
+        if scheme == 'https':
+            if self._ssl is None:
+                import ssl
+                self._ssl = ssl.create_default_context()
+            return self._http.HTTPSConnection(host, port, timeout=timeout, context=self._ssl)
+        return self._http.HTTPConnection(host, port, timeout=timeout)
+
+    def _release(self, key: Tuple[str, str, int], connection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _idle_connection(self, key: Tuple[str, str, int]):
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+        for _ in range(MAX_REDIRECTS + 1):
+            response, connection, key = self._request(url, {**DEFAULT_HEADERS, **(headers or {})}, timeout)
+            location = response.getheader('Location')
+            if response.status in (301, 302, 303, 307, 308) and location:
+                self._finish(response, connection, key)
+                url = urljoin(url, location)
+                continue
+            return Response(url, response.status, {name.lower(): value for name, value in response.getheaders()},
+                            reader=lambda: self._finish(response, connection, key))
+        raise TransportError(f"重定向次数过多: {url}")
+
+    def _request(self, url: str, headers: Dict[str, str], timeout: float):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise TransportError(f"不支持的协议: {url}")
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        # 空闲连接可能已被服务端关闭，此时换新连接重试一次
+        connection = self._idle_connection(key)
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect(key, timeout)
+            elif connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            try:
+                connection.request('GET', target, headers=headers)
+                return connection.getresponse(), connection, key
+            except (self._http.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = None, False
+            except BaseException:
+                connection.close()
+                raise
+
+    def _finish(self, response, connection, key) -> bytes:
+        try:
+            body = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        return _decompress(body, response.getheader('Content-Encoding', ''))
+
+    def close(self):
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+
+class Urllib3Transport(Transport):
+    name = 'urllib3'
+
+    def __init__(self, pool_size: int = 4):
+        import urllib3
+        self._urllib3 = urllib3
+        self.pool = urllib3.PoolManager(maxsize=pool_size)
+        # 与其他后端一致：不自动重试（重试由监控器控制），只跟随重定向
+        self._retries = urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=MAX_REDIRECTS)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+        response = self.pool.request('GET', url, headers={**DEFAULT_HEADERS, **(headers or {})},
+                                     timeout=self._urllib3.Timeout(connect=timeout, read=timeout),
+                                     retries=self._retries, preload_content=False)
+
+        def read() -> bytes:
+            try:
+                return response.read()
+            finally:
+                response.release_conn()
+
+        return Response(urljoin(url, response.geturl() or ''), response.status,
+                        {name.lower(): value for name, value in response.headers.items()}, reader=read)
+
+    def close(self):
+        self.pool.clear()
+
+
+class AsyncTransport(Transport):
+    """在后台线程的事件循环中运行 AsyncHttpClient；get 可在多个线程中并发调用"""
+
+    name = 'async'
+
+    def __init__(self, pool_size: int = 4):
+        import asyncio
+        from async_http import AsyncHttpClient
+        self._asyncio = asyncio
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='transport-async', daemon=True)
+        self._thread.start()
+        self.client = AsyncHttpClient()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> Response:
+        future = self._asyncio.run_coroutine_threadsafe(self.client.get(url, headers, timeout), self._loop)
+        response = future.result()
+        return Response(response.url, response.status, response.headers, content=response.content)
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        try:
+            self._asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result(timeout=5)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (RequestsTransport, HttpClientTransport, Urllib3Transport, AsyncTransport)
+}
+
+
+def create_transport(name: Optional[str] = None, pool_size: int = 4) -> Transport:
+    """按名称创建传输后端（导入对应的库），名称无效时抛出 ValueError"""
+    name = name or DEFAULT_BACKEND
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"不支持的 HTTP 后端: {name}（可选 {', '.join(BACKENDS)}）")
+    return backend(pool_size)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Webhook 通知
+支持 Slack、钉钉、飞书与通用 JSON 格式；所有端点共用一个连接池（keep-alive），
+由固定大小的线程池并发投递，每个端点独立的令牌桶限速、超时与重试，整体期限同时限制请求超时与重试
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('generic', 'slack', 'dingtalk', 'feishu')
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+MAX_RETRY_AFTER = 30.0
+
+
+def _within(timeout: float, deadline: Optional[float]) -> float:
+    """单次等待的超时，不超过到整体期限（time.monotonic() 时刻）的剩余时间"""
+    return timeout if deadline is None else min(timeout, deadline - time.monotonic())
+
+
+class TokenBucket:
+    """令牌桶：平均每秒 rate 个请求，最多连续 burst 个"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = float(rate)
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """取一个令牌，需要等待时最多等待 timeout 秒；超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                wait_seconds = (1.0 - self._tokens) / self.rate if self.rate > 0 else 1.0
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_seconds = min(wait_seconds, remaining)
+            time.sleep(wait_seconds)
+
+
+class WebhookEndpoint:
+    """单个 Webhook 端点的配置"""
+
+    def __init__(self, url: str, name: Optional[str] = None, format: str = 'generic',
+                 secret: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+                 rate: float = 1.0, burst: int = 5, timeout: float = 5.0, retries: int = 2,
+                 retry_delay: float = 0.5):
+        if format not in FORMATS:
+            raise ValueError(f"不支持的 Webhook 格式: {format}（可选 {', '.join(FORMATS)}）")
+        self.url = url
+        self.name = name or urllib.parse.urlsplit(url).netloc or url
+        self.format = format
+        self.secret = secret
+        self.headers = dict(headers or {})
+        self.timeout = float(timeout)
+        self.retries = int(retries)
+        self.retry_delay = float(retry_delay)
+        self.bucket = TokenBucket(rate, burst)
+
+    @classmethod
+    def from_config(cls, item: Dict[str, Any]) -> 'WebhookEndpoint':
+        if not isinstance(item, dict) or not item.get('url'):
+            raise ValueError(f"Webhook 配置缺少 url: {item!r}")
+        return cls(**item)
+
+    def signed_url(self) -> str:
+        """钉钉加签：在 URL 上附加 timestamp 与 sign"""
+        if self.format != 'dingtalk' or not self.secret:
+            return self.url
+        timestamp = str(int(time.time() * 1000))
+        digest = hmac.new(self.secret.encode('utf-8'), f"{timestamp}\n{self.secret}".encode('utf-8'),
+                          hashlib.sha256).digest()
+        sign = urllib.parse.quote_plus(base64.b64encode(digest))
+        separator = '&' if '?' in self.url else '?'
+        return f"{self.url}{separator}timestamp={timestamp}&sign={sign}"
+
+    def render(self, subject: str, body: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """按端点格式构建请求体"""
+        if self.format == 'slack':
+            return {'text': f"*{subject}*\n{body}"}
+        if self.format == 'dingtalk':
+            return {'msgtype': 'markdown', 'markdown': {'title': subject, 'text': f"### {subject}\n\n{body}"}}
+        if self.format == 'feishu':
+            payload: Dict[str, Any] = {'msg_type': 'text', 'content': {'text': f"{subject}\n{body}"}}
+            if self.secret:
+                timestamp = str(int(time.time()))
+                digest = hmac.new(f"{timestamp}\n{self.secret}".encode('utf-8'), b'', hashlib.sha256).digest()
+                payload.update(timestamp=timestamp, sign=base64.b64encode(digest).decode('ascii'))
+            return payload
+        return {'subject': subject, 'body': body, **fields}
+
+
+class WebhookResult(NamedTuple):
+    endpoint: str
+    ok: bool
+    status_code: Optional[int]
+    attempts: int
+    elapsed: float  # 秒，包含限速等待与重试
+    error: Optional[str] = None
+
+
+def _response_error(endpoint: WebhookEndpoint, response: requests.Response) -> Optional[str]:
+    """钉钉/飞书失败时仍返回 200，需要检查响应体中的错误码"""
+    if endpoint.format not in ('dingtalk', 'feishu'):
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    code = data.get('errcode', data.get('code', data.get('StatusCode', 0)))
+    if code not in (0, None):
+        return f"错误码 {code}: {data.get('errmsg') or data.get('msg') or data.get('StatusMessage') or ''}"
+    return None
+
+
+class WebhookNotifier:
+    """并发投递到多个 Webhook 端点"""
+
+    def __init__(self, endpoints: Iterable[WebhookEndpoint], max_workers: int = 8):
+        self.endpoints: List[WebhookEndpoint] = list(endpoints)
+        self.max_workers = max(1, int(max_workers))
+        # 连接池大小与并发数一致，保证并发投递时连接都能复用；重试由本模块控制
+        self._adapter = HTTPAdapter(pool_connections=max(1, len(self.endpoints)), pool_maxsize=self.max_workers,
+                                    max_retries=0)
+        # requests.Session 不保证线程安全：每个投递线程使用自己的 Session，共用同一个适配器（urllib3 连接池线程安全）
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+        self._sessions_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='webhook')
+
+    @classmethod
+    def from_config(cls, items: Iterable[Dict[str, Any]], max_workers: int = 8) -> 'WebhookNotifier':
+        return cls([WebhookEndpoint.from_config(item) for item in items], max_workers)
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            with self._sessions_lock:
+                self._sessions.append(session)
+            self._local.session = session
+        return session
+
+    def send(self, subject: str, body: str, error_type: Optional[str] = None, service: Optional[str] = None,
+             timeout: Optional[float] = None) -> List[WebhookResult]:
+        """投递到所有端点并等待结果；timeout 为整体期限：请求超时不超过剩余时间，到期后不再重试，
+        到期仍未完成的端点记为失败"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        fields = {
+            'error_type': error_type,
+            'service': service,
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        futures = {self._executor.submit(self._deliver, endpoint, subject, body, fields, deadline): endpoint
+                   for endpoint in self.endpoints}
+        done, _ = wait(futures, timeout=timeout)
+        results = []
+        for future, endpoint in futures.items():
+            if future in done:
+                results.append(future.result())
+            else:
+                results.append(WebhookResult(endpoint.name, False, None, 0, timeout or 0.0, '等待超时'))
+        return results
+
+    def _deliver(self, endpoint: WebhookEndpoint, subject: str, body: str,
+                 fields: Dict[str, Any], deadline: Optional[float] = None) -> WebhookResult:
+        started = time.perf_counter()
+        result = self._attempt_all(endpoint, subject, body, fields, started, deadline)
+        # 按端点记录（渠道整体的次数与耗时由通知分发器记录在 channel="webhook" 下）
+        metrics.NOTIFICATION_DURATION.observe(result.elapsed, channel=f"webhook:{endpoint.name}")
+        metrics.NOTIFICATIONS_TOTAL.inc(channel=f"webhook:{endpoint.name}", outcome='success' if result.ok else 'failure')
+        if result.ok:
+            logger.info(f"Webhook 通知发送成功 [{endpoint.name}]: {subject}（{result.elapsed * 1000:.0f}ms）")
+        else:
+            logger.error(f"Webhook 通知发送失败 [{endpoint.name}]: {result.error}")
+        return result
+
+    def _attempt_all(self, endpoint: WebhookEndpoint, subject: str, body: str,
+                     fields: Dict[str, Any], started: float, deadline: Optional[float] = None) -> WebhookResult:
+        headers = {'Content-Type': 'application/json; charset=utf-8', **endpoint.headers}
+        status_code = None
+        error = None
+        attempts = 0
+        for attempt in range(1, endpoint.retries + 2):
+            if not endpoint.bucket.acquire(timeout=max(0.0, _within(endpoint.timeout, deadline))):
+                error = '超过限速，等待令牌超时'
+                break
+            timeout = _within(endpoint.timeout, deadline)
+            if timeout <= 0:
+                error = '已到整体期限'
+                break
+            attempts = attempt
+            retry_after = endpoint.retry_delay * (2 ** (attempt - 1))
+            data = json.dumps(endpoint.render(subject, body, fields), ensure_ascii=False).encode('utf-8')
+            try:
+                response = self._session().post(endpoint.signed_url(), data=data, headers=headers,
+                                                timeout=timeout)
+                status_code = response.status_code
+                if status_code < 300:
+                    error = _response_error(endpoint, response)
+                    if error is None:
+                        return WebhookResult(endpoint.name, True, status_code, attempts,
+                                             time.perf_counter() - started)
+                    break  # 业务错误（如签名错误）重试也不会成功
+                error = f"HTTP {status_code}"
+                if status_code not in RETRY_STATUS:
+                    break
+                header = response.headers.get('Retry-After')
+                if header and header.isdigit():
+                    retry_after = min(float(header), MAX_RETRY_AFTER)
+            except requests.RequestException as e:
+                error = str(e)
+            if attempt <= endpoint.retries:
+                if deadline is not None and time.monotonic() + retry_after >= deadline:
+                    error = f"{error}（已到整体期限，不再重试）"
+                    break
+                logger.warning(f"Webhook 投递失败 [{endpoint.name}] (尝试 {attempt}/{endpoint.retries + 1}): {error}")
+                time.sleep(retry_after)
+        return WebhookResult(endpoint.name, False, status_code, attempts, time.perf_counter() - started, error)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+        self._adapter.close()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 Webhook 桩服务（用于测试）
+通过查询参数注入延迟与失败，例如：
+    /hook?delay=0.5               每个请求延迟 0.5 秒
+    /hook?fail=2&status=503       该路径前 2 个请求返回 503，之后成功
+    /hook?fail=-1                 始终失败
+    /hook?errcode=310000          返回 200 但响应体带错误码（模拟钉钉/飞书业务错误）
+收到的请求保存在 server.received 中
+GET 请求返回 server.get_body（用于传输层测试与性能测试），同样支持上述延迟与失败注入
+"""
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # 响应头与正文分两次写出，避免与客户端延迟确认叠加出约 40ms 的等待
+
+    def do_POST(self):
+        stub: 'StubWebhookServer' = self.server.stub
+        parts = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(parts.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        count = stub.record(parts.path, raw, self.client_address)
+
+        delay = float(params.get('delay', 0))
+        if delay:
+            time.sleep(delay)
+        fail = int(params.get('fail', 0))
+        if fail < 0 or count <= fail:
+            self._reply(int(params.get('status', 500)), {'error': 'injected failure'})
+        elif 'errcode' in params:
+            self._reply(200, {'errcode': int(params['errcode']), 'errmsg': 'injected error'})
+        else:
+            self._reply(200, {'errcode': 0, 'errmsg': 'ok'})
+
+    def do_GET(self):
+        stub: 'StubWebhookServer' = self.server.stub
+        parts = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(parts.query))
+        count = stub.record(parts.path, b'', self.client_address)
+
+        delay = float(params.get('delay', 0))
+        if delay:
+            time.sleep(delay)
+        fail = int(params.get('fail', 0))
+        if fail < 0 or count <= fail:
+            self._reply(int(params.get('status', 500)), {'error': 'injected failure'})
+            return
+        body = stub.get_body
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/javascript; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # 客户端已按期限放弃该请求
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubWebhookServer:
+    """在后台线程运行的桩服务，记录每个路径收到的请求与连接"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.received: List[Dict[str, Any]] = []
+        self.counts: Dict[str, int] = {}
+        self.connections = set()  # 客户端地址（端口），用于确认连接复用
+        self.get_body = b'{}'
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path: str, raw: bytes, client_address) -> int:
+        with self._lock:
+            count = self.counts.get(path, 0) + 1
+            self.counts[path] = count
+            self.connections.add(client_address)
+            try:
+                body = json.loads(raw.decode('utf-8')) if raw else None
+            except ValueError:
+                body = raw
+            self.received.append({'path': path, 'body': body, 'time': time.monotonic()})
+        return count
+
+    def start(self) -> 'StubWebhookServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='webhook-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()